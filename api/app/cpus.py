@@ -0,0 +1,37 @@
+"""
+CPU budget of this container, shared by the launcher and the image pool.
+"""
+
+import math
+import os
+
+
+def cgroup_cpu_limit(root: str = "/sys/fs/cgroup") -> float | None:
+    """CPU quota imposed by cgroups (v2 or v1), or None if unlimited."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open(os.path.join(root, "cpu.max")) as f:
+            max_quota, max_period = f.read().split()
+        return None if max_quota == "max" else int(max_quota) / int(max_period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as f:
+            cfs_quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as f:
+            cfs_period = int(f.read())
+        return None if cfs_quota <= 0 else cfs_quota / cfs_period
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, respecting affinity and cgroup quotas."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(cpus, 1)
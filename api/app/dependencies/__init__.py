@@ -1,14 +1,106 @@
+from collections.abc import Callable
 from ..models.settings import Settings
+from ..services.cache import BlobCache
+from ..services.clients import ClientPool
+from ..services.codec import DataCodec
+from ..services.events import ChangeHub
+from ..services.limiter import AdaptiveLimiter
+from ..services.uploads import UploadQueue
 
 # Global settings instance
 _settings = Settings()
 
+# Azure SDK clients shared by every request in this process
+_client_pool = ClientPool()
+
+# Process-wide blob cache, created on first use
+_blob_cache: BlobCache | None = None
+
+# Process-wide codec for compressed record data
+_data_codec: DataCodec | None = None
+
+# Process-wide concurrency limit shared by the record routers
+_limiter: AdaptiveLimiter | None = None
+
+# Process-wide record change hubs, by record type
+_change_hubs: dict[str, ChangeHub] = {}
+
+# Process-wide write-behind upload queue, created on first use
+_upload_queue: UploadQueue | None = None
+
 
 def get_settings() -> Settings:
     """Get the application settings."""
     return _settings
 
 
+def get_client_pool() -> ClientPool:
+    """Get the shared Azure SDK client pool."""
+    return _client_pool
+
+
+def get_blob_cache() -> BlobCache | None:
+    """Get the local blob cache, or None when it is disabled."""
+    global _blob_cache
+    if _blob_cache is None and _settings.blob_cache_dir:
+        _blob_cache = BlobCache(
+            directory=_settings.blob_cache_dir,
+            max_bytes=_settings.blob_cache_bytes,
+            max_entry_bytes=_settings.blob_cache_entry_bytes,
+        )
+    return _blob_cache
+
+
+def get_data_codec() -> DataCodec | None:
+    """Get the record data codec, or None when compression is disabled."""
+    global _data_codec
+    if _data_codec is None and _settings.database_compress_bytes > 0:
+        _data_codec = DataCodec(
+            threshold=_settings.database_compress_bytes,
+            level=_settings.database_compress_level,
+        )
+    return _data_codec
+
+
+def get_concurrency_limiter() -> AdaptiveLimiter | None:
+    """Get the record route concurrency limiter, or None when it is disabled."""
+    global _limiter
+    if _limiter is None and _settings.limiter_enabled:
+        _limiter = AdaptiveLimiter(
+            initial=_settings.limiter_initial,
+            minimum=_settings.limiter_min,
+            maximum=_settings.limiter_max,
+            latency_target=_settings.limiter_latency_target,
+        )
+    return _limiter
+
+
+def get_change_hub(type: str, factory: Callable[[], ChangeHub]) -> ChangeHub:
+    """Get the change hub for a record type, creating it on first use."""
+    hub = _change_hubs.get(type)
+    if hub is None:
+        hub = _change_hubs[type] = factory()
+    return hub
+
+
+def get_upload_queue() -> UploadQueue | None:
+    """Get the write-behind upload queue, or None when it is disabled."""
+    global _upload_queue
+    if _upload_queue is None and _settings.storage_write_behind:
+        _upload_queue = UploadQueue(
+            workers=_settings.storage_write_behind_workers,
+            max_bytes=_settings.storage_write_behind_bytes,
+            retries=_settings.storage_write_behind_retries,
+        )
+    return _upload_queue
+
+
 __all__ = [
     "get_settings",
+    "get_client_pool",
+    "get_blob_cache",
+    "get_data_codec",
+    "get_concurrency_limiter",
+    "get_change_hub",
+    "get_upload_queue",
 ]
@@ -0,0 +1,35 @@
+"""
+Image rendering run inside the image process pool.
+
+Pool children are spawned and import this module to unpickle their work,
+so it depends on Pillow alone: importing app.services would configure
+tracing and metrics in every child.
+"""
+
+import io
+
+from PIL import Image
+
+# variant format -> (Pillow encoder, content type)
+FORMATS: dict[str, tuple[str, str]] = {
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+    "avif": ("AVIF", "image/avif"),
+}
+
+
+def render_variant(image_bytes: bytes, width: int, format: str) -> bytes:
+    """Resize an image to at most `width` pixels wide and re-encode it.
+
+    Runs in a worker process, so it must stay a plain module-level function.
+    """
+    encoder, _ = FORMATS[format]
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        else:
+            resized = image
+        output = io.BytesIO()
+        resized.save(output, format=encoder)
+        return output.getvalue()
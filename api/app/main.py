@@ -1,16 +1,129 @@
-from fastapi import FastAPI
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 
-from .routers import create_router
+from .observability import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    instrument_app,
+    mark_process_dead,
+    monitor_event_loop,
+    render_metrics,
+    save_to_directory,
+)
+from .dependencies import (
+    get_blob_cache,
+    get_client_pool,
+    get_data_codec,
+    get_settings,
+    get_upload_queue,
+)
+from .routers import create_router, create_storage_router
+from .routers.record import get_record_service
+from .routers.storage import get_storage_service
+from .services.images import shutdown_process_pool
+from .services.registry import load_record_types
+from .services.warmup import Warmup
 
-app = FastAPI()
+# record types served by this app, from APP_RECORD_TYPES and APP_RECORD_SCHEMA_DIR
+RECORD_TYPES = load_record_types(
+    get_settings().record_types, get_settings().record_schema_dir
+)
 
-# design router
-app.include_router(create_router(database="designs", type="design"))
+warmup = Warmup()
 
-# applications router
-app.include_router(create_router(database="applications", type="application"))
+
+async def save_profile_blob(name: str, data: bytes) -> None:
+    # profiles/ is outside images/ and videos/, so it is never served
+    settings = get_settings()
+    storage = get_storage_service(
+        settings, get_blob_cache(), get_upload_queue(), get_client_pool()
+    )
+    await storage.save_blob(f"profiles/{name}", data, "application/json")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    pool = get_client_pool()
+    codec = get_data_codec()
+    storage = get_storage_service(settings, get_blob_cache(), get_upload_queue(), pool)
+    checks: dict[str, Callable[[], Awaitable[object]]] = {"storage": storage.warm_up}
+    for type, record_type in RECORD_TYPES.items():
+        service = get_record_service(
+            record_type.container, type, settings, pool, codec, record_type.shared
+        )
+        checks[type] = service.warm_up
+    warmup.start(checks)
+    monitor = asyncio.create_task(monitor_event_loop())
+    yield
+    try:
+        monitor.cancel()
+        await warmup.stop()
+        # finish spooled uploads before the process exits
+        uploads = get_upload_queue()
+        if uploads is not None:
+            await uploads.drain()
+        shutdown_process_pool()
+        await pool.close()
+    finally:
+        # the worker's live gauges leave the aggregate even if cleanup failed
+        mark_process_dead()
+
+
+app = FastAPI(lifespan=lifespan)
+profiling_dir = get_settings().profiling_dir
+app.add_middleware(
+    ProfilingMiddleware,
+    settings=get_settings(),
+    save=save_to_directory(profiling_dir) if profiling_dir else save_profile_blob,
+)
+app.add_middleware(MetricsMiddleware)
+instrument_app(app)
+
+# record routers, one per registered type; each Cosmos account has one client
+for type, record_type in RECORD_TYPES.items():
+    app.include_router(
+        create_router(
+            database=record_type.container,
+            type=type,
+            shared=record_type.shared,
+            data_schema=record_type.data_schema,
+        )
+    )
+
+# blob storage router
+app.include_router(create_storage_router())
 
 
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
+
+
+@app.get("/healthz", tags=["health"])
+async def liveness():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz", tags=["health"])
+async def readiness():
+    """Ready once clients are connected, tokens fetched and defaults read."""
+    status_code = 200 if warmup.ready else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": "ready" if warmup.ready else "warming",
+            "checks": warmup.status,
+        },
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
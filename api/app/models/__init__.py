@@ -1,4 +1,31 @@
 from .settings import Settings
-from .record import Record
+from .record import (
+    DataRef,
+    Record,
+    RecordBatch,
+    RecordBatchRequest,
+    RecordChanges,
+)
+from .blob import (
+    BlobInfo,
+    BlobPage,
+    SasGrant,
+    SasUploadRequest,
+    UploadSession,
+    UploadSessionRequest,
+)
 
-__all__ = ["Settings", "Record"]
+__all__ = [
+    "Settings",
+    "Record",
+    "DataRef",
+    "RecordBatch",
+    "RecordBatchRequest",
+    "RecordChanges",
+    "BlobInfo",
+    "BlobPage",
+    "SasGrant",
+    "SasUploadRequest",
+    "UploadSession",
+    "UploadSessionRequest",
+]
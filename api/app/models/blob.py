@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class SasUploadRequest(BaseModel):
+    kind: Literal["images", "videos"] = Field(default="images")
+    path: str | None = Field(default=None, pattern=r"^[\w\-]+(/[\w\-]+)*$")
+    extension: str | None = Field(default=None, pattern=r"^[a-z0-9]{1,5}$")
+
+
+class SasGrant(BaseModel):
+    blob_name: str
+    url: str
+    expires_on: datetime
+
+
+class BlobInfo(BaseModel):
+    name: str
+    size: int
+    content_type: str | None = Field(default=None)
+    created: datetime | None = Field(default=None)
+    width: int | None = Field(default=None)
+    height: int | None = Field(default=None)
+    variants: list[str] = Field(default_factory=list)
+
+
+class BlobPage(BaseModel):
+    items: list[BlobInfo] = Field(default_factory=list)
+    continuation_token: str | None = Field(default=None)
+
+
+class UploadSessionRequest(SasUploadRequest):
+    kind: Literal["images", "videos"] = Field(default="videos")
+    length: int = Field(gt=0, description="Total size of the upload in bytes")
+    content_type: str = Field(default="video/mp4")
+
+
+class UploadSession(BaseModel):
+    id: str
+    blob_name: str
+    length: int
+    content_type: str
+    offset: int = Field(default=0)
@@ -1,9 +1,36 @@
 from pydantic import BaseModel, Field
 
+class DataRef(BaseModel):
+    blob: str = Field(description="Blob holding the record data as JSON")
+    sha256: str = Field(description="SHA-256 of the stored JSON")
+    size: int = Field(description="Size of the stored JSON in bytes")
+
 class Record(BaseModel):
     id: str = Field(default="")
     name: str = Field(default="")
     description: str = Field(default="")
     type: str = Field(default="")
     default: bool = Field(default=False)
-    data: dict = Field(default_factory=dict)
\ No newline at end of file
+    data: dict = Field(default_factory=dict)
+    # set when data is kept in blob storage instead of Cosmos
+    data_ref: DataRef | None = Field(default=None)
+
+
+class RecordBatchRequest(BaseModel):
+    ids: list[str] = Field(max_length=256, description="IDs to read, at most 256")
+
+class RecordBatch(BaseModel):
+    items: list[Record] = Field(default_factory=list)
+    missing: list[str] = Field(default_factory=list)
+
+class RecordChanges(BaseModel):
+    items: list[Record] = Field(
+        default_factory=list, description="Records created or updated"
+    )
+    deleted: list[str] = Field(
+        default_factory=list, description="IDs of deleted records"
+    )
+    token: str = Field(description="Pass as `since` to get the next changes")
+    more: bool = Field(
+        default=False, description="More changes are waiting; ask again now"
+    )
@@ -14,11 +14,151 @@ class Settings(BaseSettings):
     storage_container: str = Field(
         default="", description="Azure Storage container name"
     )
+    storage_dedupe: bool = Field(
+        default=False,
+        description="Name uploaded blobs by content hash and skip duplicates",
+    )
+    image_variant_widths: list[int] = Field(
+        default=[256, 1024], description="Widths of derivatives rendered for images"
+    )
+    image_variant_formats: list[str] = Field(
+        default=["webp"], description="Formats of derivatives rendered for images"
+    )
+    image_workers: int = Field(
+        default=0,
+        description="Image processes per server worker "
+        "(0 shares the available CPUs between server workers)",
+    )
+    storage_sas_minutes: int = Field(
+        default=15, description="Lifetime of direct upload/download SAS URLs"
+    )
+    storage_export_concurrency: int = Field(
+        default=8, description="Blobs downloaded ahead while streaming a ZIP export"
+    )
+    storage_write_behind: bool = Field(
+        default=False,
+        description="Return image names before their upload finishes "
+        "(single-process only: the spool is per process and per replica, so "
+        "app.server refuses to start unless APP_SERVER_WORKERS=1)",
+    )
+    storage_write_behind_workers: int = Field(
+        default=4, description="Background workers uploading spooled images"
+    )
+    storage_write_behind_bytes: int = Field(
+        default=256 * 1024 * 1024, description="Memory budget of the upload spool"
+    )
+    storage_write_behind_retries: int = Field(
+        default=5, description="Retries before a spooled upload is given up"
+    )
+    storage_upload_chunk_bytes: int = Field(
+        default=32 * 1024 * 1024, description="Largest chunk of a resumable upload"
+    )
+    blob_cache_dir: str = Field(
+        default="", description="Local directory caching hot blobs (empty disables)"
+    )
+    blob_cache_bytes: int = Field(
+        default=512 * 1024 * 1024, description="Disk budget of the blob cache"
+    )
+    blob_cache_entry_bytes: int = Field(
+        default=16 * 1024 * 1024, description="Largest blob kept in the blob cache"
+    )
+    tracing_exporter: str = Field(
+        default="none", description="Span exporter: none, console or otlp"
+    )
+    tracing_endpoint: str = Field(
+        default="", description="OTLP/HTTP endpoint (defaults to the OTEL_* env vars)"
+    )
+    tracing_sample_rate: float = Field(
+        default=1.0, description="Fraction of new traces that are recorded"
+    )
+    tracing_service_name: str = Field(
+        default="carson-api", description="service.name reported on spans"
+    )
+    limiter_enabled: bool = Field(
+        default=True, description="Shed record requests beyond an adaptive limit"
+    )
+    limiter_initial: int = Field(
+        default=32, description="Starting concurrency limit per process"
+    )
+    limiter_min: int = Field(default=4, description="Lowest concurrency limit")
+    limiter_max: int = Field(default=512, description="Highest concurrency limit")
+    limiter_latency_target: float = Field(
+        default=1.0,
+        description="Seconds; slower record requests lower the concurrency limit",
+    )
+    server_timing: bool = Field(
+        default=True, description="Send Server-Timing headers from record routes"
+    )
+    profiling_enabled: bool = Field(
+        default=False, description="Allow per-request profiling"
+    )
+    profiling_sample_rate: float = Field(
+        default=0.0, description="Fraction of requests profiled without the header"
+    )
+    profiling_header: str = Field(
+        default="X-Profile",
+        description=(
+            "Request header that asks for a profile when set to 1, true, yes or on"
+        ),
+    )
+    profiling_interval: float = Field(
+        default=0.001, description="Seconds between profiler samples"
+    )
+    profiling_max_per_minute: int = Field(
+        default=6, description="Most profiles taken per process per minute"
+    )
+    profiling_dir: str = Field(
+        default="profiles",
+        description="Local directory for profiles (empty stores them in blob storage)",
+    )
+    record_types: dict[str, str] = Field(
+        default={"design": "designs", "application": "applications"},
+        description="Record types and the Cosmos container each is stored in; "
+        "types mapped to the same container share it",
+    )
+    record_schema_dir: str = Field(
+        default="",
+        description="Directory of JSON Schemas for record data, one <type>.json "
+        "per record type (empty disables validation)",
+    )
+    record_data_spill_bytes: int = Field(
+        default=256 * 1024,
+        description="Store record data larger than this in blob storage "
+        "(0 disables; off while storage is not configured)",
+    )
+    record_tombstone_ttl: int = Field(
+        default=30 * 24 * 3600,
+        description="Seconds deleted records are reported by the changes "
+        "endpoint (0 deletes outright and reports no deletes)",
+    )
+    record_events_interval: float = Field(
+        default=1.0, description="Seconds between polls for record events"
+    )
+    record_events_queue: int = Field(
+        default=256,
+        description="Events buffered per event stream client before it must resync",
+    )
+    record_events_keepalive: float = Field(
+        default=15.0, description="Seconds between keep-alive comments on event streams"
+    )
     database_connection: str = Field(
         default="", description="Database connection string"
     )
     database_name: str = Field(default="carson", description="Database name")
+    database_compress_bytes: int = Field(
+        default=0,
+        description="Store record data larger than this zstd-compressed (0 disables)",
+    )
+    database_compress_level: int = Field(default=3, description="zstd level")
     client_id: str = Field(default="LOCAL", description="Client ID")
+    server_host: str = Field(default="0.0.0.0", description="Address to listen on")
+    server_port: int = Field(default=8000, description="Port to listen on")
+    server_workers: int = Field(
+        default=0, description="Worker processes (0 sizes to the available CPUs)"
+    )
+    server_graceful_timeout: int = Field(
+        default=30, description="Seconds to drain in-flight requests on shutdown"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+from .metrics import (
+    MetricsMiddleware,
+    mark_process_dead,
+    monitor_event_loop,
+    render_metrics,
+)
+from .profiling import ProfilingMiddleware, save_to_directory
+from .timing import TimedRoute, phase
+from .tracing import (
+    RequestCharge,
+    configure_tracing,
+    instrument_app,
+    record_request_charge,
+    traced,
+    tracing_enabled,
+)
+
+__all__ = [
+    "MetricsMiddleware",
+    "mark_process_dead",
+    "monitor_event_loop",
+    "render_metrics",
+    "ProfilingMiddleware",
+    "save_to_directory",
+    "TimedRoute",
+    "phase",
+    "RequestCharge",
+    "configure_tracing",
+    "instrument_app",
+    "record_request_charge",
+    "traced",
+    "tracing_enabled",
+]
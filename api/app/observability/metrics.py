@@ -0,0 +1,154 @@
+"""
+Prometheus metrics for the API.
+
+Requests are measured by an ASGI middleware and labelled with the route
+template (``/design/{id}/``) rather than the raw path, so label cardinality
+is bounded by the number of routes. When `app.server` starts several
+uvicorn workers it points PROMETHEUS_MULTIPROC_DIR at a shared directory,
+so /metrics aggregates every process.
+"""
+
+import asyncio
+import gc
+import os
+import time
+from collections import deque
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled",
+    ["method", "route", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+CONCURRENCY_LIMIT = Gauge(
+    "http_concurrency_limit",
+    "Current adaptive concurrency limit for record routes",
+    multiprocess_mode="livesum",
+)
+SHED = Counter(
+    "http_requests_shed_total",
+    "Requests rejected because the concurrency limit was reached",
+    ["route"],
+)
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop runs a timer; sustained lag means saturation",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+GC_PAUSE = Histogram(
+    "gc_pause_seconds",
+    "Time the interpreter spent in garbage collection",
+    ["generation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# how often the event loop monitor wakes up
+LOOP_INTERVAL = 0.5
+
+# label for requests that did not match any route
+UNMATCHED = "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting and timing every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            # the router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED
+            labels = (scope["method"], route, str(status))
+            REQUESTS.labels(*labels).inc()
+            LATENCY.labels(*labels).observe(elapsed)
+
+
+# gc callbacks may run while a metric lock is held, so pauses are queued
+# here and observed later from ordinary code
+_gc_pauses: deque[tuple[int, float]] = deque(maxlen=10_000)
+_gc_started = 0.0
+
+
+def _on_gc(phase: str, info: dict) -> None:
+    global _gc_started
+    if phase == "start":
+        _gc_started = time.perf_counter()
+    else:
+        _gc_pauses.append((info["generation"], time.perf_counter() - _gc_started))
+
+
+def _flush_gc_pauses() -> None:
+    while _gc_pauses:
+        generation, elapsed = _gc_pauses.popleft()
+        GC_PAUSE.labels(str(generation)).observe(elapsed)
+
+
+async def monitor_event_loop(interval: float = LOOP_INTERVAL) -> None:
+    """Measure event loop lag and record GC pauses until cancelled."""
+    if _on_gc not in gc.callbacks:
+        gc.callbacks.append(_on_gc)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
+            _flush_gc_pauses()
+    finally:
+        gc.callbacks.remove(_on_gc)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Metrics in the Prometheus text format, with their content type."""
+    _flush_gc_pauses()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess aggregate."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,129 @@
+"""
+Opt-in statistical profiling of individual requests.
+
+When APP_PROFILING_ENABLED is set, a request is profiled if it sets the
+profiling header to 1, true, yes or on, or wins the random sample. Only
+one request per process is profiled at a time and at most
+APP_PROFILING_MAX_PER_MINUTE profiles are taken, so the overhead stays
+bounded when left on in production.
+Profiles are written in the speedscope format (https://speedscope.app).
+"""
+
+import os
+import random
+import re
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+import aiofiles
+
+from ..models.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+SaveProfile = Callable[[str, bytes], Awaitable[None]]
+
+# header values that ask for a profile; anything else, such as "0", does not
+_TRUTHY = {b"1", b"true", b"yes", b"on"}
+
+
+def save_to_directory(directory: str) -> SaveProfile:
+    """Write profiles as files in a local directory."""
+
+    async def save(name: str, data: bytes) -> None:
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+        async with aiofiles.open(os.path.join(directory, name), "wb") as file:
+            await file.write(data)
+
+    return save
+
+
+def profile_name(profile_id: str, method: str, route: str) -> str:
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    return f"{stamp}-{profile_id}-{method}-{slug}.speedscope.json"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running pyinstrument for sampled requests only."""
+
+    def __init__(self, app, settings: Settings, save: SaveProfile):
+        self.app = app
+        self.settings = settings
+        self.save = save
+        self.header = settings.profiling_header.lower().encode()
+        self._active = False
+        self._recent: deque[float] = deque()
+        self._saves: set[asyncio.Task] = set()
+        if settings.profiling_enabled:
+            # fail at startup, not on the first sampled request
+            from pyinstrument import Profiler
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            self._profiler = Profiler
+            self._renderer = SpeedscopeRenderer
+
+    def _wanted(self, scope) -> bool:
+        if not self.settings.profiling_enabled:
+            return False
+        requested = any(
+            name == self.header and value.strip().lower() in _TRUTHY
+            for name, value in scope["headers"]
+        )
+        return requested or random.random() < self.settings.profiling_sample_rate
+
+    def _acquire(self) -> bool:
+        # one profile at a time, and a per-minute budget
+        if self._active:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+        if len(self._recent) >= self.settings.profiling_max_per_minute:
+            return False
+        self._recent.append(now)
+        self._active = True
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope) or not self._acquire():
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        profiler = self._profiler(
+            interval=self.settings.profiling_interval, async_mode="enabled"
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            self._active = False
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            name = profile_name(profile_id, scope["method"], route)
+            # render and store after the response, off the request path
+            task = asyncio.create_task(self._save(profiler, name))
+            self._saves.add(task)
+            task.add_done_callback(self._saves.discard)
+
+    async def _save(self, profiler, name: str) -> None:
+        try:
+            output = await asyncio.to_thread(profiler.output, self._renderer())
+            await self.save(name, output.encode())
+        except Exception:
+            logger.exception("Failed to save profile %s", name)
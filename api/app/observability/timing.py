@@ -0,0 +1,141 @@
+"""
+Server-Timing breakdown of where a request spent its time.
+
+Routes built with `TimedRoute` collect phases for the current request in a
+context variable and report them in a ``Server-Timing`` header, which
+browser devtools show next to the request. Phases are exclusive: entering
+a nested phase pauses the outer one, so the durations add up. Outside a
+timed request `phase` does nothing.
+"""
+
+import contextlib
+import functools
+import inspect
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from ..models.settings import Settings
+
+# phase -> description shown in devtools
+PHASES = {
+    "deps": "Request parsing and dependency resolution",
+    "client": "Cosmos client acquisition",
+    "provision": "Container provisioning",
+    "cosmos": "Cosmos data-plane calls",
+    "validate": "Model validation",
+    "blob": "Blob storage calls",
+    "serialize": "Response serialization",
+}
+
+_enabled = Settings().server_timing
+
+
+class Timings:
+    def __init__(self):
+        self.started = perf_counter()
+        self.endpoint_done: float | None = None
+        self.totals: dict[str, float] = {}
+        self._stack: list[str] = []
+        self._since = self.started
+
+    def add(self, name: str, seconds: float) -> None:
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def _charge(self) -> None:
+        now = perf_counter()
+        if self._stack:
+            self.add(self._stack[-1], now - self._since)
+        self._since = now
+
+    def enter(self, name: str) -> None:
+        self._charge()
+        self._stack.append(name)
+
+    def exit(self) -> None:
+        self._charge()
+        self._stack.pop()
+
+    def header(self) -> str:
+        entries = [
+            f'{name};dur={seconds * 1000:.2f};desc="{PHASES.get(name, name)}"'
+            for name, seconds in self.totals.items()
+        ]
+        entries.append(f"total;dur={(perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_timings: ContextVar[Timings | None] = ContextVar("server_timing", default=None)
+
+
+class _Phase:
+    __slots__ = ("timings", "name")
+
+    def __init__(self, timings: Timings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.timings.enter(self.name)
+
+    def __exit__(self, *exc_info):
+        self.timings.exit()
+
+
+_untimed = contextlib.nullcontext()
+
+
+def phase(name: str) -> contextlib.AbstractContextManager:
+    """Attribute the time spent inside the block to `name`."""
+    timings = _timings.get()
+    if timings is None:
+        return _untimed
+    return _Phase(timings, name)
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that reports a Server-Timing header for its responses."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if _enabled and inspect.iscoroutinefunction(endpoint):
+            endpoint = self._time_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _time_endpoint(endpoint: Callable) -> Callable:
+        # FastAPI reads the signature through __wrapped__, so parameters and
+        # dependencies are unchanged
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            timings = _timings.get()
+            if timings is None:
+                return await endpoint(*args, **kwargs)
+            timings.add("deps", perf_counter() - timings.started)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings.endpoint_done = perf_counter()
+
+        return timed
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not _enabled:
+            return handler
+
+        async def timed_handler(request: Request) -> Response:
+            timings = Timings()
+            token = _timings.set(timings)
+            try:
+                response = await handler(request)
+            finally:
+                _timings.reset(token)
+            if timings.endpoint_done is not None:
+                timings.add("serialize", perf_counter() - timings.endpoint_done)
+            response.headers["Server-Timing"] = timings.header()
+            return response
+
+        return timed_handler
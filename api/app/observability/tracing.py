@@ -0,0 +1,181 @@
+"""
+OpenTelemetry tracing for the API.
+
+Tracing is configured once, at import, from the APP_TRACING_* settings.
+With the default exporter "none" OpenTelemetry is never imported, `traced`
+hands back the undecorated function and the other helpers return
+immediately, so a disabled build pays nothing per call.
+"""
+
+import functools
+import inspect
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from ..models.settings import Settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# opentelemetry.trace, imported only when tracing is enabled
+_trace: Any = None
+_tracer: Any = None
+
+
+def _create_exporter(settings: Settings):
+    if settings.tracing_exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter(endpoint=settings.tracing_endpoint or None)
+    if settings.tracing_exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown tracing exporter: {settings.tracing_exporter}")
+
+
+def configure_tracing(settings: Settings) -> None:
+    """Install the tracer provider and route Azure SDK spans through it."""
+    global _trace, _tracer
+    if settings.tracing_exporter == "none":
+        _trace = _tracer = None
+        return
+
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+    from azure.core.settings import settings as azure_settings
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.tracing_service_name}),
+        sampler=ParentBasedTraceIdRatio(settings.tracing_sample_rate),
+    )
+    provider.add_span_processor(BatchSpanProcessor(_create_exporter(settings)))
+    trace.set_tracer_provider(provider)
+    # every Cosmos and Blob HTTP request becomes a child span
+    azure_settings.tracing_implementation = "opentelemetry"
+
+    _trace = trace
+    _tracer = trace.get_tracer("carson")
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def _attributes(operation: str, args: tuple) -> dict:
+    attributes = {"carson.operation": operation}
+    # methods of services that describe themselves
+    if args and hasattr(args[0], "span_attributes"):
+        attributes.update(args[0].span_attributes())
+    return attributes
+
+
+def _count(span, result: Any) -> None:
+    if isinstance(result, (list, tuple, dict)):
+        span.set_attribute("carson.item_count", len(result))
+
+
+def traced(prefix: str) -> Callable[[F], F]:
+    """Wrap a function, coroutine or async generator in a span.
+
+    The span is named `{prefix}.{function name}`. When the first argument
+    has a `span_attributes()` method its result is added to the span, and
+    list results (or the number of items yielded) become the item count.
+    """
+
+    def decorate(fn: F) -> F:
+        if _tracer is None:
+            return fn
+        name = f"{prefix}.{fn.__name__}"
+
+        if inspect.isasyncgenfunction(fn):
+
+            @functools.wraps(fn)
+            async def generator(*args, **kwargs):
+                span = _tracer.start_span(
+                    name, attributes=_attributes(fn.__name__, args)
+                )
+                count = 0
+                items = fn(*args, **kwargs)
+                try:
+                    while True:
+                        # only parent our own work; the consumer runs outside
+                        with _trace.use_span(span):
+                            try:
+                                item = await items.__anext__()
+                            except StopAsyncIteration:
+                                break
+                        count += 1
+                        yield item
+                finally:
+                    await items.aclose()
+                    span.set_attribute("carson.item_count", count)
+                    span.end()
+
+            return generator  # type: ignore[return-value]
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def coroutine(*args, **kwargs):
+                with _tracer.start_as_current_span(
+                    name, attributes=_attributes(fn.__name__, args)
+                ) as span:
+                    result = await fn(*args, **kwargs)
+                    _count(span, result)
+                    return result
+
+            return coroutine  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def function(*args, **kwargs):
+            with _tracer.start_as_current_span(
+                name, attributes=_attributes(fn.__name__, args)
+            ) as span:
+                result = fn(*args, **kwargs)
+                _count(span, result)
+                return result
+
+        return function  # type: ignore[return-value]
+
+    return decorate
+
+
+class RequestCharge:
+    """Cosmos `response_hook` that sums the RU charge of every response.
+
+    Pass one instance per service call so that paged queries count each
+    page and concurrent calls on the pooled client keep their own charge.
+    It has no `clear` method, which the SDK would call before each query.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0.0
+
+    def __call__(self, headers, result) -> None:
+        charge = headers.get("x-ms-request-charge")
+        if charge is not None:
+            self.total += float(charge)
+
+
+def record_request_charge(charge: RequestCharge) -> None:
+    """Add the RU charge summed by a `RequestCharge` to the current span."""
+    if _tracer is None:
+        return
+    _trace.get_current_span().set_attribute("db.cosmosdb.request_charge", charge.total)
+
+
+def instrument_app(app) -> None:
+    """Give every FastAPI request a server span named after its route."""
+    if _tracer is None:
+        return
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="healthz,readyz")
+
+
+configure_tracing(Settings())
@@ -1,3 +1,4 @@
 from .record import create_router
+from .storage import create_storage_router
 
-__all__ = ["create_router"]
+__all__ = ["create_router", "create_storage_router"]
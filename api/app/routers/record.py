@@ -1,17 +1,50 @@
+import json
+import math
+import time
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-
-from ..services.cosmos import CosmosService
-from ..dependencies import get_settings
-
-from ..models import Record, Settings
+from time import perf_counter
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Callable, List
+from azure.cosmos.exceptions import CosmosHttpResponseError
+
+from ..observability import TimedRoute, phase
+from ..services.clients import ClientPool
+from ..services.codec import DataCodec
+from ..services.cosmos import CosmosService, RecordTypeConflict, is_tombstone
+from ..services.events import RESYNC, ChangeHub
+from ..services.spill import DataSpill
+from ..services.validation import DataSchema, DataValidator, get_data_validator
+from ..services.storage import StorageService
+from ..observability.metrics import CONCURRENCY_LIMIT, SHED
+from ..services.limiter import AdaptiveLimiter
+from ..services.patch import (
+    JSON_PATCH,
+    MERGE_PATCH,
+    PatchError,
+    apply_operations,
+    json_patch_operations,
+    merge_patch_operations,
+)
+from ..dependencies import (
+    get_change_hub,
+    get_client_pool,
+    get_concurrency_limiter,
+    get_data_codec,
+    get_settings,
+)
+from .storage import get_storage_service
+
+from ..models import Record, RecordBatch, RecordBatchRequest, RecordChanges, Settings
 
 
 def get_record_service(
     container: str,
     type: str,
     settings: Settings,
+    pool: ClientPool | None = None,
+    codec: DataCodec | None = None,
+    shared: bool = False,
 ) -> CosmosService:
     """Get a RecordService instance for records."""
     return CosmosService(
@@ -19,11 +52,99 @@ def get_record_service(
         database_name=settings.database_name,
         container_name=container,
         type=type,
+        pool=pool,
+        codec=codec,
+        tombstone_ttl=settings.record_tombstone_ttl,
+        shared=shared,
     )
 
 
-async def create_record(record: Record, service: CosmosService) -> Record:
+# patch precondition: the record's data is stored inline and uncompressed
+INLINE_DATA_FILTER = (
+    "FROM c WHERE (NOT IS_DEFINED(c.data_ref) OR IS_NULL(c.data_ref))"
+    " AND NOT IS_DEFINED(c.data_zstd)"
+)
+
+# statuses that tell clients (and the limiter) to back off
+OVERLOAD_STATUSES = {429, 503}
+
+
+def _http_error(error: Exception, action: str) -> HTTPException:
+    """Map a failed Cosmos call to an HTTP error.
+
+    Cosmos throttling (429) is passed through with its retry hint so that
+    clients back off; an ID taken by another record type in a shared
+    container is a 409; anything else is a 500.
+    """
+    if isinstance(error, RecordTypeConflict):
+        return HTTPException(status_code=409, detail=f"Failed to {action}: {error}")
+    if isinstance(error, CosmosHttpResponseError) and error.status_code == 429:
+        retry_ms = float(error.headers.get("x-ms-retry-after-ms", 1000))
+        return HTTPException(
+            status_code=429,
+            detail=f"Failed to {action}: request rate is too large",
+            headers={"Retry-After": str(max(1, math.ceil(retry_ms / 1000)))},
+        )
+    return HTTPException(status_code=500, detail=f"Failed to {action}: {str(error)}")
+
+
+class LimitedRoute(TimedRoute):
+    """Record route behind the process-wide adaptive concurrency limit.
+
+    Requests over the limit get an immediate 503 with Retry-After instead
+    of queueing in the event loop. Slow and throttled responses shrink the
+    limit, healthy ones grow it back.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        limiter: AdaptiveLimiter | None = get_concurrency_limiter()
+        if limiter is None:
+            return handler
+        route = self.path
+
+        async def limited_handler(request: Request) -> Response:
+            if not limiter.try_acquire():
+                SHED.labels(route).inc()
+                return JSONResponse(
+                    status_code=503,
+                    content={"detail": "Server is busy, retry shortly"},
+                    headers={"Retry-After": "1"},
+                )
+            start = perf_counter()
+            overloaded = False
+            try:
+                response = await handler(request)
+                overloaded = response.status_code in OVERLOAD_STATUSES
+                return response
+            except HTTPException as e:
+                overloaded = e.status_code in OVERLOAD_STATUSES
+                raise
+            finally:
+                limiter.release(perf_counter() - start, overloaded)
+                CONCURRENCY_LIMIT.set(int(limiter.limit))
+
+        return limited_handler
+
+
+def validate_data(record: Record, validator: DataValidator | None) -> None:
+    """Reject data that does not match the type's schema with a 422."""
+    if validator is None:
+        return
+    with phase("validate"):
+        errors = validator.errors(record.data)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+
+async def create_record(
+    record: Record,
+    service: CosmosService,
+    spill: DataSpill | None = None,
+    validator: DataValidator | None = None,
+) -> Record:
     """Create a new record."""
+    validate_data(record, validator)
     try:
         # Ensure container exists
         await service.create_container_if_not_exists(partition_key_path="/id")
@@ -32,44 +153,108 @@ async def create_record(record: Record, service: CosmosService) -> Record:
             # Generate a new ID if not provided
             record.id = f"{record.name.lower().replace(' ', '-')}-{str(uuid.uuid4()).replace('-', '')[:8]}"
 
-        # Upsert the record
+        # Upsert the record, keeping oversized data in blob storage
         record.type = service.type
+        # only the spill sets the reference; clients cannot point at a blob
+        record.data_ref = None
+        data = record.data
+        if spill is not None:
+            await spill.store(record, service.type)
         result = await service.upsert_item(record)
-        return Record.model_validate(result.model_dump())
+        with phase("validate"):
+            created = Record.model_validate(result.model_dump())
+        created.data = data
+        return created
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to create record: {str(e)}"
-        )
+        raise _http_error(e, "create record")
 
 
-async def get_record(record_id: str, service: CosmosService) -> Record:
+async def get_record(
+    record_id: str,
+    service: CosmosService,
+    spill: DataSpill | None = None,
+    include_data: bool = True,
+) -> Record:
     """Get a record by ID."""
     try:
         result = await service.get_item(record_id)
         if result is None:
             raise HTTPException(status_code=404, detail="Record not found")
-        return Record.model_validate(result.model_dump())
+        with phase("validate"):
+            record = Record.model_validate(result.model_dump())
+        if not include_data:
+            record.data = {}
+        elif spill is not None:
+            await spill.load(record)
+        return record
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get record: {str(e)}")
+        raise _http_error(e, "get record")
 
 
-async def list_records(service: CosmosService) -> List[Record]:
+async def list_records(
+    service: CosmosService,
+    spill: DataSpill | None = None,
+    include_data: bool = True,
+) -> List[Record]:
     """List all records."""
     try:
         results = await service.get_items()
-        return [Record.model_validate(item.model_dump()) for item in results]
+        with phase("validate"):
+            records = [Record.model_validate(item.model_dump()) for item in results]
+        if not include_data:
+            for record in records:
+                record.data = {}
+        elif spill is not None:
+            await spill.load_all(records)
+        return records
+    except Exception as e:
+        raise _http_error(e, "list records")
+
+
+async def get_records(
+    record_ids: list[str],
+    service: CosmosService,
+    spill: DataSpill | None = None,
+    include_data: bool = True,
+) -> RecordBatch:
+    """Get many records by ID, reporting the IDs that do not exist."""
+    try:
+        # keep the caller's order and drop repeats
+        record_ids = list(dict.fromkeys(record_ids))
+        if not record_ids:
+            return RecordBatch()
+        results = await service.read_items(record_ids)
+        with phase("validate"):
+            found = {
+                record.id: record
+                for record in (
+                    Record.model_validate(item.model_dump()) for item in results
+                )
+            }
+        records = [found[id] for id in record_ids if id in found]
+        if not include_data:
+            for record in records:
+                record.data = {}
+        elif spill is not None:
+            await spill.load_all(records)
+        return RecordBatch(
+            items=records, missing=[id for id in record_ids if id not in found]
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to list records: {str(e)}")
+        raise _http_error(e, "get records")
 
 
 async def update_record(
     record_id: str,
     record: Record,
     service: CosmosService,
+    spill: DataSpill | None = None,
+    validator: DataValidator | None = None,
 ) -> Record:
     """Update a record by ID."""
+    validate_data(record, validator)
     try:
         # Check if record exists
         existing = await service.get_item(record_id)
@@ -78,21 +263,124 @@ async def update_record(
 
         # Update the record ID to match the path parameter
         record.id = record_id
+        record.type = service.type
+        record.data_ref = None
 
-        # Upsert the updated record
+        # Upsert the updated record, keeping oversized data in blob storage
+        data = record.data
+        if spill is not None:
+            await spill.store(record, service.type)
         result = await service.upsert_item(record)
-        return Record.model_validate(result.model_dump())
+        with phase("validate"):
+            updated = Record.model_validate(result.model_dump())
+        if spill is not None:
+            previous = Record.model_validate(existing.model_dump()).data_ref
+            await spill.discard(previous, keep=updated.data_ref)
+        updated.data = data
+        return updated
     except HTTPException:
         raise
     except Exception as e:
+        raise _http_error(e, "update record")
+
+
+async def validate_patch(
+    record_id: str,
+    operations: list[dict],
+    service: CosmosService,
+    validator: DataValidator,
+) -> str:
+    """Check the data a patch would produce against the type's schema.
+
+    The patch is applied to the current record first, and a 422 raised if
+    the result does not validate. Returns the patch precondition, which
+    also pins the record's ETag so the validated version is what Cosmos
+    patches.
+    """
+    existing = await service.get_item(record_id)
+    if existing is None:
+        raise HTTPException(status_code=404, detail="Record not found")
+    document = existing.model_dump()
+    if document.get("data_ref"):
         raise HTTPException(
-            status_code=500, detail=f"Failed to update record: {str(e)}"
+            status_code=409,
+            detail="Record data is stored in blob storage; use PUT to change it",
         )
+    with phase("validate"):
+        patched = apply_operations(document, operations)
+    validate_data(Record.model_validate(patched), validator)
+    return f"{INLINE_DATA_FILTER} AND c._etag = {json.dumps(document['_etag'])}"
+
+
+async def patch_record(
+    record_id: str,
+    content_type: str,
+    patch: object,
+    service: CosmosService,
+    spill: DataSpill | None = None,
+    validator: DataValidator | None = None,
+) -> Record:
+    """Partially update a record with a JSON Patch or merge patch."""
+    try:
+        if content_type == JSON_PATCH:
+            operations = json_patch_operations(patch)
+        else:
+            operations = merge_patch_operations(patch)
+        # data kept in blob storage cannot be patched in place
+        touches_data = any(op["path"].startswith("/data") for op in operations)
+        filter_predicate = INLINE_DATA_FILTER if touches_data else None
+        if touches_data and validator is not None:
+            filter_predicate = await validate_patch(
+                record_id, operations, service, validator
+            )
+        result = await service.patch_item(
+            record_id, operations, filter_predicate=filter_predicate
+        )
+        if result is None:
+            raise HTTPException(status_code=404, detail="Record not found")
+        with phase("validate"):
+            record = Record.model_validate(result.model_dump())
+        if spill is not None:
+            await spill.load(record)
+        return record
+    except HTTPException:
+        raise
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CosmosHttpResponseError as e:
+        if e.status_code == 412:
+            # the precondition also fails for deleted records
+            try:
+                existing = await service.get_item(record_id)
+            except Exception as lookup_error:
+                raise _http_error(lookup_error, "patch record")
+            if existing is None:
+                raise HTTPException(status_code=404, detail="Record not found")
+            if touches_data and validator is not None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Record changed while it was patched, or its data is "
+                    "stored compressed or in blob storage",
+                )
+            raise HTTPException(
+                status_code=409,
+                detail="Record data is stored compressed or in blob storage; "
+                "use PUT to change it",
+            )
+        if e.status_code == 400:
+            # e.g. removing or incrementing a path that does not exist
+            raise HTTPException(
+                status_code=400, detail=f"Failed to patch record: {e.message}"
+            )
+        raise _http_error(e, "patch record")
+    except Exception as e:
+        raise _http_error(e, "patch record")
 
 
 async def delete_record(
     record_id: str,
     service: CosmosService,
+    spill: DataSpill | None = None,
 ) -> dict:
     """Delete a record by ID."""
     try:
@@ -101,21 +389,65 @@ async def delete_record(
         if existing is None:
             raise HTTPException(status_code=404, detail="Record not found")
 
-        # Delete the record
-        async with service.get_cosmos_client() as container:
-            await container.delete_item(item=record_id, partition_key=record_id)
+        # Delete the record and any data it kept in blob storage
+        await service.delete_item(record_id)
+        if spill is not None:
+            await spill.discard(Record.model_validate(existing.model_dump()).data_ref)
 
         return {"message": f"Record {record_id} deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
+        raise _http_error(e, "delete record")
+
+
+async def get_changes(
+    since: str | None,
+    limit: int,
+    service: CosmosService,
+    spill: DataSpill | None = None,
+    include_data: bool = True,
+) -> RecordChanges:
+    """Get records created, updated or deleted since a changes token."""
+    try:
+        start = int(since) if since else 0
+        if start < 0:
+            raise ValueError(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid changes token")
+    if (
+        start
+        and service.tombstone_ttl > 0
+        and start < time.time() - service.tombstone_ttl
+    ):
+        # deletes from before the token may have expired already
         raise HTTPException(
-            status_code=500, detail=f"Failed to delete record: {str(e)}"
+            status_code=410, detail="Changes token has expired; list all records"
         )
+    try:
+        results, resume, more = await service.changed_since(start, limit)
+        changes = RecordChanges(token=str(resume), more=more)
+        with phase("validate"):
+            for item in results:
+                document = item.model_dump()
+                if is_tombstone(document):
+                    changes.deleted.append(document["id"])
+                else:
+                    changes.items.append(Record.model_validate(document))
+        if not include_data:
+            for record in changes.items:
+                record.data = {}
+        elif spill is not None:
+            await spill.load_all(changes.items)
+        return changes
+    except Exception as e:
+        raise _http_error(e, "get changes")
 
 
 async def get_default_record(
     service: CosmosService,
+    spill: DataSpill | None = None,
+    include_data: bool = True,
 ) -> Record:
     """Get the default record."""
     try:
@@ -126,18 +458,23 @@ async def get_default_record(
             raise HTTPException(status_code=404, detail="No default record found")
 
         # Return the first default record found
-        return Record.model_validate(results[0].model_dump())
+        with phase("validate"):
+            record = Record.model_validate(results[0].model_dump())
+        if not include_data:
+            record.data = {}
+        elif spill is not None:
+            await spill.load(record)
+        return record
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to get default record: {str(e)}"
-        )
+        raise _http_error(e, "get default record")
 
 
 async def set_default_record(
     record_id: str,
     service: CosmosService,
+    spill: DataSpill | None = None,
 ) -> Record:
     """Set a record as the default one."""
     try:
@@ -152,29 +489,120 @@ async def set_default_record(
         # Then set this record as default
         record_dict = existing.model_dump()
         record_dict["default"] = True
-        updated_record = Record.model_validate(record_dict)
+        with phase("validate"):
+            updated_record = Record.model_validate(record_dict)
 
         result = await service.upsert_item(updated_record)
-        return Record.model_validate(result.model_dump())
+        with phase("validate"):
+            record = Record.model_validate(result.model_dump())
+        if spill is not None:
+            await spill.load(record)
+        return record
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to set default record: {str(e)}"
-        )
+        raise _http_error(e, "set default record")
+
+
+# changes read per poll of an event stream hub
+EVENTS_PAGE = 100
+
+RESYNC_EVENT = "event: resync\ndata: {}\n\n"
+
+
+def encode_change(document: dict, token: str) -> str:
+    """Encode a changed document as a server-sent event.
 
+    Events carry the record without its data; clients fetch the record when
+    they need it.
+    """
+    if is_tombstone(document):
+        event, data = "delete", json.dumps({"id": document["id"]})
+    else:
+        record = Record.model_validate(document)
+        record.data = {}
+        event, data = "change", record.model_dump_json()
+    return f"id: {token}\nevent: {event}\ndata: {data}\n\n"
 
-def create_router(database: str, type: str) -> APIRouter:
 
-    router = APIRouter(prefix=f"/{type}", tags=[type])
+def create_change_hub(service: CosmosService, settings: Settings) -> ChangeHub:
+    """Create the hub polling a record container for its event streams."""
+
+    async def source(since: int) -> tuple[list[dict], int, bool]:
+        items, resume, more = await service.changed_since(since, EVENTS_PAGE)
+        return [item.model_dump() for item in items], resume, more
+
+    return ChangeHub(
+        source=source,
+        encode=encode_change,
+        interval=settings.record_events_interval,
+        queue_size=settings.record_events_queue,
+        now=lambda: int(time.time()),
+    )
+
+
+async def stream_changes(
+    hub: ChangeHub,
+    request: Request,
+    last_event_id: str | None,
+    keepalive: float,
+):
+    """Stream a hub's events to one client until it disconnects."""
+    async with hub.subscribe() as subscription:
+        if last_event_id is not None and last_event_id != hub.token:
+            # reconnected after missing changes
+            yield RESYNC_EVENT
+        yield f"id: {hub.token}\nevent: ready\ndata: {{}}\n\n"
+        while not await request.is_disconnected():
+            event = await subscription.get(timeout=keepalive)
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event == RESYNC:
+                yield RESYNC_EVENT
+            else:
+                yield event
+
+
+def get_data_spill(
+    settings: Settings = Depends(get_settings),
+    storage: StorageService = Depends(get_storage_service),
+) -> DataSpill | None:
+    """Get the blob spill for oversized record data, or None when disabled.
+
+    Without blob storage configured, records keep all their data inline.
+    """
+    if settings.record_data_spill_bytes <= 0 or not storage.configured:
+        return None
+    return DataSpill(storage, settings.record_data_spill_bytes)
+
+
+# ?include_data=false skips loading data, including data kept in blob storage
+INCLUDE_DATA = Query(True, description="Return the record data")
+
+
+def create_router(
+    database: str,
+    type: str,
+    shared: bool = False,
+    data_schema: DataSchema | None = None,
+) -> APIRouter:
+
+    router = APIRouter(prefix=f"/{type}", tags=[type], route_class=LimitedRoute)
+    # compiled once, when the router is built
+    validator = get_data_validator(data_schema) if data_schema else None
 
     def get_api_service(
         settings=Depends(get_settings),
+        pool=Depends(get_client_pool),
+        codec=Depends(get_data_codec),
     ) -> CosmosService:
         return get_record_service(
             container=database,
             settings=settings,
             type=type,
+            pool=pool,
+            codec=codec,
+            shared=shared,
         )
 
     @router.post(
@@ -187,9 +615,10 @@ def create_router(database: str, type: str) -> APIRouter:
     async def create_api(
         record: Record,
         service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
     ) -> Record:
         f"""Create a new {type}."""
-        return await create_record(record, service)
+        return await create_record(record, service, spill, validator)
 
     @router.get(
         "/{id}/",
@@ -200,10 +629,12 @@ def create_router(database: str, type: str) -> APIRouter:
     )
     async def get_api(
         id: str,
+        include_data: bool = INCLUDE_DATA,
         service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
     ) -> Record:
         f"""Get a {type} by ID."""
-        return await get_record(id, service)
+        return await get_record(id, service, spill, include_data)
 
     @router.get(
         "/",
@@ -213,10 +644,82 @@ def create_router(database: str, type: str) -> APIRouter:
         description=f"List all {type}s.",
     )
     async def list_api(
+        include_data: bool = INCLUDE_DATA,
         service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
     ) -> list[Record]:
         f"""List all {type}s."""
-        return await list_records(service)
+        return await list_records(service, spill, include_data)
+
+    @router.post(
+        "/_get",
+        response_model=RecordBatch,
+        tags=[type],
+        summary=f"Get many {type}s by ID",
+        description=(
+            f"Get up to 256 {type}s in one batched read. IDs that do not exist "
+            "are listed in `missing` instead of failing the request."
+        ),
+    )
+    async def get_many_api(
+        request: RecordBatchRequest,
+        include_data: bool = INCLUDE_DATA,
+        service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
+    ) -> RecordBatch:
+        f"""Get many {type}s by ID."""
+        return await get_records(request.ids, service, spill, include_data)
+
+    @router.get(
+        "/_changes",
+        response_model=RecordChanges,
+        tags=[type],
+        summary=f"Get {type} changes since a token",
+        description=(
+            f"Get the {type}s created, updated or deleted since `since`, the "
+            "token returned by the previous call; leave it out to start from "
+            "the beginning. Changes in the newest second may be returned "
+            "again. Tokens older than the tombstone TTL get a 410 and the "
+            "client should list everything again."
+        ),
+    )
+    async def changes_api(
+        since: str | None = Query(None, description="Token from the last call"),
+        limit: int = Query(100, ge=1, le=1000, description="Page size"),
+        include_data: bool = INCLUDE_DATA,
+        service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
+    ) -> RecordChanges:
+        f"""Get {type} changes since a token."""
+        return await get_changes(since, limit, service, spill, include_data)
+
+    @router.get(
+        "/_events",
+        response_class=StreamingResponse,
+        tags=[type],
+        summary=f"Stream {type} changes",
+        description=(
+            f"Server-sent events for {type}s: `change` with the record (without "
+            "data) when one is created, updated or made the default, `delete` "
+            "with its ID, and `resync` when the client fell behind or missed "
+            "changes while disconnected and should list everything again."
+        ),
+    )
+    async def events_api(
+        request: Request,
+        last_event_id: str | None = Header(None),
+        settings: Settings = Depends(get_settings),
+        service: CosmosService = Depends(get_api_service),
+    ) -> StreamingResponse:
+        f"""Stream {type} changes."""
+        hub = get_change_hub(type, lambda: create_change_hub(service, settings))
+        return StreamingResponse(
+            stream_changes(
+                hub, request, last_event_id, settings.record_events_keepalive
+            ),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @router.put(
         "/{id}/",
@@ -229,9 +732,51 @@ def create_router(database: str, type: str) -> APIRouter:
         id: str,
         design: Record,
         service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
     ) -> Record:
         f"""Update a {type} by ID."""
-        return await update_record(id, design, service)
+        return await update_record(id, design, service, spill, validator)
+
+    @router.patch(
+        "/{id}/",
+        response_model=Record,
+        tags=[type],
+        summary=f"Partially update a {type} by ID",
+        description=(
+            f"Partially update a {type} with a JSON Patch ({JSON_PATCH}) or a "
+            f"merge patch ({MERGE_PATCH}). Only name, description and data can "
+            "be changed, with at most 10 operations per request."
+        ),
+        openapi_extra={
+            "requestBody": {
+                "required": True,
+                "content": {
+                    JSON_PATCH: {
+                        "schema": {"type": "array", "items": {"type": "object"}}
+                    },
+                    MERGE_PATCH: {"schema": {"type": "object"}},
+                },
+            }
+        },
+    )
+    async def patch_api(
+        id: str,
+        request: Request,
+        service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
+    ) -> Record:
+        f"""Partially update a {type} by ID."""
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if content_type not in (JSON_PATCH, MERGE_PATCH):
+            raise HTTPException(
+                status_code=415,
+                detail=f"Use {JSON_PATCH} or {MERGE_PATCH}",
+            )
+        try:
+            patch = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        return await patch_record(id, content_type, patch, service, spill, validator)
 
     @router.delete(
         "/{id}/",
@@ -243,9 +788,10 @@ def create_router(database: str, type: str) -> APIRouter:
     async def delete_api(
         id: str,
         service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
     ) -> dict:
         f"""Delete a {type} by ID."""
-        await delete_record(id, service)
+        await delete_record(id, service, spill)
         return {"message": f"{type} {id} deleted successfully"}
 
     @router.get(
@@ -256,10 +802,12 @@ def create_router(database: str, type: str) -> APIRouter:
         description=f"Get the default {type}.",
     )
     async def get_default_api(
+        include_data: bool = INCLUDE_DATA,
         service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
     ) -> Record:
         f"""Get the default {type}."""
-        return await get_default_record(service)
+        return await get_default_record(service, spill, include_data)
 
     @router.patch(
         "/{id}/default/",
@@ -271,8 +819,9 @@ def create_router(database: str, type: str) -> APIRouter:
     async def set_default_api(
         id: str,
         service: CosmosService = Depends(get_api_service),
+        spill: DataSpill | None = Depends(get_data_spill),
     ) -> Record:
         f"""Set a {type} as the default {type}."""
-        return await set_default_record(id, service)
+        return await set_default_record(id, service, spill)
 
     return router
@@ -0,0 +1,631 @@
+import mimetypes
+from datetime import timedelta
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobSasPermissions
+
+from ..services.storage import StorageService
+from ..imaging import FORMATS
+from ..services.images import VARIANT_PATTERN
+from ..services.cache import BlobCache
+from ..services.uploads import UploadQueue
+from ..services.archive import zip_blobs
+from ..services.clients import ClientPool
+from ..dependencies import (
+    get_blob_cache,
+    get_client_pool,
+    get_settings,
+    get_upload_queue,
+)
+
+from ..models import (
+    BlobInfo,
+    BlobPage,
+    SasGrant,
+    SasUploadRequest,
+    Settings,
+    UploadSession,
+    UploadSessionRequest,
+)
+
+# default extension per blob folder
+EXTENSIONS = {"images": "png", "videos": "mp4"}
+
+
+def is_media_blob(name: str) -> bool:
+    """Only blobs under the images/ and videos/ conventions are exposed."""
+    parts = name.split("/")
+    return len(parts) > 1 and parts[0] in EXTENSIONS and ".." not in parts
+
+
+def get_storage_service(
+    settings: Settings = Depends(get_settings),
+    cache: BlobCache | None = Depends(get_blob_cache),
+    uploads: UploadQueue | None = Depends(get_upload_queue),
+    pool: ClientPool = Depends(get_client_pool),
+) -> StorageService:
+    """Get a StorageService instance for the configured container."""
+    return StorageService(
+        client_id=settings.client_id,
+        storage=settings.storage_connection,
+        container=settings.storage_container,
+        dedupe=settings.storage_dedupe,
+        variant_widths=settings.image_variant_widths,
+        variant_formats=settings.image_variant_formats,
+        cache=cache,
+        uploads=uploads,
+        pool=pool,
+    )
+
+
+async def get_image_variant(
+    name: str,
+    width: int,
+    format: str,
+    service: StorageService,
+    settings: Settings,
+) -> Response:
+    """Get a resized derivative of a stored image."""
+    if not name.startswith("images/"):
+        raise HTTPException(status_code=404, detail="Image not found")
+    if width not in settings.image_variant_widths:
+        raise HTTPException(status_code=400, detail=f"Unsupported width {width}")
+    if format not in settings.image_variant_formats or format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format {format}")
+
+    try:
+        data = await service.get_image_variant(name, width, format)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get image variant: {str(e)}"
+        )
+
+    # blob names are unique per upload, so a variant never changes
+    return Response(
+        content=data,
+        media_type=FORMATS[format][1],
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single `bytes=` Range header into an inclusive (start, end).
+
+    Returns None when the header should be ignored and the whole blob sent,
+    and raises 416 when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        # multiple ranges are not supported; a full response is valid
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # suffix range: the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in tags
+
+
+async def download_blob(
+    name: str,
+    range: str | None,
+    if_none_match: str | None,
+    if_range: str | None,
+    service: StorageService,
+) -> Response:
+    """Stream a media blob with Range and conditional request support."""
+    if not is_media_blob(name):
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    spooled = service.uploads.spooled(name) if service.uploads else None
+    if spooled is not None:
+        # handed out but not in storage yet; serve the spooled bytes
+        return Response(
+            content=spooled.data,
+            media_type=spooled.content_type,
+            headers={"Cache-Control": "no-store"},
+        )
+    try:
+        properties = await service.get_blob_properties(name)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get blob: {str(e)}")
+
+    etag = properties.etag
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if properties.last_modified:
+        headers["Last-Modified"] = properties.last_modified.strftime(
+            "%a, %d %b %Y %H:%M:%S GMT"
+        )
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    size = properties.size
+    byte_range = None
+    if range and (not if_range or if_range == etag):
+        byte_range = parse_range(range, size)
+
+    media_type = (
+        properties.content_settings.content_type
+        or mimetypes.guess_type(name)[0]
+        or "application/octet-stream"
+    )
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            service.download_blob_chunks(name, etag=etag),
+            media_type=media_type,
+            headers=headers,
+        )
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        service.download_blob_chunks(
+            name, offset=start, length=end - start + 1, etag=etag
+        ),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def to_blob_info(blob) -> BlobInfo:
+    metadata = blob.metadata or {}
+    return BlobInfo(
+        name=blob.name,
+        size=blob.size,
+        content_type=blob.content_settings.content_type,
+        created=blob.creation_time,
+        width=metadata.get("width"),
+        height=metadata.get("height"),
+        variants=[v for v in metadata.get("variants", "").split(",") if v],
+    )
+
+
+async def list_blobs(
+    prefix: str,
+    limit: int,
+    token: str | None,
+    service: StorageService,
+) -> BlobPage:
+    """List one page of images or videos under a path.
+
+    Everything comes from the listing call itself, including the dimensions
+    and variants written to blob metadata at upload. Derivatives are left
+    out, so a page may hold fewer than `limit` items.
+    """
+    prefix = prefix.strip("/")
+    if prefix.split("/", 1)[0] not in EXTENSIONS or ".." in prefix.split("/"):
+        raise HTTPException(status_code=404, detail="Path not found")
+    try:
+        blobs, next_token = await service.list_blob_page(f"{prefix}/", limit, token)
+        return BlobPage(
+            items=[
+                to_blob_info(blob)
+                for blob in blobs
+                if not VARIANT_PATTERN.search(blob.name)
+            ],
+            continuation_token=next_token,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list blobs: {str(e)}")
+
+
+async def get_upload_status(
+    name: str,
+    wait: float,
+    uploads: UploadQueue | None,
+    service: StorageService,
+) -> dict:
+    """Report whether a write-behind upload has reached storage.
+
+    Uploads this process never saw are looked up in storage: `uploaded` if
+    the blob is there, otherwise `unknown`. The spool is per process, so
+    behind a load balancer a replica other than the one that took the
+    upload answers `unknown` until the blob lands.
+    """
+    if uploads is None:
+        raise HTTPException(status_code=404, detail="Write-behind is disabled")
+    status = await uploads.wait(name, timeout=wait) if wait else uploads.status(name)
+    if status is None and is_media_blob(name):
+        try:
+            await service.get_blob_properties(name)
+            status = "uploaded"
+        except ResourceNotFoundError:
+            status = "unknown"
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to get blob: {str(e)}")
+    return {"name": name, "status": status or "unknown"}
+
+
+async def create_upload_session(
+    request: UploadSessionRequest,
+    service: StorageService,
+) -> UploadSession:
+    """Reserve a blob name and start a resumable upload to it."""
+    blob_name = service.reserve_blob_name(
+        request.kind, request.extension or EXTENSIONS[request.kind], request.path
+    )
+    try:
+        return await service.create_upload_session(
+            blob_name, request.length, request.content_type
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create upload: {str(e)}"
+        )
+
+
+async def get_upload_session(session_id: str, service: StorageService) -> UploadSession:
+    """Get a resumable upload and the offset to resume it from."""
+    try:
+        return await service.get_upload_session(session_id)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get upload: {str(e)}")
+
+
+async def upload_chunk(
+    session_id: str,
+    offset: int,
+    request: Request,
+    service: StorageService,
+    settings: Settings,
+) -> Response:
+    """Stage one chunk of a resumable upload at a byte offset.
+
+    Chunks may arrive in any order or in parallel; the returned
+    Upload-Offset is where the contiguous upload currently ends.
+    """
+    session = await get_upload_session(session_id, service)
+    limit = settings.storage_upload_chunk_bytes
+    if offset < 0 or offset >= session.length:
+        raise HTTPException(status_code=409, detail="Offset outside the upload")
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise HTTPException(status_code=413, detail=f"Chunks are limited to {limit}")
+
+    data = bytearray()
+    async for piece in request.stream():
+        data += piece
+        if len(data) > limit:
+            raise HTTPException(
+                status_code=413, detail=f"Chunks are limited to {limit}"
+            )
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty chunk")
+    if offset + len(data) > session.length:
+        raise HTTPException(status_code=409, detail="Chunk runs past the upload")
+
+    try:
+        await service.stage_upload_chunk(session, offset, bytes(data))
+        session = await service.get_upload_session(session_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to upload chunk: {str(e)}")
+    return Response(status_code=204, headers=upload_headers(session))
+
+
+async def finalize_upload(session_id: str, service: StorageService) -> UploadSession:
+    """Commit a resumable upload once every byte has been staged."""
+    session = await get_upload_session(session_id, service)
+    if session.offset != session.length:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete at {session.offset} of {session.length} bytes",
+            headers=upload_headers(session),
+        )
+    try:
+        if not await service.finalize_upload(session):
+            raise HTTPException(status_code=409, detail="Upload incomplete")
+        return session
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to finalize upload: {str(e)}"
+        )
+
+
+def upload_headers(session: UploadSession) -> dict[str, str]:
+    return {
+        "Upload-Offset": str(session.offset),
+        "Upload-Length": str(session.length),
+        "Cache-Control": "no-store",
+    }
+
+
+async def export_blobs(
+    prefix: str,
+    service: StorageService,
+    settings: Settings,
+) -> StreamingResponse:
+    """Stream every blob under an images/ or videos/ path as a ZIP archive."""
+    prefix = prefix.strip("/")
+    if not is_media_blob(prefix):
+        raise HTTPException(status_code=404, detail="Path not found")
+
+    filename = prefix.replace("/", "-")
+    return StreamingResponse(
+        zip_blobs(service, f"{prefix}/", settings.storage_export_concurrency),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.zip"'},
+    )
+
+
+async def create_upload_sas(
+    request: SasUploadRequest,
+    service: StorageService,
+    settings: Settings,
+) -> SasGrant:
+    """Reserve a blob name and mint a write-only SAS URL for it."""
+    blob_name = service.reserve_blob_name(
+        request.kind, request.extension or EXTENSIONS[request.kind], request.path
+    )
+    try:
+        url, expires_on = await service.generate_sas_url(
+            blob_name,
+            BlobSasPermissions(create=True, write=True),
+            timedelta(minutes=settings.storage_sas_minutes),
+        )
+        return SasGrant(blob_name=blob_name, url=url, expires_on=expires_on)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create upload URL: {str(e)}"
+        )
+
+
+async def create_download_sas(
+    name: str,
+    service: StorageService,
+    settings: Settings,
+) -> SasGrant:
+    """Mint a read-only SAS URL for an existing blob name."""
+    if not is_media_blob(name):
+        raise HTTPException(status_code=404, detail="Blob not found")
+    try:
+        url, expires_on = await service.generate_sas_url(
+            name,
+            BlobSasPermissions(read=True),
+            timedelta(minutes=settings.storage_sas_minutes),
+        )
+        return SasGrant(blob_name=name, url=url, expires_on=expires_on)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create download URL: {str(e)}"
+        )
+
+
+def create_storage_router() -> APIRouter:
+
+    router = APIRouter(prefix="/storage", tags=["storage"])
+
+    @router.get(
+        "/variants/{name:path}",
+        response_class=Response,
+        summary="Get an image variant",
+        description="Get a resized derivative of a stored image by width and format.",
+    )
+    async def get_variant_api(
+        name: str,
+        width: int = Query(...),
+        format: str = Query(default="webp"),
+        service: StorageService = Depends(get_storage_service),
+        settings: Settings = Depends(get_settings),
+    ) -> Response:
+        """Get an image variant."""
+        return await get_image_variant(name, width, format, service, settings)
+
+    @router.post(
+        "/sas/",
+        response_model=SasGrant,
+        summary="Create a direct upload URL",
+        description="Reserve a blob name and get a short-lived URL to upload it directly to storage.",
+    )
+    async def create_upload_sas_api(
+        request: SasUploadRequest,
+        service: StorageService = Depends(get_storage_service),
+        settings: Settings = Depends(get_settings),
+    ) -> SasGrant:
+        """Create a direct upload URL."""
+        return await create_upload_sas(request, service, settings)
+
+    @router.get(
+        "/sas/{name:path}",
+        response_model=SasGrant,
+        summary="Create a direct download URL",
+        description="Get a short-lived URL to download a blob directly from storage.",
+    )
+    async def create_download_sas_api(
+        name: str,
+        service: StorageService = Depends(get_storage_service),
+        settings: Settings = Depends(get_settings),
+    ) -> SasGrant:
+        """Create a direct download URL."""
+        return await create_download_sas(name, service, settings)
+
+    @router.get(
+        "/blobs/{name:path}",
+        response_class=StreamingResponse,
+        summary="Download a blob",
+        description="Stream an image or video, honoring Range and If-None-Match headers.",
+    )
+    async def download_blob_api(
+        name: str,
+        range: str | None = Header(default=None),
+        if_none_match: str | None = Header(default=None),
+        if_range: str | None = Header(default=None),
+        service: StorageService = Depends(get_storage_service),
+    ) -> Response:
+        """Download a blob."""
+        return await download_blob(name, range, if_none_match, if_range, service)
+
+    @router.get(
+        "/list/{prefix:path}",
+        response_model=BlobPage,
+        summary="List blobs",
+        description="List images or videos under a path, one page at a time.",
+    )
+    async def list_blobs_api(
+        prefix: str,
+        limit: int = Query(default=100, ge=1, le=1000),
+        token: str | None = Query(default=None),
+        service: StorageService = Depends(get_storage_service),
+    ) -> BlobPage:
+        """List blobs."""
+        return await list_blobs(prefix, limit, token, service)
+
+    @router.get(
+        "/export/{prefix:path}",
+        response_class=StreamingResponse,
+        summary="Export blobs as a ZIP archive",
+        description="Stream every image or video under a path as a ZIP archive.",
+    )
+    async def export_blobs_api(
+        prefix: str,
+        service: StorageService = Depends(get_storage_service),
+        settings: Settings = Depends(get_settings),
+    ) -> StreamingResponse:
+        """Export blobs as a ZIP archive."""
+        return await export_blobs(prefix, service, settings)
+
+    @router.get(
+        "/pending/{name:path}",
+        response_model=dict,
+        summary="Get the status of a write-behind upload",
+        description="Whether a returned blob name has reached storage, optionally waiting for it.",
+    )
+    async def get_upload_status_api(
+        name: str,
+        wait: float = Query(default=0, ge=0, le=30),
+        uploads: UploadQueue | None = Depends(get_upload_queue),
+        service: StorageService = Depends(get_storage_service),
+    ) -> dict:
+        """Get the status of a write-behind upload."""
+        return await get_upload_status(name, wait, uploads, service)
+
+    @router.post(
+        "/uploads/",
+        response_model=UploadSession,
+        status_code=201,
+        summary="Start a resumable upload",
+        description="Reserve a blob name and open a session that accepts chunks by offset.",
+    )
+    async def create_upload_session_api(
+        request: UploadSessionRequest,
+        response: Response,
+        service: StorageService = Depends(get_storage_service),
+    ) -> UploadSession:
+        """Start a resumable upload."""
+        session = await create_upload_session(request, service)
+        response.headers["Location"] = f"{router.prefix}/uploads/{session.id}"
+        return session
+
+    @router.head(
+        "/uploads/{id}",
+        summary="Get the offset of a resumable upload",
+        description="Upload-Offset and Upload-Length headers for resuming an upload.",
+    )
+    async def head_upload_session_api(
+        id: str,
+        service: StorageService = Depends(get_storage_service),
+    ) -> Response:
+        """Get the offset of a resumable upload."""
+        session = await get_upload_session(id, service)
+        return Response(status_code=200, headers=upload_headers(session))
+
+    @router.get(
+        "/uploads/{id}",
+        response_model=UploadSession,
+        summary="Get a resumable upload",
+        description="Get a resumable upload and the offset to resume it from.",
+    )
+    async def get_upload_session_api(
+        id: str,
+        service: StorageService = Depends(get_storage_service),
+    ) -> UploadSession:
+        """Get a resumable upload."""
+        return await get_upload_session(id, service)
+
+    @router.patch(
+        "/uploads/{id}",
+        status_code=204,
+        response_class=Response,
+        summary="Upload a chunk",
+        description="Stage the request body at the byte offset given by Upload-Offset.",
+    )
+    async def upload_chunk_api(
+        id: str,
+        request: Request,
+        upload_offset: int = Header(),
+        service: StorageService = Depends(get_storage_service),
+        settings: Settings = Depends(get_settings),
+    ) -> Response:
+        """Upload a chunk."""
+        return await upload_chunk(id, upload_offset, request, service, settings)
+
+    @router.post(
+        "/uploads/{id}/finalize",
+        response_model=UploadSession,
+        summary="Finish a resumable upload",
+        description="Commit the staged chunks into the final blob.",
+    )
+    async def finalize_upload_api(
+        id: str,
+        service: StorageService = Depends(get_storage_service),
+    ) -> UploadSession:
+        """Finish a resumable upload."""
+        return await finalize_upload(id, service)
+
+    @router.get(
+        "/cache/",
+        response_model=dict,
+        summary="Get blob cache statistics",
+        description="Hit rate and bytes saved by the local blob cache.",
+    )
+    async def get_cache_stats_api(
+        cache: BlobCache | None = Depends(get_blob_cache),
+    ) -> dict:
+        """Get blob cache statistics."""
+        return (
+            {"enabled": False} if cache is None else {"enabled": True, **cache.stats()}
+        )
+
+    return router
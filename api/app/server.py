@@ -0,0 +1,79 @@
+"""
+Production entry point for the Carson API.
+
+Run with ``python -m app.server``. Worker processes are sized to the CPUs
+actually available to the container, and uvloop/httptools are used when
+installed. Each worker imports the app itself, so pooled Cosmos and Blob
+clients are always created inside the worker that uses them.
+"""
+
+import os
+import tempfile
+from importlib.util import find_spec
+
+import uvicorn
+
+from .cpus import available_cpus
+from .dependencies import get_settings
+
+
+def server_workers() -> int:
+    """Worker processes to start."""
+    return get_settings().server_workers or available_cpus()
+
+
+def check_write_behind() -> None:
+    """Refuse to start write-behind uploads in more than one worker.
+
+    The spool lives in the worker that accepted an upload; only that worker
+    can report or serve the blob until it lands, so write-behind is
+    single-process only.
+    """
+    settings = get_settings()
+    if settings.storage_write_behind and settings.server_workers != 1:
+        raise SystemExit(
+            "APP_STORAGE_WRITE_BEHIND spools uploads in one process; "
+            "set APP_SERVER_WORKERS=1 to use it"
+        )
+
+
+def prepare_metrics_dir(workers: int) -> None:
+    """Give several workers one Prometheus multiprocess directory.
+
+    Each worker writes its metrics to files there and /metrics aggregates
+    them all; without it every scrape sees a single worker. Files left by
+    an earlier run are removed so counters start from zero. Workers are
+    spawned, so they pick the directory up from the environment.
+    """
+    if workers == 1:
+        return
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(
+        prefix="prometheus-"
+    )
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(".db"):
+            os.remove(os.path.join(directory, name))
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+
+
+def main() -> None:
+    settings = get_settings()
+    check_write_behind()
+    workers = server_workers()
+    prepare_metrics_dir(workers)
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        loop="uvloop" if find_spec("uvloop") else "asyncio",
+        http="httptools" if find_spec("httptools") else "h11",
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+    )
+
+
+if __name__ == "__main__":
+    main()
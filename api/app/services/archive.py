@@ -0,0 +1,93 @@
+import io
+import asyncio
+import zipfile
+from collections import deque
+from typing import AsyncGenerator
+from azure.storage.blob import BlobProperties
+
+from .images import VARIANT_PATTERN
+from .storage import StorageService
+
+# blobs up to this size are downloaded ahead of their turn in the archive
+_PREFETCH_LIMIT = 8 * 1024 * 1024
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable write target that hands zip output back in pieces.
+
+    zipfile falls back to data descriptors when it cannot seek, so entries
+    can be written without knowing their CRC up front.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def zip_blobs(
+    service: StorageService, prefix: str, concurrency: int
+) -> AsyncGenerator[bytes, None]:
+    """Stream every blob under a prefix as a ZIP archive.
+
+    Up to `concurrency` small blobs are downloaded ahead while earlier
+    entries are written; larger blobs are streamed through chunk by chunk.
+    Nothing is buffered beyond that window, so memory stays flat no matter
+    how many blobs are exported. Rendered image variants are left out;
+    they can be rendered again from the originals.
+    """
+    sink = _ZipSink()
+    window: deque[tuple[BlobProperties, asyncio.Task[bytes] | None]] = deque()
+    listing = aiter(service.list_blobs(prefix))
+    listed = False
+
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            while True:
+                while not listed and len(window) < concurrency:
+                    try:
+                        blob = await anext(listing)
+                    except StopAsyncIteration:
+                        listed = True
+                        break
+                    if VARIANT_PATTERN.search(blob.name):
+                        continue
+                    prefetch = None
+                    if blob.size <= _PREFETCH_LIMIT:
+                        prefetch = asyncio.ensure_future(service.read_blob(blob.name))
+                    window.append((blob, prefetch))
+                if not window:
+                    break
+
+                blob, prefetch = window.popleft()
+                info = zipfile.ZipInfo(
+                    blob.name.removeprefix(prefix),
+                    date_time=blob.last_modified.timetuple()[:6],
+                )
+                info.file_size = blob.size
+                with archive.open(info, "w") as entry:
+                    if prefetch is not None:
+                        entry.write(await prefetch)
+                    else:
+                        async for chunk in service.download_blob_chunks(
+                            blob.name, etag=blob.etag
+                        ):
+                            entry.write(chunk)
+                            yield sink.drain()
+                yield sink.drain()
+        # central directory
+        yield sink.drain()
+    finally:
+        for _, prefetch in window:
+            if prefetch is not None:
+                prefetch.cancel()
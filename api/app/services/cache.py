@@ -0,0 +1,207 @@
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import AsyncIterator
+import aiofiles
+import aiofiles.os
+
+logger = logging.getLogger(__name__)
+
+_READ_SIZE = 256 * 1024
+
+# temp files older than this were left by a crashed writer; younger ones may
+# belong to another worker sharing the directory
+_STALE_TEMP_SECONDS = 3600
+
+
+class BlobCache:
+    """Size-bounded, least-recently-used cache of blob content on local disk.
+
+    Entries are keyed by blob name and ETag, so a changed blob is simply a
+    new entry and stale ones age out. Files are written to a temporary name
+    and renamed into place, and readers keep their open handle if an entry is
+    evicted underneath them, so concurrent readers never see partial content.
+
+    The index lives in memory, so the size budget applies per process.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_entry_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._fills: dict[str, asyncio.Future[bytes]] = {}
+
+    @staticmethod
+    def _key(name: str, etag: str) -> str:
+        return hashlib.sha256(f"{name}\0{etag}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _scan(self) -> list[tuple[str, int, float]]:
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        stale = time.time() - _STALE_TEMP_SECONDS
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".tmp"):
+                    try:
+                        if entry.stat().st_mtime < stale:
+                            os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+                elif entry.is_file():
+                    stat = entry.stat()
+                    found.append((entry.name, stat.st_size, stat.st_atime))
+        return found
+
+    async def _load(self) -> None:
+        # adopt entries left by a previous process, oldest access first
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            found = await asyncio.to_thread(self._scan)
+            for key, size, _ in sorted(found, key=lambda item: item[2]):
+                self._entries[key] = size
+                self._size += size
+            self._loaded = True
+        await self._evict()
+
+    async def open_chunks(
+        self, name: str, etag: str, offset: int = 0, length: int | None = None
+    ) -> AsyncIterator[bytes] | None:
+        """Open a cached blob for streaming, or return None on a miss."""
+        await self._load()
+        key = self._key(name, etag)
+        async with self._lock:
+            size = self._entries.get(key)
+            if size is not None:
+                self._entries.move_to_end(key)
+        if size is None:
+            self.misses += 1
+            return None
+
+        try:
+            file = await aiofiles.open(self._path(key), "rb")
+        except FileNotFoundError:
+            # removed by another process sharing the directory
+            await self._discard(key)
+            self.misses += 1
+            return None
+
+        remaining = size - offset if length is None else length
+        self.hits += 1
+        self.bytes_saved += remaining
+        return self._read(file, offset, remaining)
+
+    async def _read(self, file, offset: int, remaining: int) -> AsyncIterator[bytes]:
+        try:
+            await file.seek(offset)
+            while remaining > 0:
+                chunk = await file.read(min(_READ_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await file.close()
+
+    async def get(self, name: str, etag: str) -> bytes | None:
+        chunks = await self.open_chunks(name, etag)
+        if chunks is None:
+            return None
+        return b"".join([chunk async for chunk in chunks])
+
+    async def get_or_fetch(
+        self, name: str, etag: str, fetch: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Read through the cache; concurrent misses for one entry share a fetch."""
+        data = await self.get(name, etag)
+        if data is not None:
+            return data
+
+        key = self._key(name, etag)
+        fill = self._fills.get(key)
+        if fill is None:
+            fill = asyncio.ensure_future(self._fill(name, etag, fetch))
+            self._fills[key] = fill
+            fill.add_done_callback(lambda _: self._fills.pop(key, None))
+        return await asyncio.shield(fill)
+
+    async def _fill(
+        self, name: str, etag: str, fetch: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        data = await fetch()
+        await self.put(name, etag, data)
+        return data
+
+    async def put(self, name: str, etag: str, data: bytes) -> None:
+        """Store a blob's content; failing to write only logs a warning.
+
+        The caller already has the data, so a full disk or a directory
+        cleaned underneath the cache must not fail its read.
+        """
+        if len(data) > self.max_entry_bytes:
+            return
+        key = self._key(name, etag)
+        temp = self._path(f"{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            await self._load()
+            async with aiofiles.open(temp, "wb") as file:
+                await file.write(data)
+            await aiofiles.os.replace(temp, self._path(key))
+        except OSError:
+            logger.warning("Failed to cache blob %s", name, exc_info=True)
+            try:
+                await aiofiles.os.remove(temp)
+            except OSError:
+                pass
+            return
+
+        async with self._lock:
+            self._size += len(data) - self._entries.get(key, 0)
+            self._entries[key] = len(data)
+            self._entries.move_to_end(key)
+        await self._evict()
+
+    async def _discard(self, key: str) -> None:
+        async with self._lock:
+            self._size -= self._entries.pop(key, 0)
+
+    async def _evict(self) -> None:
+        while True:
+            async with self._lock:
+                if self._size <= self.max_bytes or not self._entries:
+                    return
+                key, size = self._entries.popitem(last=False)
+                self._size -= size
+            try:
+                await aiofiles.os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,41 @@
+import os
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class ClientPool:
+    """Long-lived Azure SDK clients shared by every request in this process.
+
+    Each client keeps its own connection pool, so creating one per request
+    pays for TLS handshakes, token acquisition and (for Cosmos) account
+    discovery every time. Clients are created lazily, which means each
+    worker process builds its own after it has been started or forked; a
+    pool inherited across fork() is discarded rather than reused.
+    """
+
+    def __init__(self):
+        self._pid = os.getpid()
+        # key -> (client, credential or None)
+        self._clients: dict[str, tuple[Any, Any | None]] = {}
+
+    def get(self, key: str, factory: Callable[[], tuple[T, Any | None]]) -> T:
+        """Get the client for a key, creating it with `factory` on first use.
+
+        The factory returns the client and the credential it owns, if any.
+        """
+        if os.getpid() != self._pid:
+            # the parent's sockets are not ours to use or close
+            self._pid = os.getpid()
+            self._clients = {}
+        if key not in self._clients:
+            self._clients[key] = factory()
+        return self._clients[key][0]
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client, credential in clients.values():
+            await client.close()
+            if credential is not None:
+                await credential.close()
@@ -0,0 +1,44 @@
+import json
+import base64
+from typing import Any
+
+
+class DataCodec:
+    """Stores large record `data` zstd-compressed and base64-encoded.
+
+    Documents whose `data` serializes to more than `threshold` bytes are
+    written with an empty `data` and the compressed JSON in `data_zstd`.
+    Decoding restores `data` and drops the encoded field, so callers never
+    see the at-rest shape. Needs the optional `zstandard` package.
+    """
+
+    FIELD = "data_zstd"
+
+    def __init__(self, threshold: int, level: int = 3):
+        import zstandard
+
+        self.threshold = threshold
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, document: dict[str, Any]) -> dict[str, Any]:
+        data = document.get("data")
+        if not data:
+            return document
+        payload = json.dumps(data, separators=(",", ":")).encode()
+        if len(payload) <= self.threshold:
+            return document
+        encoded = base64.b64encode(self._compressor.compress(payload))
+        if len(encoded) >= len(payload):
+            # already-compressed content such as inline images
+            return document
+        return {**document, "data": {}, self.FIELD: encoded.decode("ascii")}
+
+    def decode(self, document: dict[str, Any]) -> dict[str, Any]:
+        encoded = document.get(self.FIELD)
+        if encoded is None:
+            return document
+        decoded = {k: v for k, v in document.items() if k != self.FIELD}
+        payload = self._decompressor.decompress(base64.b64decode(encoded))
+        decoded["data"] = json.loads(payload)
+        return decoded
@@ -1,93 +1,482 @@
+import json
 from collections.abc import Callable
 import contextlib
 from azure.cosmos import PartitionKey
 from azure.cosmos.aio import CosmosClient
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from ..observability import RequestCharge, phase, record_request_charge, traced
+from .clients import ClientPool
+from .codec import DataCodec
+from .singleflight import SingleFlight, freeze
+
+
+class Item(BaseModel):
+    """A Cosmos document, keeping every field of the stored item."""
+
+    model_config = ConfigDict(extra="allow")
+
+
+# concurrent identical reads in this process share one Cosmos call; callers
+# that join one report the wait as Cosmos time
+_reads = SingleFlight(wait_phase="cosmos")
+
+# containers whose TTL this process has checked before writing tombstones
+_ttl_checked: set[tuple[str, str, str]] = set()
+
+# patch precondition that keeps deleted records deleted
+LIVE_FILTER = "NOT IS_DEFINED(c.deleted)"
+
+
+def is_tombstone(document: dict) -> bool:
+    """Whether a stored document marks a deleted record."""
+    return isinstance(document, dict) and document.get("deleted") is True
+
+
+class RecordTypeConflict(Exception):
+    """The ID belongs to a record of another type in a shared container."""
 
 
 class CosmosService:
     def __init__(
-        self, connection_string: str, database_name: str, container_name: str, type: str
+        self,
+        connection_string: str,
+        database_name: str,
+        container_name: str,
+        type: str,
+        pool: ClientPool | None = None,
+        codec: DataCodec | None = None,
+        tombstone_ttl: int = 0,
+        shared: bool = False,
     ):
         self.connection_string = connection_string
         self.database_name = database_name
         self.container_name = container_name
         self.type = type
+        # shared clients; without a pool every call opens and closes its own
+        self.pool = pool
+        # at-rest compression of large `data`; None stores documents as-is
+        self.codec = codec
+        # seconds a deleted record is kept as a tombstone; 0 deletes outright
+        self.tombstone_ttl = tombstone_ttl
+        # the container also holds other record types, told apart by `type`
+        self.shared = shared
+
+    def span_attributes(self) -> dict:
+        return {
+            "db.system": "cosmosdb",
+            "db.name": self.database_name,
+            "db.cosmosdb.container": self.container_name,
+            "carson.record_type": self.type,
+        }
+
+    @property
+    def _scope(self) -> tuple[str, str, str, str]:
+        # types sharing a container read different documents
+        return (
+            self.connection_string,
+            self.database_name,
+            self.container_name,
+            self.type,
+        )
+
+    def _owns(self, document: dict) -> bool:
+        return not self.shared or document.get("type") == self.type
+
+    @property
+    def _type_filter(self) -> str:
+        # SQL condition limiting a query to this type in a shared container
+        return f" AND c.type = {json.dumps(self.type)}" if self.shared else ""
+
+    def _to_item(self, document: dict) -> Item:
+        if self.codec is not None:
+            document = self.codec.decode(document)
+        return Item.model_validate(document)
+
+    @traced("cosmos")
+    def create_client(self) -> tuple[CosmosClient, None]:
+        return CosmosClient.from_connection_string(self.connection_string), None
 
     @contextlib.asynccontextmanager
-    async def get_cosmos_client(self):
+    async def get_client(self):
+        if self.pool is not None:
+            with phase("client"):
+                client = self.pool.get(
+                    f"cosmos:{self.connection_string}", self.create_client
+                )
+            yield client
+            return
+
         # Create a Cosmos DB client
-        client = CosmosClient.from_connection_string(self.connection_string)
+        with phase("client"):
+            client, _ = self.create_client()
         try:
+            yield client
+        finally:
+            await client.close()
+
+    @contextlib.asynccontextmanager
+    async def get_cosmos_client(self):
+        async with self.get_client() as client:
             database = client.get_database_client(self.database_name)
             container = database.get_container_client(self.container_name)
             yield container
-        finally:
-            await client.close()
 
+    @traced("cosmos")
     async def create_container_if_not_exists(
         self, partition_key_path: str = "/id"
     ) -> None:
-        client = CosmosClient.from_connection_string(self.connection_string)
-        try:
-            database = client.get_database_client(self.database_name)
-            try:
-                await database.read()
-            except CosmosResourceNotFoundError:
-                await client.create_database(self.database_name)
+        with phase("provision"):
+            async with self.get_client() as client:
+                database = client.get_database_client(self.database_name)
+                try:
+                    await database.read()
+                except CosmosResourceNotFoundError:
+                    await client.create_database(self.database_name)
 
-            container = database.get_container_client(self.container_name)
+                container = database.get_container_client(self.container_name)
+                try:
+                    properties = await container.read()
+                except CosmosResourceNotFoundError:
+                    # TTL on with no default, so only tombstones expire
+                    await database.create_container(
+                        id=self.container_name,
+                        partition_key=PartitionKey(path=partition_key_path),
+                        default_ttl=-1,
+                    )
+                    return
+                if self.tombstone_ttl > 0 and properties.get("defaultTtl") is None:
+                    await self._enable_ttl(database, properties)
+                _ttl_checked.add(self._scope[:3])
+
+    async def ensure_tombstone_ttl(self) -> None:
+        """Turn TTL on for a container created before tombstones existed.
+
+        Without it tombstones never expire. Checked once per container and
+        process, before the first tombstone is written.
+        """
+        if self.tombstone_ttl <= 0 or self._scope[:3] in _ttl_checked:
+            return
+        with phase("provision"):
+            async with self.get_cosmos_client() as container:
+                try:
+                    properties = await container.read()
+                except CosmosResourceNotFoundError:
+                    return
+            if properties.get("defaultTtl") is None:
+                async with self.get_client() as client:
+                    database = client.get_database_client(self.database_name)
+                    await self._enable_ttl(database, properties)
+        _ttl_checked.add(self._scope[:3])
+
+    async def _enable_ttl(self, database, properties: dict) -> None:
+        # a replace resets what it is not given, so keep the key and index
+        await database.replace_container(
+            self.container_name,
+            partition_key=PartitionKey(path=properties["partitionKey"]["paths"][0]),
+            indexing_policy=properties.get("indexingPolicy"),
+            default_ttl=-1,
+        )
+
+    @traced("cosmos")
+    async def warm_up(self) -> None:
+        """Open the pooled client and resolve the account and container.
+
+        Unconfigured Cosmos has nothing to warm up, and a container that
+        does not exist yet does not hold readiness back.
+        """
+        if not self.connection_string:
+            return
+        async with self.get_cosmos_client() as container:
             try:
                 await container.read()
             except CosmosResourceNotFoundError:
-                await database.create_container(
-                    id=self.container_name,
-                    partition_key=PartitionKey(path=partition_key_path),
-                )
-        finally:
-            await client.close()
+                pass
 
+    @traced("cosmos")
     async def upsert_item(self, item: BaseModel) -> BaseModel:
+        charge = RequestCharge()
+        async with self.get_cosmos_client() as container:
+            with phase("cosmos"):
+                document = item.model_dump()
+            if self.shared:
+                await self._check_owner(container, document["id"], charge)
+            with phase("cosmos"):
+                if self.codec is not None:
+                    document = self.codec.encode(document)
+                response = await container.upsert_item(document, response_hook=charge)
+            _reads.forget(self._scope)
+            record_request_charge(charge)
+            with phase("validate"):
+                return self._to_item(response)
+
+    async def _check_owner(
+        self, container, item_id: str, charge: RequestCharge
+    ) -> None:
+        # IDs are unique per container, so another type's record would be
+        # overwritten
+        try:
+            with phase("cosmos"):
+                existing = await container.read_item(
+                    item=item_id, partition_key=item_id, response_hook=charge
+                )
+        except CosmosResourceNotFoundError:
+            return
+        if not is_tombstone(existing) and not self._owns(existing):
+            raise RecordTypeConflict(
+                f"ID {item_id} is used by a {existing.get('type')} record"
+            )
+
+    @traced("cosmos")
+    async def patch_item(
+        self,
+        item_id: str,
+        operations: list[dict],
+        filter_predicate: str | None = None,
+    ) -> BaseModel | None:
+        """Apply partial update operations; None if the item does not exist.
+
+        With a filter predicate the patch only applies to a matching item,
+        otherwise Cosmos answers 412. Tombstones never match.
+        """
+        if filter_predicate is None:
+            filter_predicate = f"FROM c WHERE {LIVE_FILTER}"
+        else:
+            filter_predicate = f"{filter_predicate} AND {LIVE_FILTER}"
+        filter_predicate += self._type_filter
+        charge = RequestCharge()
+        async with self.get_cosmos_client() as container:
+            try:
+                with phase("cosmos"):
+                    response = await container.patch_item(
+                        item=item_id,
+                        partition_key=item_id,
+                        patch_operations=operations,
+                        filter_predicate=filter_predicate,
+                        response_hook=charge,
+                    )
+            except CosmosResourceNotFoundError:
+                return None
+            finally:
+                _reads.forget(self._scope)
+            record_request_charge(charge)
+            with phase("validate"):
+                return self._to_item(response)
+
+    @traced("cosmos")
+    async def delete_item(self, item_id: str) -> None:
+        """Delete an item, leaving a tombstone when tombstones are enabled.
+
+        The tombstone replaces the document and expires after the tombstone
+        TTL, so change listings can report the delete until then.
+        """
+        await self.ensure_tombstone_ttl()
+        charge = RequestCharge()
         async with self.get_cosmos_client() as container:
-            response = await container.upsert_item(item.model_dump())
-            return BaseModel.model_validate(response)
+            with phase("cosmos"):
+                if self.tombstone_ttl > 0:
+                    await container.upsert_item(
+                        {
+                            "id": item_id,
+                            "type": self.type,
+                            "deleted": True,
+                            "ttl": self.tombstone_ttl,
+                        },
+                        response_hook=charge,
+                    )
+                else:
+                    await container.delete_item(
+                        item=item_id, partition_key=item_id, response_hook=charge
+                    )
+            _reads.forget(self._scope)
+            record_request_charge(charge)
 
+    @traced("cosmos")
     async def get_item(self, item_id: str) -> BaseModel | None:
+        return await _reads.do(
+            self._scope, ("item", item_id), lambda: self._read_item(item_id)
+        )
+
+    async def _read_item(self, item_id: str) -> BaseModel | None:
+        charge = RequestCharge()
         async with self.get_cosmos_client() as container:
             try:
-                item = await container.read_item(item=item_id, partition_key=item_id)
-                return BaseModel.model_validate(item)
+                with phase("cosmos"):
+                    item = await container.read_item(
+                        item=item_id, partition_key=item_id, response_hook=charge
+                    )
             except CosmosResourceNotFoundError:
                 return None
+            record_request_charge(charge)
+            if is_tombstone(item) or not self._owns(item):
+                return None
+            with phase("validate"):
+                return self._to_item(item)
+
+    @traced("cosmos")
+    async def read_items(self, item_ids: list[str]) -> list[BaseModel]:
+        """Point-read many items in one batched call; missing ones are omitted."""
+        charge = RequestCharge()
+        async with self.get_cosmos_client() as container:
+            with phase("cosmos"):
+                items = await container.read_items(
+                    items=[(item_id, item_id) for item_id in item_ids],
+                    response_hook=charge,
+                )
+            record_request_charge(charge)
+            with phase("validate"):
+                return [
+                    self._to_item(item)
+                    for item in items
+                    if not is_tombstone(item) and self._owns(item)
+                ]
 
+    @traced("cosmos")
     async def get_items(self) -> list[BaseModel]:
+        return await _reads.do(self._scope, ("all",), self._read_all_items)
+
+    def _all_items(self, container, charge: RequestCharge):
+        if not self.shared:
+            return container.read_all_items(response_hook=charge)
+        return container.query_items(
+            query="SELECT * FROM c WHERE c.type = @type",
+            parameters=[{"name": "@type", "value": self.type}],
+            enable_cross_partition_query=True,
+            response_hook=charge,
+        )
+
+    async def _read_all_items(self) -> list[BaseModel]:
+        charge = RequestCharge()
         async with self.get_cosmos_client() as container:
-            items = container.read_all_items()
-            results = []
-            async for item in items:
-                results.append(BaseModel.model_validate(item))
+            items = self._all_items(container, charge)
+            results: list[BaseModel] = []
+            with phase("cosmos"):
+                async for item in items:
+                    if is_tombstone(item):
+                        continue
+                    with phase("validate"):
+                        results.append(self._to_item(item))
+            record_request_charge(charge)
             return results
 
+    @traced("cosmos")
     async def update_items(
         self,
         mapper: Callable[[dict], dict],
     ) -> None:
+        charge = RequestCharge()
         async with self.get_cosmos_client() as container:
-            async for item in container.read_all_items():
-                updated_item = mapper(item)
-                await container.upsert_item(updated_item)
+            with phase("cosmos"):
+                async for item in self._all_items(container, charge):
+                    if is_tombstone(item):
+                        continue
+                    updated_item = mapper(item)
+                    # unchanged items keep their _ts and raise no change events
+                    if updated_item != item:
+                        await container.upsert_item(updated_item, response_hook=charge)
+            _reads.forget(self._scope)
+            record_request_charge(charge)
 
+    @traced("cosmos")
     async def query_items(
         self, query: str, parameters: list[dict] | None = None
     ) -> list[BaseModel]:
+        return await _reads.do(
+            self._scope,
+            ("query", query, freeze(parameters or [])),
+            lambda: self._query_items(query, parameters),
+        )
+
+    async def _query_items(
+        self, query: str, parameters: list[dict] | None
+    ) -> list[BaseModel]:
+        charge = RequestCharge()
         async with self.get_cosmos_client() as container:
             items = container.query_items(
                 query=query,
                 parameters=parameters or [],
                 enable_cross_partition_query=True,
+                response_hook=charge,
             )
-            results = []
-            async for item in items:
-                results.append(BaseModel.model_validate(item))
+            results: list[BaseModel] = []
+            with phase("cosmos"):
+                async for item in items:
+                    if is_tombstone(item) or not self._owns(item):
+                        continue
+                    with phase("validate"):
+                        results.append(self._to_item(item))
+            record_request_charge(charge)
             return results
+
+    async def _query_page(
+        self, container, query: str, parameters: list[dict], charge: RequestCharge
+    ) -> list[dict]:
+        items = container.query_items(
+            query=query,
+            parameters=parameters,
+            enable_cross_partition_query=True,
+            response_hook=charge,
+        )
+        with phase("cosmos"):
+            return [item async for item in items]
+
+    @traced("cosmos")
+    async def changed_since(
+        self, since: int, limit: int
+    ) -> tuple[list[BaseModel], int, bool]:
+        """Items and tombstones last written at or after `since`, oldest first.
+
+        `since` is a Cosmos `_ts` in seconds. Returns up to `limit` items (more
+        only when a single second holds more), the `_ts` to resume from, and
+        whether more changes are waiting. Pages end on a second boundary so
+        that resuming with `>=` neither skips nor repeats items; the newest
+        second is repeated by the next call, because it can still receive
+        writes. A second holding more than `limit` items is only resumed past
+        once a later second has been written.
+        """
+        query = (
+            "SELECT TOP @limit * FROM c WHERE c._ts >= @since"
+            f"{self._type_filter} ORDER BY c._ts ASC"
+        )
+        charge = RequestCharge()
+        async with self.get_cosmos_client() as container:
+            page = await self._query_page(
+                container,
+                query,
+                [
+                    {"name": "@limit", "value": limit + 1},
+                    {"name": "@since", "value": since},
+                ],
+                charge,
+            )
+            more = len(page) > limit
+            if not more:
+                resume = page[-1]["_ts"] if page else since
+            else:
+                # the last second may continue past the page; leave it whole
+                # for the next one, unless it is all this page holds
+                resume = page[-1]["_ts"]
+                page = [item for item in page if item["_ts"] < resume]
+                if not page:
+                    page = await self._query_page(
+                        container,
+                        f"SELECT * FROM c WHERE c._ts = @since{self._type_filter}",
+                        [{"name": "@since", "value": resume}],
+                        charge,
+                    )
+                    # the second is closed once a later one has writes;
+                    # until then it is repeated like any newest second
+                    later = await self._query_page(
+                        container,
+                        "SELECT TOP 1 c._ts FROM c WHERE c._ts > @since"
+                        f"{self._type_filter} ORDER BY c._ts ASC",
+                        [{"name": "@since", "value": resume}],
+                        charge,
+                    )
+                    more = bool(later)
+                    if later:
+                        resume = later[0]["_ts"]
+            record_request_charge(charge)
+            with phase("validate"):
+                return [self._to_item(item) for item in page], resume, more
@@ -0,0 +1,128 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# sent instead of queued events once a subscriber falls too far behind
+RESYNC = "resync"
+
+# polls the upstream since a `_ts`: (changed documents, resume `_ts`, more)
+ChangeSource = Callable[[int], Awaitable[tuple[list[dict], int, bool]]]
+
+
+class Subscription:
+    """One subscriber's bounded queue of encoded events.
+
+    When the queue is full the backlog is dropped and replaced by a single
+    resync event, so a slow client costs at most `size` events of memory and
+    learns that it has to re-list.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.dropped = 0
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+
+    def put(self, event: str) -> None:
+        if self._queue.qsize() >= self.size:
+            self.dropped += self._queue.qsize()
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC)
+            return
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: float | None = None) -> str | None:
+        """The next event, or None if none arrived within the timeout."""
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChangeHub:
+    """Fans one upstream change poller out to many subscribers.
+
+    The poller runs only while someone is subscribed, so idle processes make
+    no Cosmos calls, and each change is read and encoded once however many
+    clients are listening. `token` is the position subscribers are at; a
+    client that reconnects from any other position has missed changes.
+    """
+
+    def __init__(
+        self,
+        source: ChangeSource,
+        encode: Callable[[dict, str], str],
+        interval: float,
+        queue_size: int,
+        now: Callable[[], int],
+    ):
+        self.source = source
+        self.encode = encode
+        self.interval = interval
+        self.queue_size = queue_size
+        self.now = now
+        self.token: str | None = None
+        self._since = 0
+        # documents already published from the second that is read again
+        self._seen: set[tuple] = set()
+        self._subscribers: set[Subscription] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self):
+        subscription = Subscription(self.queue_size)
+        if self._task is None:
+            self._since = self.now()
+            self._seen = set()
+            self.token = str(self._since)
+            self._task = asyncio.create_task(self._run())
+        self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers.discard(subscription)
+            if not self._subscribers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    def publish(self, event: str) -> None:
+        for subscription in self._subscribers:
+            subscription.put(event)
+
+    async def poll(self) -> bool:
+        """Publish one page of changes; True if more are waiting."""
+        documents, resume, more = await self.source(self._since)
+        seen = set(self._seen) if resume == self._since else set()
+        for document in documents:
+            key = (document["id"], document.get("_etag", document.get("_ts")))
+            if key in self._seen:
+                continue
+            if document.get("_ts") == resume:
+                seen.add(key)
+            self.publish(self.encode(document, str(resume)))
+        self._seen = seen
+        self._since = resume
+        self.token = str(resume)
+        return more
+
+    async def _run(self) -> None:
+        delay = self.interval
+        while True:
+            try:
+                more = await self.poll()
+                delay = self.interval
+            except Exception:
+                logger.exception("Polling for changes failed")
+                more = False
+                delay = min(delay * 2, 30)
+            if not more:
+                await asyncio.sleep(delay)
@@ -0,0 +1,83 @@
+import io
+import re
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+from ..cpus import available_cpus
+from ..imaging import render_variant
+
+# matches the suffix added by variant_name
+VARIANT_PATTERN = re.compile(r"\.w\d+\.[a-z0-9]+$")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def pool_size() -> int:
+    """Image processes for this server worker.
+
+    Every server worker has its own pool, so by default they split the
+    CPUs available to the container between them.
+    """
+    from ..dependencies import get_settings
+
+    settings = get_settings()
+    if settings.image_workers > 0:
+        return settings.image_workers
+    workers = settings.server_workers or available_cpus()
+    return max(1, available_cpus() // workers)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for image work, creating it on first use."""
+    global _pool
+    if _pool is None:
+        # spawn: forking a worker with a running event loop and SDK threads
+        # can deadlock the children
+        _pool = ProcessPoolExecutor(
+            max_workers=pool_size(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def variant_name(blob_name: str, width: int, format: str) -> str:
+    """Name of a derivative stored next to the original blob.
+
+    images/design/abc.png -> images/design/abc.w256.webp
+    """
+    stem = blob_name.rsplit(".", 1)[0]
+    return f"{stem}.w{width}.{format}"
+
+
+def image_size(image_bytes: bytes) -> tuple[int, int] | None:
+    """Read image dimensions from the header without decoding pixels."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+async def render_variants(
+    image_bytes: bytes, widths: list[int], formats: list[str]
+) -> list[tuple[int, str, bytes]]:
+    """Render every width/format combination in the process pool."""
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    jobs = [(width, format) for width in widths for format in formats]
+    results = await asyncio.gather(
+        *[
+            loop.run_in_executor(pool, render_variant, image_bytes, width, format)
+            for width, format in jobs
+        ]
+    )
+    return [(width, format, data) for (width, format), data in zip(jobs, results)]
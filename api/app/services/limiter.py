@@ -0,0 +1,57 @@
+import time
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts with additive increase, multiplicative decrease.
+
+    Every completed request that finished within the latency target, while
+    the limit was actually in use, raises the limit by about one per round
+    of requests. A slow or throttled request cuts it by `backoff`, at most
+    once per latency target so a burst of slow completions counts as one
+    overload signal. Requests beyond the limit are rejected instead of
+    queued, so latency stays bounded while the downstream recovers.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_target: float,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self.shed = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        """Take a slot, or return False if the request should be shed."""
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """Return a slot and adjust the limit from how the request went."""
+        busy = self.in_flight >= self.limit / 2
+        self.in_flight -= 1
+        if overloaded or latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self._last_decrease = now
+                self.limit = max(self.minimum, self.limit * self.backoff)
+        elif busy:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "shed": self.shed,
+        }
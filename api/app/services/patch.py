@@ -0,0 +1,194 @@
+import copy
+from typing import Any
+
+# Cosmos accepts at most 10 operations in one partial update
+MAX_OPERATIONS = 10
+
+# record fields a patch may change; id, type and default are managed elsewhere
+FIELDS = {"name", "description", "data"}
+
+# JSON Patch operations, plus Cosmos' own "set" and "incr"
+OPERATIONS = {"add", "replace", "remove", "move", "set", "incr"}
+
+JSON_PATCH = "application/json-patch+json"
+MERGE_PATCH = "application/merge-patch+json"
+
+
+class PatchError(ValueError):
+    """A patch document that cannot be applied to a record."""
+
+
+def _check_path(path: Any, op: str) -> str:
+    if not isinstance(path, str) or not path.startswith("/"):
+        raise PatchError(f"Invalid path: {path!r}")
+    parts = path.split("/")
+    if parts[1] not in FIELDS:
+        raise PatchError(f"Path {path} cannot be patched")
+    if len(parts) == 2 and op not in {"set", "replace"}:
+        # top-level fields always exist; they can only be replaced
+        raise PatchError(f"Only replace is allowed on {path}")
+    if len(parts) > 2 and parts[1] != "data":
+        raise PatchError(f"Path {path} cannot be patched")
+    return path
+
+
+def _check_value(path: str, value: Any) -> None:
+    if path == "/data" and not isinstance(value, dict):
+        raise PatchError("/data must be an object")
+    if path in ("/name", "/description") and not isinstance(value, str):
+        raise PatchError(f"{path} must be a string")
+
+
+def json_patch_operations(patch: Any) -> list[dict]:
+    """Translate an RFC 6902 JSON Patch into Cosmos patch operations."""
+    if not isinstance(patch, list):
+        raise PatchError("A JSON Patch must be an array of operations")
+    operations = []
+    for entry in patch:
+        if not isinstance(entry, dict):
+            raise PatchError("Each JSON Patch operation must be an object")
+        op = entry.get("op")
+        if op not in OPERATIONS:
+            raise PatchError(f"Unsupported operation: {op!r}")
+        path = _check_path(entry.get("path"), op)
+        operation: dict[str, Any] = {"op": op, "path": path}
+        if op == "move":
+            operation["from"] = _check_path(entry.get("from"), "remove")
+        elif op != "remove":
+            if "value" not in entry:
+                raise PatchError(f"Operation {op} on {path} needs a value")
+            value = entry["value"]
+            if op == "incr" and (
+                not isinstance(value, (int, float)) or isinstance(value, bool)
+            ):
+                raise PatchError(f"incr on {path} needs a number")
+            _check_value(path, value)
+            operation["value"] = value
+        operations.append(operation)
+    return _limit(operations)
+
+
+def merge_patch_operations(patch: Any) -> list[dict]:
+    """Translate an RFC 7396 merge patch into Cosmos patch operations.
+
+    The merge applies to the top-level fields and to the keys of `data`;
+    a null removes a data key and nested objects inside `data` are set
+    as a whole.
+    """
+    if not isinstance(patch, dict):
+        raise PatchError("A merge patch must be an object")
+    operations = []
+    for field, value in patch.items():
+        if field not in FIELDS:
+            raise PatchError(f"Field {field} cannot be patched")
+        if field != "data":
+            _check_value(f"/{field}", value)
+            operations.append({"op": "set", "path": f"/{field}", "value": value})
+            continue
+        if not isinstance(value, dict):
+            raise PatchError("data must be an object")
+        for key, item in value.items():
+            path = "/data/" + key.replace("~", "~0").replace("/", "~1")
+            if item is None:
+                operations.append({"op": "remove", "path": path})
+            else:
+                operations.append({"op": "set", "path": path, "value": item})
+    return _limit(operations)
+
+
+def _limit(operations: list[dict]) -> list[dict]:
+    if not operations:
+        raise PatchError("The patch is empty")
+    if len(operations) > MAX_OPERATIONS:
+        raise PatchError(
+            f"A patch can change at most {MAX_OPERATIONS} paths; use PUT instead"
+        )
+    return operations
+
+
+def _parent(document: dict, path: str) -> tuple[Any, str]:
+    # the container holding the last segment of a JSON Pointer, and that key
+    *parents, last = [
+        part.replace("~1", "/").replace("~0", "~") for part in path.split("/")[1:]
+    ]
+    target: Any = document
+    for part in parents:
+        try:
+            target = target[int(part) if isinstance(target, list) else part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise PatchError(f"Path {path} does not exist")
+    if not isinstance(target, (dict, list)):
+        raise PatchError(f"Path {path} does not exist")
+    return target, last
+
+
+def _index(target: list, key: str, path: str, insert: bool = False) -> int:
+    if insert and key == "-":
+        return len(target)
+    try:
+        index = int(key)
+    except ValueError:
+        raise PatchError(f"Path {path} is not an array index")
+    if not 0 <= index < len(target) + (1 if insert else 0):
+        raise PatchError(f"Path {path} does not exist")
+    return index
+
+
+def _get(document: dict, path: str) -> Any:
+    target, key = _parent(document, path)
+    if isinstance(target, list):
+        return target[_index(target, key, path)]
+    if key not in target:
+        raise PatchError(f"Path {path} does not exist")
+    return target[key]
+
+
+def _remove(document: dict, path: str) -> Any:
+    target, key = _parent(document, path)
+    if isinstance(target, list):
+        return target.pop(_index(target, key, path))
+    if key not in target:
+        raise PatchError(f"Path {path} does not exist")
+    return target.pop(key)
+
+
+def _add(document: dict, path: str, value: Any, insert: bool) -> None:
+    target, key = _parent(document, path)
+    if isinstance(target, list):
+        index = _index(target, key, path, insert=True)
+        if insert or index == len(target):
+            target.insert(index, value)
+        else:
+            target[index] = value
+    else:
+        target[key] = value
+
+
+def apply_operations(document: dict, operations: list[dict]) -> dict:
+    """Apply Cosmos patch operations to a copy of a document.
+
+    Follows Cosmos' semantics: `add` inserts into arrays, `set` replaces an
+    array element, `replace` and `remove` need an existing path and `incr`
+    starts a missing number at the increment.
+    """
+    document = copy.deepcopy(document)
+    for operation in operations:
+        op, path = operation["op"], operation["path"]
+        if op == "remove":
+            _remove(document, path)
+        elif op == "move":
+            _add(document, path, _remove(document, operation["from"]), insert=True)
+        elif op == "replace":
+            _get(document, path)
+            _add(document, path, operation["value"], insert=False)
+        elif op == "incr":
+            try:
+                current = _get(document, path)
+            except PatchError:
+                current = 0
+            if not isinstance(current, (int, float)) or isinstance(current, bool):
+                raise PatchError(f"Path {path} is not a number")
+            _add(document, path, current + operation["value"], insert=False)
+        else:
+            _add(document, path, operation["value"], insert=op == "add")
+    return document
@@ -0,0 +1,56 @@
+import os
+import re
+import json
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+# record types become URL prefixes next to these routes
+RESERVED_TYPES = {"storage", "healthz", "readyz", "metrics", "docs", "redoc"}
+
+TYPE_PATTERN = re.compile(r"^[a-z][a-z0-9_-]*$")
+
+
+@dataclass(frozen=True)
+class RecordType:
+    name: str
+    container: str
+    # the container also holds other types, told apart by `Record.type`
+    shared: bool = False
+    # JSON Schema for `data`, from {schema_dir}/{name}.json
+    data_schema: dict[str, Any] | None = None
+
+
+def load_data_schema(schema_dir: str, name: str) -> dict[str, Any] | None:
+    path = os.path.join(schema_dir, f"{name}.json")
+    if not schema_dir or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def load_record_types(
+    types: dict[str, str], schema_dir: str = ""
+) -> dict[str, RecordType]:
+    """Build the record type registry from a type -> container mapping.
+
+    Types mapped to the same container share it; every service for such a
+    type scopes its reads and writes to documents of its own type. A type
+    with a `{name}.json` in `schema_dir` validates its data against it.
+    """
+    invalid = [
+        name for name in types if not TYPE_PATTERN.match(name) or name in RESERVED_TYPES
+    ]
+    if invalid:
+        raise ValueError(f"Invalid record type names: {', '.join(invalid)}")
+
+    usage = Counter(types.values())
+    return {
+        name: RecordType(
+            name,
+            container,
+            shared=usage[container] > 1,
+            data_schema=load_data_schema(schema_dir, name),
+        )
+        for name, container in types.items()
+    }
@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from ..observability import phase
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers asking for the same thing.
+
+    Calls are grouped by scope (for example a Cosmos container) so that a
+    write can `forget` the reads of its scope: callers arriving after the
+    write then start a fresh read instead of joining one that may have begun
+    before it. Nothing is kept once a call finishes; this is not a cache.
+
+    The caller that starts a call has its phases timed inside the call. A
+    caller that joins one spends its time waiting instead, which is charged
+    to `wait_phase` so its Server-Timing still shows where the time went.
+    """
+
+    def __init__(self, wait_phase: str | None = None):
+        self._calls: dict[Hashable, dict[Hashable, asyncio.Future]] = {}
+        self.wait_phase = wait_phase
+        self.shared = 0
+
+    async def do(
+        self, scope: Hashable, key: Hashable, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        calls = self._calls.setdefault(scope, {})
+        future = calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            calls[key] = future
+            future.add_done_callback(lambda done: self._finish(scope, key, done))
+            # a cancelled caller must not cancel the call for everyone else
+            return await asyncio.shield(future)
+        self.shared += 1
+        if self.wait_phase is None:
+            return await asyncio.shield(future)
+        with phase(self.wait_phase):
+            return await asyncio.shield(future)
+
+    def _finish(self, scope: Hashable, key: Hashable, done: asyncio.Future) -> None:
+        calls = self._calls.get(scope)
+        if calls is not None and calls.get(key) is done:
+            del calls[key]
+            if not calls:
+                del self._calls[scope]
+
+    def forget(self, scope: Hashable) -> None:
+        """Let later callers in this scope start new calls."""
+        self._calls.pop(scope, None)
+
+    def in_flight(self) -> int:
+        return sum(len(calls) for calls in self._calls.values())
+
+
+def freeze(value: Any) -> Hashable:
+    """Turn nested lists and dicts (e.g. query parameters) into a hashable key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
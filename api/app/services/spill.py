@@ -0,0 +1,69 @@
+import json
+import asyncio
+import hashlib
+import logging
+
+from ..models.record import DataRef, Record
+from ..observability import phase, traced
+from .storage import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class RecordDataError(Exception):
+    """Spilled record data is missing or does not match its hash."""
+
+
+class DataSpill:
+    """Keeps oversized record `data` in blob storage with a pointer in Cosmos.
+
+    Data whose JSON is larger than `threshold` bytes is written to
+    ``records/{type}/{id}/{sha256}.json`` and the Cosmos document keeps an
+    empty `data` plus a `data_ref`. Blob names are content addressed, so a
+    stored blob never changes and is safe to cache.
+    """
+
+    def __init__(self, storage: StorageService, threshold: int):
+        self.storage = storage
+        self.threshold = threshold
+
+    @traced("spill")
+    async def store(self, record: Record, type: str) -> None:
+        """Move the record's data to blob storage if it is over the threshold."""
+        # refs are only ever computed here, never taken from clients
+        record.data_ref = None
+        payload = json.dumps(record.data, separators=(",", ":")).encode()
+        if len(payload) <= self.threshold:
+            return
+        digest = hashlib.sha256(payload).hexdigest()
+        blob_name = f"records/{type}/{record.id}/{digest}.json"
+        with phase("blob"):
+            await self.storage.save_blob(blob_name, payload, "application/json")
+        record.data = {}
+        record.data_ref = DataRef(blob=blob_name, sha256=digest, size=len(payload))
+
+    @traced("spill")
+    async def load(self, record: Record) -> Record:
+        """Bring spilled data back into the record."""
+        ref = record.data_ref
+        if ref is None:
+            return record
+        with phase("blob"):
+            payload = await self.storage.read_blob(ref.blob)
+        if hashlib.sha256(payload).hexdigest() != ref.sha256:
+            raise RecordDataError(f"Data of record {record.id} is corrupt")
+        record.data = json.loads(payload)
+        return record
+
+    async def load_all(self, records: list[Record]) -> list[Record]:
+        await asyncio.gather(*[self.load(record) for record in records])
+        return records
+
+    async def discard(self, ref: DataRef | None, keep: DataRef | None = None) -> None:
+        """Delete a superseded data blob; failures only leave an orphan."""
+        if ref is None or (keep is not None and keep.blob == ref.blob):
+            return
+        try:
+            await self.storage.delete_blob(ref.blob)
+        except Exception:
+            logger.warning("Could not delete record data %s", ref.blob, exc_info=True)
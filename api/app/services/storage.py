@@ -1,20 +1,90 @@
 import uuid
 import base64
+import hashlib
 import contextlib
+from datetime import datetime, timedelta, timezone
 from typing import AsyncGenerator
 from aiohttp.streams import StreamReader
-from azure.storage.blob.aio import BlobServiceClient
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import (
+    BlobBlock,
+    BlobProperties,
+    BlobSasPermissions,
+    ContentSettings,
+    UserDelegationKey,
+    generate_blob_sas,
+)
+from azure.storage.blob.aio import BlobServiceClient, ContainerClient
+from azure.core.credentials_async import AsyncTokenCredential
 from azure.identity.aio import DefaultAzureCredential, ManagedIdentityCredential
 
+from ..models.blob import UploadSession
+from .cache import BlobCache
+from ..observability import traced
+from .clients import ClientPool
+from .uploads import UploadQueue
+from ..imaging import FORMATS
+from .images import image_size, render_variants, variant_name
+
+_CHUNK_SIZE = 1024 * 1024
+# keep downloads streaming in small pieces instead of one 32MB first read
+_DOWNLOAD_CHUNK_SIZE = 4 * _CHUNK_SIZE
+
+# user delegation keys are valid for up to 7 days; share one per account
+_DELEGATION_KEY_LIFETIME = timedelta(days=1)
+_delegation_keys: dict[str, UserDelegationKey] = {}
+
 
 class StorageService:
-    def __init__(self, client_id: str, storage: str, container: str):
+    def __init__(
+        self,
+        client_id: str,
+        storage: str,
+        container: str,
+        dedupe: bool = False,
+        variant_widths: list[int] | None = None,
+        variant_formats: list[str] | None = None,
+        cache: BlobCache | None = None,
+        uploads: UploadQueue | None = None,
+        pool: ClientPool | None = None,
+    ):
         self.client_id = client_id
         self.storage = storage
         self.container = container
+        # name blobs by the SHA-256 of their content instead of a random uuid
+        self.dedupe = dedupe
+        # derivatives rendered next to every saved image
+        self.variant_widths = variant_widths or []
+        self.variant_formats = variant_formats or []
+        # local disk cache in front of blob reads
+        self.cache = cache
+        # write-behind queue; image saves return once the bytes are spooled
+        self.uploads = uploads
+        # shared clients; without a pool every call opens and closes its own
+        self.pool = pool
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.storage and self.container)
+
+    def span_attributes(self) -> dict:
+        return {"az.storage.container": self.container}
+
+    @traced("storage")
+    def create_service_client(
+        self,
+    ) -> tuple[BlobServiceClient, AsyncTokenCredential | None]:
+        """Create a blob service client and the credential it owns, if any."""
+        if "AccountKey=" in self.storage or "UseDevelopmentStorage=" in self.storage:
+            # shared key connection string, e.g. Azurite for local development
+            blob_service_client = BlobServiceClient.from_connection_string(
+                self.storage,
+                max_single_get_size=_DOWNLOAD_CHUNK_SIZE,
+                max_chunk_get_size=_DOWNLOAD_CHUNK_SIZE,
+            )
+            return blob_service_client, None
 
-    @contextlib.asynccontextmanager
-    async def get_storage_client(self):
         # Create credential and blob service client
         credential: ManagedIdentityCredential | DefaultAzureCredential
         if self.client_id == "LOCAL":
@@ -23,66 +93,511 @@ class StorageService:
             credential = ManagedIdentityCredential(client_id=self.client_id)
 
         blob_service_client = BlobServiceClient(
-            account_url=self.storage, credential=credential
+            account_url=self.storage,
+            credential=credential,
+            max_single_get_size=_DOWNLOAD_CHUNK_SIZE,
+            max_chunk_get_size=_DOWNLOAD_CHUNK_SIZE,
         )
-        try:
-            # Create the container if it doesn't exist
-            container_client = blob_service_client.get_container_client(self.container)
+        return blob_service_client, credential
 
-            yield container_client
+    @contextlib.asynccontextmanager
+    async def get_service_client(self):
+        if self.pool is not None:
+            yield self.pool.get(
+                f"storage:{self.client_id}:{self.storage}", self.create_service_client
+            )
+            return
+
+        blob_service_client, credential = self.create_service_client()
+        try:
+            yield blob_service_client
         finally:
-            await credential.close()
+            if credential is not None:
+                await credential.close()
             await blob_service_client.close()
 
+    @contextlib.asynccontextmanager
+    async def get_storage_client(self):
+        async with self.get_service_client() as blob_service_client:
+            yield blob_service_client.get_container_client(self.container)
+
+    def reserve_blob_name(
+        self, folder: str, extension: str, path: str | None = None
+    ) -> str:
+        """Reserve a new, unique blob name following the storage path conventions."""
+        return self._blob_name(folder, extension, path, None)
+
+    @traced("storage")
+    async def generate_sas_url(
+        self,
+        blob_name: str,
+        permission: BlobSasPermissions,
+        lifetime: timedelta,
+    ) -> tuple[str, datetime]:
+        """Mint a short-lived SAS URL scoped to a single blob.
+
+        Shared key accounts (Azurite) sign with the account key, everything
+        else signs with a cached user delegation key.
+        """
+        now = datetime.now(timezone.utc)
+        # allow for clock skew between us and the storage service
+        start = now - timedelta(minutes=5)
+        expiry = now + lifetime
+
+        async with self.get_service_client() as blob_service_client:
+            account_key = getattr(blob_service_client.credential, "account_key", None)
+            if account_key:
+                sas = generate_blob_sas(
+                    account_name=blob_service_client.account_name,
+                    container_name=self.container,
+                    blob_name=blob_name,
+                    account_key=account_key,
+                    permission=permission,
+                    start=start,
+                    expiry=expiry,
+                )
+            else:
+                key = await self._get_delegation_key(blob_service_client, expiry)
+                sas = generate_blob_sas(
+                    account_name=blob_service_client.account_name,
+                    container_name=self.container,
+                    blob_name=blob_name,
+                    user_delegation_key=key,
+                    permission=permission,
+                    start=start,
+                    expiry=expiry,
+                )
+            blob_client = blob_service_client.get_blob_client(self.container, blob_name)
+            return f"{blob_client.url}?{sas}", expiry
+
+    async def _get_delegation_key(
+        self, blob_service_client: BlobServiceClient, expiry: datetime
+    ) -> UserDelegationKey:
+        key = _delegation_keys.get(self.storage)
+        if key is not None and _parse_time(key.signed_expiry) > expiry:
+            return key
+
+        now = datetime.now(timezone.utc)
+        key = await blob_service_client.get_user_delegation_key(
+            key_start_time=now - timedelta(minutes=5),
+            key_expiry_time=now + _DELEGATION_KEY_LIFETIME,
+        )
+        _delegation_keys[self.storage] = key
+        return key
+
+    @traced("storage")
+    async def warm_up(self) -> None:
+        """Open the pooled connection, acquire a token and a delegation key.
+
+        Unconfigured storage has nothing to warm up, and a container that
+        does not exist yet does not hold readiness back, as with Cosmos.
+        """
+        if not self.configured:
+            return
+        async with self.get_service_client() as blob_service_client:
+            container_client = blob_service_client.get_container_client(self.container)
+            try:
+                await container_client.get_container_properties()
+            except ResourceNotFoundError:
+                pass
+            if not getattr(blob_service_client.credential, "account_key", None):
+                await self._get_delegation_key(
+                    blob_service_client, datetime.now(timezone.utc)
+                )
+
+    @traced("storage")
     async def create_container(self) -> None:
         async with self.get_storage_client() as container_client:
             if not await container_client.exists():
                 await container_client.create_container()
 
+    def _blob_name(
+        self, folder: str, extension: str, path: str | None, digest: str | None
+    ) -> str:
+        stem = digest if digest is not None else str(uuid.uuid4())
+        return (
+            f"{folder}/{stem}.{extension}"
+            if path is None
+            else f"{folder}/{path}/{stem}.{extension}"
+        )
+
+    def _image_name(self, image_bytes: bytes, path: str | None) -> str:
+        digest = hashlib.sha256(image_bytes).hexdigest() if self.dedupe else None
+        return self._blob_name("images", "png", path, digest)
+
+    async def _upload(
+        self,
+        container_client: ContainerClient,
+        blob_name: str,
+        data: bytes,
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+    ) -> bool:
+        """Upload a blob, returning False when an identical blob already exists."""
+        content_settings = ContentSettings(content_type=content_type)
+        if not self.dedupe:
+            await container_client.upload_blob(
+                name=blob_name,
+                data=data,
+                overwrite=True,
+                content_settings=content_settings,
+                metadata=metadata,
+            )
+            return True
+
+        # content-addressed: an existing blob already holds these exact bytes
+        blob_client = container_client.get_blob_client(blob_name)
+        if await blob_client.exists():
+            return False
+        try:
+            await blob_client.upload_blob(
+                data,
+                overwrite=False,
+                content_settings=content_settings,
+                metadata=metadata,
+            )
+        except ResourceExistsError:
+            # a concurrent writer stored the same content first
+            return False
+        return True
+
+    def _image_metadata(self, image_bytes: bytes) -> dict[str, str]:
+        """Index kept on the blob itself so listings need no per-blob request."""
+        metadata = {}
+        size = image_size(image_bytes)
+        if size is not None:
+            metadata["width"], metadata["height"] = str(size[0]), str(size[1])
+        variants = [
+            f"w{width}.{format}"
+            for width in self.variant_widths
+            for format in self.variant_formats
+        ]
+        if variants:
+            metadata["variants"] = ",".join(variants)
+        return metadata
+
+    async def _save_image(
+        self, container_client: ContainerClient, blob_name: str, image_bytes: bytes
+    ) -> str:
+        uploaded = await self._upload(
+            container_client,
+            blob_name,
+            image_bytes,
+            "image/png",
+            self._image_metadata(image_bytes),
+        )
+        if uploaded and self.variant_widths and self.variant_formats:
+            variants = await render_variants(
+                image_bytes, self.variant_widths, self.variant_formats
+            )
+            for width, format, data in variants:
+                await self._upload(
+                    container_client,
+                    variant_name(blob_name, width, format),
+                    data,
+                    FORMATS[format][1],
+                )
+        return blob_name
+
+    async def _save_image_later(self, image_bytes: bytes, path: str | None) -> str:
+        assert self.uploads is not None
+        blob_name = self._image_name(image_bytes, path)
+
+        async def upload() -> None:
+            async with self.get_storage_client() as container_client:
+                await self._save_image(container_client, blob_name, image_bytes)
+
+        await self.uploads.submit(blob_name, image_bytes, "image/png", upload)
+        return blob_name
+
+    @traced("storage")
     async def save_image_blobs(
         self,
         images: list[str],
         path: str | None = None,
     ) -> AsyncGenerator[str, None]:
+        if self.uploads is not None:
+            for image in images:
+                yield await self._save_image_later(base64.b64decode(image), path)
+            return
+
         async with self.get_storage_client() as container_client:
             for image in images:
                 image_bytes = base64.b64decode(image)
-                blob_name = (
-                    f"images/{str(uuid.uuid4())}.png"
-                    if path is None
-                    else f"images/{path}/{str(uuid.uuid4())}.png"
-                )
-                await container_client.upload_blob(
-                    name=blob_name, data=image_bytes, overwrite=True
+                yield await self._save_image(
+                    container_client, self._image_name(image_bytes, path), image_bytes
                 )
-                yield blob_name
 
+    @traced("storage")
     async def save_image_blob(self, image: str, path: str | None = None) -> str:
+        if self.uploads is not None:
+            return await self._save_image_later(base64.b64decode(image), path)
+
         async with self.get_storage_client() as container_client:
             image_bytes = base64.b64decode(image)
-            blob_name = (
-                f"images/{str(uuid.uuid4())}.png"
-                if path is None
-                else f"images/{path}/{str(uuid.uuid4())}.png"
+            return await self._save_image(
+                container_client, self._image_name(image_bytes, path), image_bytes
             )
+
+    @traced("storage")
+    async def save_blob(self, blob_name: str, data: bytes, content_type: str) -> None:
+        """Upload bytes under an exact name, replacing any existing blob."""
+        async with self.get_storage_client() as container_client:
             await container_client.upload_blob(
-                name=blob_name, data=image_bytes, overwrite=True
+                name=blob_name,
+                data=data,
+                overwrite=True,
+                content_settings=ContentSettings(content_type=content_type),
             )
-            return blob_name
 
+    @traced("storage")
+    async def delete_blob(self, blob_name: str) -> None:
+        """Delete a blob if it exists."""
+        async with self.get_storage_client() as container_client:
+            try:
+                await container_client.delete_blob(blob_name)
+            except ResourceNotFoundError:
+                pass
+
+    @traced("storage")
+    async def get_blob_properties(self, blob_name: str) -> BlobProperties:
+        """Get the properties of a blob, raising ResourceNotFoundError if missing."""
+        async with self.get_storage_client() as container_client:
+            blob_client = container_client.get_blob_client(blob_name)
+            return await blob_client.get_blob_properties()
+
+    @traced("storage")
+    async def download_blob_chunks(
+        self,
+        blob_name: str,
+        offset: int = 0,
+        length: int | None = None,
+        etag: str | None = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream a blob, or a byte range of it, in bounded chunks.
+
+        Passing the etag seen in get_blob_properties guarantees every chunk
+        comes from the same version of the blob, and lets cached copies be
+        served from local disk.
+        """
+        if self.cache is None or etag is None:
+            async for chunk in self._stream_blob(blob_name, offset, length, etag):
+                yield chunk
+            return
+
+        cached = await self.cache.open_chunks(blob_name, etag, offset, length)
+        if cached is not None:
+            async for chunk in cached:
+                yield chunk
+            return
+
+        # fill the cache from complete reads of small blobs
+        fill: list[bytes] | None = [] if offset == 0 and length is None else None
+        filled = 0
+        async for chunk in self._stream_blob(blob_name, offset, length, etag):
+            if fill is not None:
+                filled += len(chunk)
+                if filled <= self.cache.max_entry_bytes:
+                    fill.append(chunk)
+                else:
+                    fill = None
+            yield chunk
+        if fill is not None:
+            await self.cache.put(blob_name, etag, b"".join(fill))
+
+    async def _stream_blob(
+        self, blob_name: str, offset: int, length: int | None, etag: str | None
+    ) -> AsyncGenerator[bytes, None]:
+        async with self.get_storage_client() as container_client:
+            downloader = await container_client.download_blob(
+                blob_name,
+                offset=offset,
+                length=length,
+                etag=etag,
+                match_condition=MatchConditions.IfNotModified if etag else None,
+            )
+            async for chunk in downloader.chunks():
+                yield chunk
+
+    @traced("storage")
+    async def list_blobs(self, prefix: str) -> AsyncGenerator[BlobProperties, None]:
+        """List the blobs whose names start with the prefix."""
+        async with self.get_storage_client() as container_client:
+            async for blob in container_client.list_blobs(name_starts_with=prefix):
+                yield blob
+
+    @traced("storage")
+    async def list_blob_page(
+        self, prefix: str, limit: int, continuation_token: str | None = None
+    ) -> tuple[list[BlobProperties], str | None]:
+        """List one page of blobs, with their metadata, under a prefix."""
+        async with self.get_storage_client() as container_client:
+            pages = container_client.list_blobs(
+                name_starts_with=prefix, include=["metadata"], results_per_page=limit
+            ).by_page(continuation_token=continuation_token)
+            blobs = []
+            async for page in pages:
+                blobs = [blob async for blob in page]
+                break
+            return blobs, pages.continuation_token
+
+    @traced("storage")
+    async def read_blob(self, blob_name: str) -> bytes:
+        """Read a whole blob, through the local cache when one is configured.
+
+        Raises ResourceNotFoundError if the blob does not exist.
+        """
+        if self.cache is None:
+            async with self.get_storage_client() as container_client:
+                downloader = await container_client.download_blob(blob_name)
+                return await downloader.readall()
+
+        etag = (await self.get_blob_properties(blob_name)).etag
+
+        async def fetch() -> bytes:
+            chunks = self._stream_blob(blob_name, 0, None, etag)
+            return b"".join([chunk async for chunk in chunks])
+
+        return await self.cache.get_or_fetch(blob_name, etag, fetch)
+
+    @traced("storage")
+    async def get_image_variant(self, blob_name: str, width: int, format: str) -> bytes:
+        """Get a resized derivative of an image, rendering it if it is missing.
+
+        Raises ResourceNotFoundError if the original image does not exist.
+        """
+        name = variant_name(blob_name, width, format)
+        try:
+            return await self.read_blob(name)
+        except ResourceNotFoundError:
+            pass
+
+        # rendered lazily for images saved before the variant was configured
+        original = await self.read_blob(blob_name)
+        [(_, _, data)] = await render_variants(original, [width], [format])
+        async with self.get_storage_client() as container_client:
+            await self._upload(container_client, name, data, FORMATS[format][1])
+        return data
+
+    @traced("storage")
+    async def create_upload_session(
+        self, blob_name: str, length: int, content_type: str
+    ) -> UploadSession:
+        """Start a resumable upload of `length` bytes to a reserved blob name.
+
+        The session is kept as a small JSON blob under uploads/ so any
+        replica can continue it; the bytes themselves are staged as
+        uncommitted blocks of the target blob.
+        """
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            blob_name=blob_name,
+            length=length,
+            content_type=content_type,
+        )
+        async with self.get_storage_client() as container_client:
+            await container_client.upload_blob(
+                name=_session_blob(session.id),
+                data=session.model_dump_json(exclude={"offset"}),
+                overwrite=True,
+            )
+        return session
+
+    @traced("storage")
+    async def get_upload_session(self, session_id: str) -> UploadSession:
+        """Load a session with its current offset.
+
+        The offset is the end of the contiguous run of staged chunks from the
+        start, so chunks sent out of order or in parallel are never skipped.
+        Raises ResourceNotFoundError for unknown or finished sessions.
+        """
+        async with self.get_storage_client() as container_client:
+            downloader = await container_client.download_blob(_session_blob(session_id))
+            session = UploadSession.model_validate_json(await downloader.readall())
+            blocks = await self._staged_blocks(container_client, session.blob_name)
+            session.offset = sum(size for _, size in _contiguous(blocks))
+            return session
+
+    @traced("storage")
+    async def stage_upload_chunk(
+        self, session: UploadSession, offset: int, data: bytes
+    ) -> None:
+        """Stage a chunk at a byte offset; re-sending an offset replaces it."""
+        async with self.get_storage_client() as container_client:
+            blob_client = container_client.get_blob_client(session.blob_name)
+            await blob_client.stage_block(_block_id(offset), data, length=len(data))
+
+    @traced("storage")
+    async def finalize_upload(self, session: UploadSession) -> bool:
+        """Commit the staged chunks in order, returning False if any are missing."""
+        async with self.get_storage_client() as container_client:
+            blocks = await self._staged_blocks(container_client, session.blob_name)
+            chain = _contiguous(blocks)
+            if sum(size for _, size in chain) != session.length:
+                return False
+
+            blob_client = container_client.get_blob_client(session.blob_name)
+            await blob_client.commit_block_list(
+                [BlobBlock(block_id=_block_id(offset)) for offset, _ in chain],
+                content_settings=ContentSettings(content_type=session.content_type),
+            )
+            await container_client.delete_blob(_session_blob(session.id))
+            return True
+
+    async def _staged_blocks(
+        self, container_client: ContainerClient, blob_name: str
+    ) -> dict[int, int]:
+        # offset -> size of every uncommitted block of the blob
+        blob_client = container_client.get_blob_client(blob_name)
+        try:
+            _, uncommitted = await blob_client.get_block_list("uncommitted")
+        except ResourceNotFoundError:
+            return {}
+        return {int(block.id): block.size for block in uncommitted}
+
+    @traced("storage")
     async def save_video_blob(
         self,
         stream_reader: StreamReader,
         path: str | None = None,
     ) -> str:
         async with self.get_storage_client() as container_client:
-            blob_name = (
-                f"videos/{str(uuid.uuid4())}.mp4"
-                if path is None
-                else f"videos/{path}/{str(uuid.uuid4())}.mp4"
-            )
-            content = await stream_reader.read()
-            await container_client.upload_blob(
-                name=blob_name, data=content, overwrite=True
-            )
+            if self.dedupe:
+                # hash while reading so the content is only walked once
+                sha = hashlib.sha256()
+                chunks = []
+                async for chunk in stream_reader.iter_chunked(_CHUNK_SIZE):
+                    sha.update(chunk)
+                    chunks.append(chunk)
+                content = b"".join(chunks)
+                blob_name = self._blob_name("videos", "mp4", path, sha.hexdigest())
+            else:
+                content = await stream_reader.read()
+                blob_name = self._blob_name("videos", "mp4", path, None)
+            await self._upload(container_client, blob_name, content, "video/mp4")
             return blob_name
+
+
+def _parse_time(value: str | None) -> datetime:
+    if not value:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _session_blob(session_id: str) -> str:
+    return f"uploads/{session_id}.json"
+
+
+def _block_id(offset: int) -> str:
+    # block ids of one blob must all have the same length
+    return f"{offset:020d}"
+
+
+def _contiguous(blocks: dict[int, int]) -> list[tuple[int, int]]:
+    """The chain of (offset, size) blocks running contiguously from zero."""
+    chain = []
+    offset = 0
+    while offset in blocks and blocks[offset] > 0:
+        chain.append((offset, blocks[offset]))
+        offset += blocks[offset]
+    return chain
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# how many finished uploads keep a queryable status
+_STATUS_HISTORY = 10_000
+
+
+@dataclass
+class PendingUpload:
+    name: str
+    data: bytes
+    content_type: str
+    upload: Callable[[], Awaitable[None]]
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    status: str = "pending"
+
+
+class UploadQueue:
+    """Write-behind queue for blobs whose names were already handed out.
+
+    Bytes are held in a bounded in-memory spool until a background worker
+    uploads them. Submitting blocks once the spool is full, so a slow storage
+    account pushes back on producers instead of growing memory. Until an
+    upload lands, its bytes can still be read from the spool.
+    """
+
+    def __init__(self, workers: int, max_bytes: int, retries: int):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.retries = retries
+        self._queue: asyncio.Queue[PendingUpload] = asyncio.Queue()
+        self._pending: dict[str, PendingUpload] = {}
+        self._finished: OrderedDict[str, str] = OrderedDict()
+        self._spooled = 0
+        self._space = asyncio.Condition()
+        self._tasks: list[asyncio.Task] = []
+        self._closed = False
+
+    def _start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._work()) for _ in range(self.workers)
+            ]
+
+    async def submit(
+        self,
+        name: str,
+        data: bytes,
+        content_type: str,
+        upload: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Spool an upload and return as soon as there is room for it."""
+        if self._closed:
+            raise RuntimeError("Upload queue is draining")
+        if name in self._pending:
+            # a deduplicated name: the same bytes are already on their way
+            return
+        if len(data) > self.max_bytes:
+            # would never fit in the spool
+            await upload()
+            return
+
+        self._start()
+        async with self._space:
+            await self._space.wait_for(
+                lambda: self._closed or self._spooled + len(data) <= self.max_bytes
+            )
+            closed = self._closed
+            if not closed:
+                self._spooled += len(data)
+        if closed:
+            # drained while waiting for room; nothing would pick it up anymore
+            await upload()
+            return
+        item = PendingUpload(name, data, content_type, upload)
+        self._pending[name] = item
+        await self._queue.put(item)
+
+    def spooled(self, name: str) -> PendingUpload | None:
+        """The spooled upload for a blob that has not reached storage yet."""
+        return self._pending.get(name)
+
+    def status(self, name: str) -> str | None:
+        """pending, uploaded or failed; None if the queue never saw the blob."""
+        item = self._pending.get(name)
+        if item is not None:
+            return item.status
+        return self._finished.get(name)
+
+    async def wait(self, name: str, timeout: float | None = None) -> str | None:
+        """Wait until a blob has been uploaded (or failed) and return its status."""
+        item = self._pending.get(name)
+        if item is not None:
+            try:
+                await asyncio.wait_for(item.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.status(name)
+
+    async def _work(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                item.status = await self._upload(item)
+            finally:
+                item.done.set()
+                self._pending.pop(item.name, None)
+                self._finished[item.name] = item.status
+                while len(self._finished) > _STATUS_HISTORY:
+                    self._finished.popitem(last=False)
+                async with self._space:
+                    self._spooled -= len(item.data)
+                    self._space.notify_all()
+                self._queue.task_done()
+
+    async def _upload(self, item: PendingUpload) -> str:
+        for attempt in range(self.retries + 1):
+            try:
+                await item.upload()
+                return "uploaded"
+            except Exception:
+                if attempt == self.retries:
+                    logger.exception("Giving up on upload of %s", item.name)
+                    return "failed"
+                delay = min(0.5 * 2**attempt, 30)
+                logger.warning("Upload of %s failed, retrying in %ss", item.name, delay)
+                await asyncio.sleep(delay)
+        return "failed"
+
+    async def drain(self) -> None:
+        """Stop accepting uploads and wait for every spooled one to finish.
+
+        Submits still waiting for room upload their bytes themselves, so
+        nothing is queued once the queue has been joined.
+        """
+        async with self._space:
+            self._closed = True
+            self._space.notify_all()
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
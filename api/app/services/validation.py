@@ -0,0 +1,83 @@
+import json
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import SchemaValidator
+
+if TYPE_CHECKING:
+    # what `__pydantic_validator__` is when validation plugins are installed
+    from pydantic.plugin._schema_validator import PluggableSchemaValidator
+
+# errors reported per rejected payload
+MAX_ERRORS = 10
+
+DataSchema = dict[str, Any] | type[BaseModel]
+
+_validators: dict[Hashable, "DataValidator"] = {}
+
+
+class DataValidator:
+    """Checks record `data` against a JSON Schema or a Pydantic model.
+
+    The schema is checked and compiled once. Pydantic models validate in
+    pydantic-core; JSON Schemas (drafts 4, 6 and 7) are compiled to Python
+    by the optional `fastjsonschema` package, which stops at the first
+    error. Validation never changes the data that is stored.
+    """
+
+    def __init__(self, schema: DataSchema):
+        self._model: SchemaValidator | PluggableSchemaValidator | None
+        self._schema: Callable[[Any], Any] | None
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            self._model = schema.__pydantic_validator__
+            self._schema = None
+        else:
+            import fastjsonschema  # type: ignore[import-untyped]
+
+            self._model = None
+            self._schema = fastjsonschema.compile(schema)
+            self._error = fastjsonschema.JsonSchemaValueException
+
+    def errors(self, data: dict) -> list[dict]:
+        """Validation errors in FastAPI's shape; empty when data is valid."""
+        if self._model is not None:
+            try:
+                self._model.validate_python(data)
+                return []
+            except ValidationError as e:
+                return [
+                    {
+                        "loc": ["body", "data", *error["loc"]],
+                        "msg": error["msg"],
+                        "type": error["type"],
+                    }
+                    for error in e.errors()[:MAX_ERRORS]
+                ]
+
+        assert self._schema is not None
+        try:
+            self._schema(data)
+            return []
+        except self._error as e:
+            # the path starts with the name of the validated value
+            return [
+                {
+                    "loc": ["body", "data", *e.path[1:]],
+                    "msg": e.message,
+                    "type": f"schema.{e.rule}",
+                }
+            ]
+
+
+def get_data_validator(schema: DataSchema) -> DataValidator:
+    """Get the compiled validator for a schema, compiling it on first use."""
+    key: Hashable
+    if isinstance(schema, type):
+        key = schema
+    else:
+        key = json.dumps(schema, sort_keys=True)
+    validator = _validators.get(key)
+    if validator is None:
+        validator = _validators[key] = DataValidator(schema)
+    return validator
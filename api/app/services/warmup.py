@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# longest pause between attempts of a failing check
+_MAX_RETRY_DELAY = 30.0
+
+
+class Warmup:
+    """Readiness gate that runs each warm-up check until it succeeds once.
+
+    Checks run concurrently in the background after startup. A failing
+    check is retried with exponential backoff, and the replica only reports
+    ready once every check has passed.
+    """
+
+    def __init__(self):
+        self.checks: dict[str, Callable[[], Awaitable[object]]] = {}
+        self.status: dict[str, str] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._task is not None and all(
+            status == "ok" for status in self.status.values()
+        )
+
+    def start(self, checks: dict[str, Callable[[], Awaitable[object]]]) -> None:
+        self.checks = checks
+        self.status = {name: "pending" for name in checks}
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        await asyncio.gather(*[self._check(name) for name in self.checks])
+
+    async def _check(self, name: str) -> None:
+        delay = 0.5
+        while True:
+            try:
+                await self.checks[name]()
+                self.status[name] = "ok"
+                return
+            except Exception as e:
+                self.status[name] = f"error: {e}"
+                logger.warning("Warm-up of %s failed, retrying in %ss", name, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _MAX_RETRY_DELAY)
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
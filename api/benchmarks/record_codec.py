@@ -0,0 +1,192 @@
+"""
+Benchmark the zstd codec for record `data`.
+
+Offline (default) it reports encoded sizes and codec CPU time for
+representative design and workflow documents. With --cosmos it also
+writes and reads each document against the Cosmos account in
+APP_DATABASE_CONNECTION, with and without compression, and reports RU
+charge and latency. A temporary container is created and deleted.
+
+    uv run --extra compression python -m benchmarks.record_codec [--cosmos]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+
+from app.dependencies import get_settings
+from app.models import Record
+from app.services.codec import DataCodec
+from app.services.cosmos import CosmosService
+
+WORDS = (
+    "you are a research assistant search the web for latest updates on azure ai "
+    "foundry summarise three most important items with sources hand summary to "
+    "writer suggested headline tone enterprise integration agents governance "
+    "customer workflow context window model reasoning retrieval grounding data "
+    "security compliance scale developers tools orchestration memory evaluate "
+    "draft review publish audience brand voice concise friendly technical blog"
+).split()
+
+# seeded so every run measures the same documents
+_random = random.Random(42)
+
+
+def prompt(words: int) -> str:
+    """Prompt-like text; natural language compresses far less than repeats."""
+    return " ".join(_random.choice(WORDS) for _ in range(words)) + "."
+
+
+def workflow(nodes: int) -> dict:
+    """Workflow data as saved by the web designer."""
+    return {
+        "nodes": [
+            {
+                "id": f"node-{i}",
+                "type": "agent",
+                "position": {"x": 120.0 * (i % 8), "y": 90.0 * (i // 8)},
+                "data": {
+                    "label": f"Agent {i}",
+                    "prompt": prompt(120),
+                },
+            }
+            for i in range(nodes)
+        ],
+        "edges": [
+            {
+                "id": f"edge-{i}",
+                "source": f"node-{i}",
+                "target": f"node-{i + 1}",
+                "data": {"label": "handoff", "task": "summarise"},
+            }
+            for i in range(nodes - 1)
+        ],
+    }
+
+
+def design(logo_bytes: int) -> dict:
+    """Design data with an inline data-URL logo, the worst common case."""
+    # PNG bytes are already compressed, so model them as random
+    logo = base64.b64encode(os.urandom(logo_bytes)).decode()
+    return {
+        "background": "#0f172a",
+        "logo": "data:image/png;base64," + logo,
+        "title": "Carson",
+        "subtitle": "Voice-driven agent workflows",
+        "description": prompt(400),
+    }
+
+
+SAMPLES = {
+    "workflow-20": workflow(20),
+    "workflow-100": workflow(100),
+    "workflow-400": workflow(400),
+    "design-logo-64k": design(64 * 1024),
+}
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def offline(codec: DataCodec, repeat: int) -> None:
+    print(
+        f"{'sample':<18}{'json':>10}{'stored':>10}{'ratio':>8}{'enc µs':>10}{'dec µs':>10}"
+    )
+    for name, data in SAMPLES.items():
+        document = {"id": name, "data": data}
+        plain = len(json.dumps(document, separators=(",", ":")))
+        encoded = codec.encode(document)
+        stored = len(json.dumps(encoded, separators=(",", ":")))
+        encode = timed(lambda: codec.encode(document), repeat)
+        decode = timed(lambda: codec.decode(encoded), repeat)
+        print(
+            f"{name:<18}{plain:>10}{stored:>10}{plain / stored:>8.1f}"
+            f"{encode:>10.0f}{decode:>10.0f}"
+        )
+
+
+async def measure(service: CosmosService, record: Record, repeat: int) -> dict:
+    write_ru, write_ms, read_ru, read_ms = [], [], [], []
+    async with service.get_cosmos_client() as container:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await service.upsert_item(record)
+            write_ms.append((time.perf_counter() - start) * 1000)
+            headers = container.client_connection.last_response_headers
+            write_ru.append(float(headers["x-ms-request-charge"]))
+
+            start = time.perf_counter()
+            await service.get_item(record.id)
+            read_ms.append((time.perf_counter() - start) * 1000)
+            headers = container.client_connection.last_response_headers
+            read_ru.append(float(headers["x-ms-request-charge"]))
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+
+    return {
+        "write RU": statistics.mean(write_ru),
+        "write p50 ms": statistics.median(write_ms),
+        "write p95 ms": p95(write_ms),
+        "read RU": statistics.mean(read_ru),
+        "read p50 ms": statistics.median(read_ms),
+        "read p95 ms": p95(read_ms),
+    }
+
+
+async def online(codec: DataCodec, repeat: int) -> None:
+    settings = get_settings()
+    container = f"bench-codec-{uuid.uuid4().hex[:8]}"
+    services = {
+        "plain": CosmosService(
+            settings.database_connection, settings.database_name, container, "bench"
+        ),
+        "zstd": CosmosService(
+            settings.database_connection,
+            settings.database_name,
+            container,
+            "bench",
+            codec=codec,
+        ),
+    }
+    await services["plain"].create_container_if_not_exists()
+    try:
+        for name, data in SAMPLES.items():
+            for mode, service in services.items():
+                record = Record(id=f"{name}-{mode}", name=name, data=data)
+                result = await measure(service, record, repeat)
+                cells = "  ".join(f"{k} {v:.2f}" for k, v in result.items())
+                print(f"{name:<18}{mode:<6}{cells}")
+    finally:
+        async with services["plain"].get_client() as client:
+            await client.get_database_client(settings.database_name).delete_container(
+                container
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cosmos", action="store_true", help="measure RU too")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threshold", type=int, default=16 * 1024)
+    parser.add_argument("--level", type=int, default=3)
+    args = parser.parse_args()
+
+    codec = DataCodec(threshold=args.threshold, level=args.level)
+    offline(codec, args.repeat)
+    if args.cosmos:
+        asyncio.run(online(codec, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
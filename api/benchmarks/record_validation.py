@@ -0,0 +1,124 @@
+"""
+Benchmark per-type validation of record `data`.
+
+Validates workflow documents of increasing size against an equivalent
+JSON Schema and Pydantic model and reports the cost per KB of payload,
+next to parsing the same JSON for scale.
+
+    uv run --extra validation python -m benchmarks.record_validation
+"""
+
+import argparse
+import json
+
+from pydantic import BaseModel
+
+from app.services.validation import get_data_validator
+
+from .record_codec import timed, workflow
+
+WORKFLOW_SCHEMA = {
+    "type": "object",
+    "required": ["nodes", "edges"],
+    "properties": {
+        "nodes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "type", "position", "data"],
+                "properties": {
+                    "id": {"type": "string"},
+                    "type": {"type": "string"},
+                    "position": {
+                        "type": "object",
+                        "required": ["x", "y"],
+                        "properties": {
+                            "x": {"type": "number"},
+                            "y": {"type": "number"},
+                        },
+                    },
+                    "data": {
+                        "type": "object",
+                        "properties": {
+                            "label": {"type": "string"},
+                            "prompt": {"type": "string"},
+                        },
+                    },
+                },
+            },
+        },
+        "edges": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "source", "target"],
+                "properties": {
+                    "id": {"type": "string"},
+                    "source": {"type": "string"},
+                    "target": {"type": "string"},
+                    "data": {"type": "object"},
+                },
+            },
+        },
+    },
+}
+
+
+class Position(BaseModel):
+    x: float
+    y: float
+
+
+class NodeData(BaseModel):
+    label: str = ""
+    prompt: str = ""
+
+
+class Node(BaseModel):
+    id: str
+    type: str
+    position: Position
+    data: NodeData
+
+
+class Edge(BaseModel):
+    id: str
+    source: str
+    target: str
+    data: dict = {}
+
+
+class Workflow(BaseModel):
+    nodes: list[Node]
+    edges: list[Edge]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    validators = {
+        "fastjsonschema": get_data_validator(WORKFLOW_SCHEMA),
+        "pydantic": get_data_validator(Workflow),
+    }
+    print(f"{'nodes':>6}{'KB':>8}{'parse µs/KB':>14}", end="")
+    for name in validators:
+        print(f"{name + ' µs':>20}{'µs/KB':>8}", end="")
+    print()
+
+    for nodes in (5, 20, 100, 400):
+        data = workflow(nodes)
+        payload = json.dumps(data)
+        kb = len(payload) / 1024
+        parse = timed(lambda: json.loads(payload), args.repeat)
+        print(f"{nodes:>6}{kb:>8.1f}{parse / kb:>14.2f}", end="")
+        for validator in validators.values():
+            assert validator.errors(data) == []
+            cost = timed(lambda: validator.errors(data), args.repeat)
+            print(f"{cost:>20.0f}{cost / kb:>8.2f}", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
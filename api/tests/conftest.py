@@ -6,13 +6,16 @@ This module provides shared fixtures and configuration for all tests.
 
 import pytest
 import asyncio
+import contextlib
 from typing import AsyncGenerator, Generator
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
 from app.main import app
-from app.services import StorageService
+from app.routers import create_router
+from app.services import CosmosService, StorageService
 from app.models import Settings
 
 
@@ -87,6 +90,83 @@ def mock_storage_service(
     return service
 
 
+@pytest.fixture
+def make_cosmos_service():
+    """Build CosmosServices whose container client is the given mock.
+
+    Keyword arguments are passed to CosmosService; the service defaults to
+    the design type in its own designs container.
+    """
+
+    def make(container, **kwargs) -> CosmosService:
+        service = CosmosService(
+            **{
+                "connection_string": "AccountEndpoint=https://test/;AccountKey=a2V5;",
+                "database_name": "carson",
+                "container_name": "designs",
+                "type": "design",
+                **kwargs,
+            }
+        )
+
+        @contextlib.asynccontextmanager
+        async def get_cosmos_client():
+            yield container
+
+        service.get_cosmos_client = get_cosmos_client
+        return service
+
+    return make
+
+
+@pytest.fixture
+def record_service(monkeypatch) -> MagicMock:
+    """Mock CosmosService handed to every record route.
+
+    Its Cosmos calls are AsyncMocks returning None; tests set the return
+    values they need.
+    """
+    service = MagicMock()
+    service.type = "design"
+    service.tombstone_ttl = 3600
+    for name in (
+        "create_container_if_not_exists",
+        "get_item",
+        "read_items",
+        "upsert_item",
+        "patch_item",
+        "delete_item",
+        "changed_since",
+    ):
+        setattr(service, name, AsyncMock())
+    monkeypatch.setattr(
+        "app.routers.record.get_record_service", lambda **kwargs: service
+    )
+    return service
+
+
+@pytest.fixture
+def make_record_client():
+    """Build TestClients for record routes; keyword arguments go to
+    create_router, which serves designs from their own container by default.
+    """
+
+    def make(**kwargs) -> TestClient:
+        app = FastAPI()
+        app.include_router(
+            create_router(**{"database": "designs", "type": "design", **kwargs})
+        )
+        return TestClient(app)
+
+    return make
+
+
+@pytest.fixture
+def record_client(make_record_client) -> TestClient:
+    """TestClient for the design record routes."""
+    return make_record_client()
+
+
 @pytest.fixture
 def sample_base64_image() -> str:
     """Sample base64-encoded image data for testing."""
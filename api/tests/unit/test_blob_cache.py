@@ -0,0 +1,120 @@
+"""
+Unit tests for the on-disk BlobCache.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.services.cache import BlobCache
+
+
+@pytest.fixture
+def cache(tmp_path) -> BlobCache:
+    """A small cache in a temporary directory."""
+    return BlobCache(directory=str(tmp_path), max_bytes=100, max_entry_bytes=60)
+
+
+async def test_put_then_get_is_a_hit(cache):
+    """Stored content is served back and counted as bytes saved."""
+    await cache.put("images/a.png", '"1"', b"a" * 40)
+
+    assert await cache.get("images/a.png", '"1"') == b"a" * 40
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["bytes_saved"] == 40
+
+
+async def test_changed_etag_is_a_miss(cache):
+    """Entries are keyed by ETag, so a new version of a blob misses."""
+    await cache.put("images/a.png", '"1"', b"a" * 40)
+
+    assert await cache.get("images/a.png", '"2"') is None
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+async def test_ranged_read(cache):
+    """Byte ranges are read straight from the cached file."""
+    await cache.put("videos/v.mp4", '"1"', bytes(range(50)))
+
+    chunks = await cache.open_chunks("videos/v.mp4", '"1"', offset=10, length=5)
+
+    assert b"".join([chunk async for chunk in chunks]) == bytes(range(10, 15))
+
+
+async def test_least_recently_used_entry_is_evicted(cache, tmp_path):
+    """Going over budget removes the least recently used entry from disk."""
+    await cache.put("images/a.png", '"1"', b"a" * 40)
+    await cache.put("images/b.png", '"1"', b"b" * 40)
+    await cache.get("images/a.png", '"1"')
+    await cache.put("images/c.png", '"1"', b"c" * 40)
+
+    assert await cache.get("images/b.png", '"1"') is None
+    assert await cache.get("images/a.png", '"1"') == b"a" * 40
+    assert cache.stats()["size_bytes"] == 80
+    assert len(os.listdir(tmp_path)) == 2
+
+
+async def test_oversized_entries_are_not_cached(cache):
+    """Blobs larger than max_entry_bytes bypass the cache."""
+    await cache.put("videos/big.mp4", '"1"', b"x" * 61)
+
+    assert await cache.get("videos/big.mp4", '"1"') is None
+
+
+async def test_concurrent_misses_share_one_fetch(cache):
+    """Concurrent readers of a missing entry trigger a single fetch."""
+    calls = 0
+
+    async def fetch() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"payload"
+
+    results = await asyncio.gather(
+        *[cache.get_or_fetch("images/a.png", '"1"', fetch) for _ in range(5)]
+    )
+
+    assert results == [b"payload"] * 5
+    assert calls == 1
+
+
+async def test_entries_survive_a_restart(cache, tmp_path):
+    """A new cache over the same directory adopts existing entries."""
+    await cache.put("images/a.png", '"1"', b"a" * 40)
+
+    restarted = BlobCache(directory=str(tmp_path), max_bytes=100, max_entry_bytes=60)
+
+    assert await restarted.get("images/a.png", '"1"') == b"a" * 40
+
+
+async def test_startup_keeps_other_workers_temp_files(cache, tmp_path):
+    """Only temp files abandoned long ago are removed."""
+    fresh = tmp_path / "fresh.tmp"
+    stale = tmp_path / "stale.tmp"
+    fresh.write_bytes(b"x")
+    stale.write_bytes(b"x")
+    os.utime(stale, (0, 0))
+
+    await cache.get("images/a.png", '"1"')
+
+    assert fresh.exists()
+    assert not stale.exists()
+
+
+async def test_failed_cache_writes_do_not_fail_reads(cache, monkeypatch):
+    """A temp file removed underneath the cache only skips caching."""
+
+    async def replace(source, target):
+        raise FileNotFoundError(source)
+
+    async def fetch() -> bytes:
+        return b"a" * 40
+
+    monkeypatch.setattr("app.services.cache.aiofiles.os.replace", replace)
+
+    data = await cache.get_or_fetch("images/a.png", '"1"', fetch)
+
+    assert data == b"a" * 40
+    assert await cache.get("images/a.png", '"1"') is None
@@ -0,0 +1,85 @@
+"""
+Unit tests for adaptive concurrency limiting on the record routes.
+"""
+
+import pytest
+from azure.cosmos.exceptions import CosmosHttpResponseError
+from fastapi.testclient import TestClient
+
+from app.services.limiter import AdaptiveLimiter
+
+
+def make_limiter(**kwargs) -> AdaptiveLimiter:
+    options = dict(initial=4, minimum=2, maximum=8, latency_target=1.0)
+    return AdaptiveLimiter(**{**options, **kwargs})
+
+
+def test_limiter_sheds_beyond_the_limit():
+    limiter = make_limiter()
+
+    assert [limiter.try_acquire() for _ in range(5)] == [True] * 4 + [False]
+    assert limiter.stats() == {"limit": 4, "in_flight": 4, "shed": 1}
+
+
+def test_limiter_grows_while_busy_and_fast():
+    limiter = make_limiter()
+
+    for _ in range(20):
+        for _ in range(int(limiter.limit)):
+            limiter.try_acquire()
+        while limiter.in_flight:
+            limiter.release(0.01)
+
+    assert limiter.limit == 8
+
+
+def test_limiter_backs_off_once_per_overload():
+    """A burst of slow completions is one multiplicative decrease."""
+    limiter = make_limiter(initial=8, backoff=0.5)
+    for _ in range(8):
+        limiter.try_acquire()
+
+    for _ in range(8):
+        limiter.release(5.0)
+
+    assert limiter.limit == 4
+
+
+@pytest.fixture
+def make_client(monkeypatch, make_record_client):
+    """Build a record client whose routes share the given limiter."""
+
+    def make(limiter: AdaptiveLimiter) -> TestClient:
+        monkeypatch.setattr(
+            "app.routers.record.get_concurrency_limiter", lambda: limiter
+        )
+        return make_record_client()
+
+    return make
+
+
+def test_route_returns_503_when_the_limit_is_reached(make_client, record_service):
+    limiter = make_limiter()
+    client = make_client(limiter)
+    limiter.in_flight = 4
+
+    response = client.get("/design/abc/")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_cosmos_throttling_is_passed_through_as_429(make_client, record_service):
+    """Throttled reads are 429 with Cosmos' retry hint and shrink the limit."""
+    throttled = CosmosHttpResponseError(status_code=429, message="Too many requests")
+    throttled.headers = {"x-ms-retry-after-ms": "2500"}
+    record_service.get_item.side_effect = throttled
+    limiter = make_limiter()
+    client = make_client(limiter)
+
+    response = client.get("/design/abc/")
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+    assert limiter.limit < 4
+    assert limiter.in_flight == 0
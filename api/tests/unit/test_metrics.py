@@ -0,0 +1,62 @@
+"""
+Unit tests for the Prometheus metrics surface.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+from app.observability.metrics import monitor_event_loop
+
+
+def sample(name: str, labels: dict | None = None) -> float:
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_requests_are_labelled_with_the_route_template(monkeypatch):
+    """Record routes report `/design/{id}/`, not the concrete path."""
+    service = AsyncMock()
+    service.get_item.return_value = None
+    monkeypatch.setattr(
+        "app.routers.record.get_record_service", lambda **kwargs: service
+    )
+    labels = {"method": "GET", "route": "/design/{id}/", "status": "404"}
+    before = sample("http_requests_total", labels)
+
+    response = TestClient(app).get("/design/abc-123/")
+
+    assert response.status_code == 404
+    assert sample("http_requests_total", labels) == before + 1
+    assert sample("http_request_duration_seconds_count", labels) == before + 1
+
+
+def test_unmatched_paths_share_one_label():
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("http_requests_total", labels)
+
+    TestClient(app).get("/no/such/path")
+
+    assert sample("http_requests_total", labels) == before + 1
+
+
+def test_metrics_endpoint_exposes_text_format():
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_requests_in_flight" in response.text
+    assert "event_loop_lag_seconds" in response.text
+
+
+async def test_monitor_event_loop_observes_lag():
+    before = sample("event_loop_lag_seconds_count")
+
+    monitor = asyncio.create_task(monitor_event_loop(interval=0.01))
+    await asyncio.sleep(0.05)
+    monitor.cancel()
+    await asyncio.gather(monitor, return_exceptions=True)
+
+    assert sample("event_loop_lag_seconds_count") > before
@@ -0,0 +1,117 @@
+"""
+Unit tests for the per-request profiling middleware.
+"""
+
+import asyncio
+import json
+import sys
+
+import pytest
+
+pytest.importorskip("pyinstrument")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+from app.models import Settings
+from app.observability import ProfilingMiddleware
+
+
+def make_app(saved: dict, **settings) -> FastAPI:
+    app = FastAPI()
+
+    async def save(name: str, data: bytes) -> None:
+        saved[name] = data
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        settings=Settings(**{"profiling_enabled": True, **settings}),
+        save=save,
+    )
+
+    @app.get("/design/{id}/")
+    async def get_design(id: str):
+        await asyncio.sleep(0.01)
+        return {"id": id}
+
+    return app
+
+
+async def test_header_requests_a_speedscope_profile():
+    saved = {}
+    transport = ASGITransport(app=make_app(saved))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/design/a/", headers={"X-Profile": "1"})
+    # profiles are saved in the background after the response
+    for _ in range(100):
+        if saved:
+            break
+        await asyncio.sleep(0.01)
+
+    profile_id = response.headers["x-profile-id"]
+    (name,) = saved
+    assert profile_id in name
+    assert name.endswith("-GET-design_id.speedscope.json")
+    assert "speedscope" in json.loads(saved[name])["$schema"]
+
+
+def test_requests_are_not_profiled_by_default():
+    saved = {}
+    client = TestClient(make_app(saved))
+
+    response = client.get("/design/a/")
+
+    assert "x-profile-id" not in response.headers
+    assert saved == {}
+
+
+@pytest.mark.parametrize("value", ["0", "false", "no", ""])
+def test_false_header_values_do_not_request_a_profile(value):
+    saved = {}
+    client = TestClient(make_app(saved))
+
+    response = client.get("/design/a/", headers={"X-Profile": value})
+
+    assert "x-profile-id" not in response.headers
+
+
+@pytest.mark.parametrize("value", ["true", "Yes", "on"])
+def test_true_header_values_request_a_profile(value):
+    client = TestClient(make_app({}))
+
+    response = client.get("/design/a/", headers={"X-Profile": value})
+
+    assert "x-profile-id" in response.headers
+
+
+def test_profiles_per_minute_are_capped():
+    """Past the budget, even requests asking for a profile run unprofiled."""
+    saved = {}
+    client = TestClient(make_app(saved, profiling_max_per_minute=2))
+
+    responses = [client.get("/design/a/", headers={"X-Profile": "1"}) for _ in range(4)]
+
+    assert ["x-profile-id" in r.headers for r in responses] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_disabled_profiling_ignores_the_header():
+    saved = {}
+    client = TestClient(make_app(saved, profiling_enabled=False))
+
+    response = client.get("/design/a/", headers={"X-Profile": "1"})
+
+    assert "x-profile-id" not in response.headers
+
+
+def test_enabled_profiling_needs_pyinstrument_at_startup(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyinstrument", None)
+
+    with pytest.raises(ImportError):
+        ProfilingMiddleware(None, Settings(profiling_enabled=True), save=None)
+    ProfilingMiddleware(None, Settings(profiling_enabled=False), save=None)
@@ -0,0 +1,36 @@
+"""
+Unit tests for batched record reads.
+"""
+
+from app.services.cosmos import Item
+
+
+def test_batch_read_keeps_order_and_reports_missing(record_client, record_service):
+    record_service.read_items.return_value = [
+        Item(id="b", name="B", type="design"),
+        Item(id="a", name="A", type="design"),
+    ]
+
+    response = record_client.post("/design/_get", json={"ids": ["a", "x", "b", "a"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == ["a", "b"]
+    assert body["missing"] == ["x"]
+    record_service.read_items.assert_awaited_once_with(["a", "x", "b"])
+
+
+def test_batch_read_limits_the_number_of_ids(record_client, record_service):
+    response = record_client.post(
+        "/design/_get", json={"ids": [str(i) for i in range(257)]}
+    )
+
+    assert response.status_code == 422
+    record_service.read_items.assert_not_awaited()
+
+
+def test_empty_batch_skips_cosmos(record_client, record_service):
+    response = record_client.post("/design/_get", json={"ids": []})
+
+    assert response.json() == {"items": [], "missing": []}
+    record_service.read_items.assert_not_awaited()
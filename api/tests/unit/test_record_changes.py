@@ -0,0 +1,201 @@
+"""
+Unit tests for the changes-since sync endpoint and delete tombstones.
+"""
+
+import contextlib
+import time
+from unittest.mock import ANY, AsyncMock, MagicMock
+
+import pytest
+
+from app.services.cosmos import Item
+
+
+def changes_container(documents: list[dict]) -> MagicMock:
+    """Container mock answering the changes queries from a list."""
+    container = MagicMock()
+
+    def query_items(query, parameters, enable_cross_partition_query, **kwargs):
+        values = {p["name"]: p["value"] for p in parameters}
+        if "TOP @limit" in query:
+            found = sorted(
+                (d for d in documents if d["_ts"] >= values["@since"]),
+                key=lambda d: d["_ts"],
+            )[: values["@limit"]]
+        elif "TOP 1" in query:
+            found = sorted(
+                (d for d in documents if d["_ts"] > values["@since"]),
+                key=lambda d: d["_ts"],
+            )[:1]
+        else:
+            found = [d for d in documents if d["_ts"] == values["@since"]]
+
+        async def iterate():
+            for document in found:
+                yield document
+
+        return iterate()
+
+    container.query_items = MagicMock(side_effect=query_items)
+    return container
+
+
+async def test_changes_resume_without_skipping_a_second(make_cosmos_service):
+    documents = [
+        {"id": "a", "_ts": 10},
+        {"id": "b", "_ts": 11},
+        {"id": "c", "_ts": 11},
+        {"id": "d", "_ts": 12},
+    ]
+    service = make_cosmos_service(changes_container(documents))
+
+    items, resume, more = await service.changed_since(0, 2)
+    assert [item.id for item in items] == ["a"]
+    assert (resume, more) == (11, True)
+
+    items, resume, more = await service.changed_since(resume, 2)
+    assert [item.id for item in items] == ["b", "c"]
+    assert (resume, more) == (12, True)
+
+    items, resume, more = await service.changed_since(resume, 2)
+    assert [item.id for item in items] == ["d"]
+    assert (resume, more) == (12, False)
+
+
+async def test_changes_return_a_crowded_second_whole(make_cosmos_service):
+    """The newest second is repeated even when it holds more than a page."""
+    documents = [{"id": str(i), "_ts": 20} for i in range(5)]
+    service = make_cosmos_service(changes_container(documents))
+
+    items, resume, more = await service.changed_since(0, 2)
+
+    assert len(items) == 5
+    assert (resume, more) == (20, False)
+
+    documents.append({"id": "late", "_ts": 20})
+    documents.append({"id": "next", "_ts": 23})
+    items, resume, more = await service.changed_since(resume, 2)
+
+    assert len(items) == 6
+    assert (resume, more) == (23, True)
+
+    items, resume, more = await service.changed_since(resume, 2)
+    assert [item.id for item in items] == ["next"]
+
+
+WITHOUT_TTL = {"id": "designs", "partitionKey": {"paths": ["/id"]}}
+
+
+@pytest.mark.parametrize(
+    "properties, replaced",
+    [(WITHOUT_TTL, True), ({**WITHOUT_TTL, "defaultTtl": -1}, False)],
+)
+@pytest.mark.parametrize("first_use", ["create", "delete"])
+async def test_existing_containers_get_ttl_for_tombstones(
+    properties, replaced, first_use, make_cosmos_service, monkeypatch
+):
+    """Creates and deletes alike turn TTL on, so tombstones expire."""
+    monkeypatch.setattr("app.services.cosmos._ttl_checked", set())
+    container = MagicMock()
+    container.read = AsyncMock(return_value=properties)
+    container.upsert_item = AsyncMock()
+    database = MagicMock()
+    database.read = AsyncMock()
+    database.get_container_client.return_value = container
+    database.replace_container = AsyncMock()
+    client = MagicMock()
+    client.get_database_client.return_value = database
+    service = make_cosmos_service(container, tombstone_ttl=3600)
+
+    @contextlib.asynccontextmanager
+    async def get_client():
+        yield client
+
+    service.get_client = get_client
+
+    if first_use == "create":
+        await service.create_container_if_not_exists()
+    await service.delete_item("a")
+    await service.delete_item("b")
+
+    assert database.replace_container.await_count == int(replaced)
+    if replaced:
+        assert database.replace_container.await_args.kwargs["default_ttl"] == -1
+
+
+async def test_delete_leaves_a_tombstone_that_reads_skip(make_cosmos_service):
+    container = MagicMock()
+    container.read = AsyncMock(return_value={**WITHOUT_TTL, "defaultTtl": -1})
+    container.upsert_item = AsyncMock()
+    container.read_item = AsyncMock(
+        return_value={"id": "a", "type": "design", "deleted": True}
+    )
+    service = make_cosmos_service(container, tombstone_ttl=60)
+
+    await service.delete_item("a")
+
+    container.upsert_item.assert_awaited_once_with(
+        {"id": "a", "type": "design", "deleted": True, "ttl": 60},
+        response_hook=ANY,
+    )
+    container.delete_item.assert_not_called()
+    assert await service.get_item("a") is None
+
+
+async def test_delete_without_tombstones_removes_the_item(make_cosmos_service):
+    container = MagicMock()
+    container.delete_item = AsyncMock()
+    service = make_cosmos_service(container, tombstone_ttl=0)
+
+    await service.delete_item("a")
+
+    container.delete_item.assert_awaited_once_with(
+        item="a", partition_key="a", response_hook=ANY
+    )
+
+
+@pytest.fixture
+def service(record_service):
+    record_service.changed_since.return_value = (
+        [
+            Item(id="a", name="A", type="design", _ts=100),
+            Item(id="b", type="design", deleted=True, ttl=3600, _ts=101),
+        ],
+        101,
+        False,
+    )
+    return record_service
+
+
+def test_changes_split_updates_and_deletes(record_client, service):
+    since = int(time.time()) - 60
+    response = record_client.get(f"/design/_changes?since={since}&limit=50")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == ["a"]
+    assert body["deleted"] == ["b"]
+    assert body["token"] == "101"
+    assert body["more"] is False
+    service.changed_since.assert_awaited_once_with(since, 50)
+
+
+def test_changes_start_from_the_beginning(record_client, service):
+    response = record_client.get("/design/_changes")
+
+    assert response.status_code == 200
+    service.changed_since.assert_awaited_once_with(0, 100)
+
+
+def test_changes_reject_invalid_tokens(record_client, service):
+    response = record_client.get("/design/_changes?since=abc")
+
+    assert response.status_code == 400
+    service.changed_since.assert_not_awaited()
+
+
+def test_changes_tokens_expire_with_tombstones(record_client, service):
+    response = record_client.get(f"/design/_changes?since={int(time.time()) - 7200}")
+
+    assert response.status_code == 410
+    service.changed_since.assert_not_awaited()
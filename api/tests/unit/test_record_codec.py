@@ -0,0 +1,61 @@
+"""
+Unit tests for the compressed at-rest encoding of record data.
+"""
+
+import base64
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("zstandard")
+
+from app.models import Record
+from app.services.codec import DataCodec
+
+LARGE = {
+    "nodes": [{"id": f"node-{i}", "prompt": "summarise the news"} for i in range(200)]
+}
+
+
+def test_small_data_is_stored_as_is():
+    codec = DataCodec(threshold=1024)
+    document = {"id": "a", "data": {"x": 1}}
+
+    assert codec.encode(document) is document
+
+
+def test_large_data_round_trips():
+    codec = DataCodec(threshold=1024)
+    document = {"id": "a", "data": LARGE}
+
+    encoded = codec.encode(document)
+
+    assert encoded["data"] == {}
+    assert len(encoded["data_zstd"]) < len(json.dumps(LARGE)) / 4
+    assert codec.decode(encoded) == document
+
+
+def test_incompressible_data_is_stored_as_is():
+    """Compression is skipped when it would not make the document smaller."""
+    codec = DataCodec(threshold=1024)
+    document = {
+        "id": "a",
+        "data": {"logo": base64.b64encode(os.urandom(4096)).decode()},
+    }
+
+    assert codec.encode(document) is document
+
+
+async def test_cosmos_service_compresses_writes_and_decodes_reads(make_cosmos_service):
+    container = MagicMock()
+    container.upsert_item = AsyncMock(side_effect=lambda body, **kwargs: body)
+    service = make_cosmos_service(container, codec=DataCodec(threshold=1024))
+
+    result = await service.upsert_item(Record(id="a", data=LARGE))
+
+    stored = container.upsert_item.await_args.args[0]
+    assert stored["data"] == {} and "data_zstd" in stored
+    assert result.data == LARGE
+    assert not hasattr(result, "data_zstd")
@@ -0,0 +1,102 @@
+"""
+Unit tests for the record change hub and its server-sent event stream.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.routers.record import RESYNC_EVENT, encode_change, stream_changes
+from app.services.events import RESYNC, ChangeHub, Subscription
+
+
+def make_hub(source, queue_size: int = 10) -> ChangeHub:
+    return ChangeHub(
+        source=source,
+        encode=lambda document, token: f"{document['id']}@{token}",
+        interval=0.01,
+        queue_size=queue_size,
+        now=lambda: 100,
+    )
+
+
+async def test_subscribers_share_one_poll():
+    source = AsyncMock(return_value=([{"id": "a", "_ts": 100}], 100, False))
+    hub = make_hub(source)
+
+    async with hub.subscribe() as first, hub.subscribe() as second:
+        await hub.poll()
+        assert await first.get(0) == "a@100"
+        assert await second.get(0) == "a@100"
+
+    source.assert_any_await(100)
+    assert hub.subscribers == 0
+
+
+async def test_repeated_second_is_published_once():
+    pages = [
+        ([{"id": "a", "_ts": 100, "_etag": "1"}], 100, False),
+        (
+            [
+                {"id": "a", "_ts": 100, "_etag": "1"},
+                {"id": "b", "_ts": 100, "_etag": "1"},
+            ],
+            100,
+            False,
+        ),
+        ([{"id": "a", "_ts": 101, "_etag": "2"}], 101, False),
+    ]
+    hub = make_hub(AsyncMock(side_effect=pages))
+    subscription = Subscription(10)
+    hub._subscribers.add(subscription)
+
+    for _ in pages:
+        await hub.poll()
+
+    events = [await subscription.get(0) for _ in range(4)]
+    assert events == ["a@100", "b@100", "a@101", None]
+    assert hub.token == "101"
+
+
+def test_slow_subscriber_is_told_to_resync():
+    subscription = Subscription(2)
+
+    for event in ["a", "b", "c", "d"]:
+        subscription.put(event)
+
+    assert subscription._queue.qsize() == 2
+    assert subscription._queue.get_nowait() == RESYNC
+    assert subscription._queue.get_nowait() == "d"
+    assert subscription.dropped == 2
+
+
+async def test_poller_stops_with_the_last_subscriber():
+    hub = make_hub(AsyncMock(return_value=([], 100, False)))
+
+    async with hub.subscribe():
+        task = hub._task
+        await asyncio.sleep(0.03)
+
+    await asyncio.sleep(0)
+    assert task.cancelled()
+    assert hub._task is None
+
+
+def test_encode_change_omits_data():
+    change = encode_change({"id": "a", "name": "A", "data": {"x": 1}}, "7")
+    delete = encode_change({"id": "b", "deleted": True}, "7")
+
+    assert change.startswith("id: 7\nevent: change\n")
+    assert '"data":{}' in change
+    assert delete == 'id: 7\nevent: delete\ndata: {"id": "b"}\n\n'
+
+
+async def test_stream_resyncs_clients_that_missed_changes():
+    hub = make_hub(AsyncMock(return_value=([], 100, False)))
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=True)
+
+    fresh = [event async for event in stream_changes(hub, request, None, 1)]
+    behind = [event async for event in stream_changes(hub, request, "42", 1)]
+
+    assert fresh == ["id: 100\nevent: ready\ndata: {}\n\n"]
+    assert behind == [RESYNC_EVENT, "id: 100\nevent: ready\ndata: {}\n\n"]
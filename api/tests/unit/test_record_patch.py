@@ -0,0 +1,162 @@
+"""
+Unit tests for partial record updates.
+"""
+
+import pytest
+from azure.cosmos.exceptions import CosmosHttpResponseError
+
+from app.services.cosmos import Item
+from app.services.patch import (
+    PatchError,
+    apply_operations,
+    json_patch_operations,
+    merge_patch_operations,
+)
+
+
+def test_json_patch_maps_to_cosmos_operations():
+    operations = json_patch_operations(
+        [
+            {"op": "replace", "path": "/name", "value": "Renamed"},
+            {"op": "add", "path": "/data/colors/-", "value": "red"},
+            {"op": "incr", "path": "/data/version", "value": 1},
+            {"op": "remove", "path": "/data/draft"},
+            {"op": "move", "from": "/data/old", "path": "/data/new"},
+        ]
+    )
+
+    assert operations == [
+        {"op": "replace", "path": "/name", "value": "Renamed"},
+        {"op": "add", "path": "/data/colors/-", "value": "red"},
+        {"op": "incr", "path": "/data/version", "value": 1},
+        {"op": "remove", "path": "/data/draft"},
+        {"op": "move", "path": "/data/new", "from": "/data/old"},
+    ]
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        [{"op": "replace", "path": "/id", "value": "other"}],
+        [{"op": "replace", "path": "/default", "value": True}],
+        [{"op": "remove", "path": "/name"}],
+        [{"op": "test", "path": "/name", "value": "x"}],
+        [{"op": "incr", "path": "/data/count", "value": "1"}],
+        [{"op": "set", "path": "/data", "value": []}],
+        [{"op": "set", "path": f"/data/k{i}", "value": i} for i in range(11)],
+        [],
+    ],
+)
+def test_json_patch_rejects_unsafe_or_oversized_patches(patch):
+    with pytest.raises(PatchError):
+        json_patch_operations(patch)
+
+
+def test_merge_patch_sets_fields_and_data_keys():
+    """Nulls remove data keys; other values are set, escaping the key."""
+    operations = merge_patch_operations(
+        {"description": "New", "data": {"a/b": 1, "gone": None}}
+    )
+
+    assert operations == [
+        {"op": "set", "path": "/description", "value": "New"},
+        {"op": "set", "path": "/data/a~1b", "value": 1},
+        {"op": "remove", "path": "/data/gone"},
+    ]
+
+
+def test_operations_apply_locally_like_cosmos():
+    document = {"name": "A", "data": {"colors": ["red"], "old": 1, "n": 1}}
+
+    patched = apply_operations(
+        document,
+        [
+            {"op": "add", "path": "/data/colors/0", "value": "blue"},
+            {"op": "set", "path": "/data/colors/-", "value": "green"},
+            {"op": "move", "path": "/data/new", "from": "/data/old"},
+            {"op": "incr", "path": "/data/n", "value": 2},
+            {"op": "incr", "path": "/data/m", "value": 1},
+            {"op": "replace", "path": "/name", "value": "B"},
+        ],
+    )
+
+    assert patched == {
+        "name": "B",
+        "data": {"colors": ["blue", "red", "green"], "new": 1, "n": 3, "m": 1},
+    }
+    assert document["data"]["colors"] == ["red"]
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "remove", "path": "/data/missing"},
+        {"op": "replace", "path": "/data/missing", "value": 1},
+        {"op": "set", "path": "/data/missing/key", "value": 1},
+        {"op": "incr", "path": "/data/text", "value": 1},
+    ],
+)
+def test_local_operations_reject_what_cosmos_rejects(operation):
+    with pytest.raises(PatchError):
+        apply_operations({"data": {"text": "x"}}, [operation])
+
+
+@pytest.fixture
+def service(record_service):
+    record_service.patch_item.return_value = Item(
+        id="abc", name="Renamed", type="design"
+    )
+    return record_service
+
+
+def test_patch_route_applies_merge_patch(record_client, service):
+    response = record_client.patch(
+        "/design/abc/",
+        content='{"name": "Renamed"}',
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    service.patch_item.assert_awaited_once_with(
+        "abc",
+        [{"op": "set", "path": "/name", "value": "Renamed"}],
+        filter_predicate=None,
+    )
+
+
+def test_patch_route_rejects_other_content_types(record_client, service):
+    response = record_client.patch("/design/abc/", json={"name": "Renamed"})
+
+    assert response.status_code == 415
+    service.patch_item.assert_not_awaited()
+
+
+def test_patch_route_reports_missing_records(record_client, service):
+    service.patch_item.return_value = None
+
+    response = record_client.patch(
+        "/design/abc/",
+        content='[{"op": "remove", "path": "/data/x"}]',
+        headers={"Content-Type": "application/json-patch+json"},
+    )
+
+    assert response.status_code == 404
+
+
+def test_failed_precondition_lookup_keeps_its_status(record_client, service):
+    """A throttled lookup after a failed precondition is still a 429."""
+    service.patch_item.side_effect = CosmosHttpResponseError(
+        status_code=412, message="Precondition failed"
+    )
+    service.get_item.side_effect = CosmosHttpResponseError(
+        status_code=429, message="Throttled"
+    )
+
+    response = record_client.patch(
+        "/design/abc/",
+        content='[{"op": "remove", "path": "/data/x"}]',
+        headers={"Content-Type": "application/json-patch+json"},
+    )
+
+    assert response.status_code == 429
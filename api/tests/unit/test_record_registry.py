@@ -0,0 +1,106 @@
+"""
+Unit tests for the record type registry and types sharing a container.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+
+from app.models import Record, Settings
+from app.services.cosmos import RecordTypeConflict
+from app.services.registry import RecordType, load_record_types
+
+
+def test_types_mapped_to_one_container_share_it():
+    types = load_record_types(
+        {"design": "records", "application": "records", "video": "videos"}
+    )
+
+    assert types["design"] == RecordType("design", "records", shared=True)
+    assert types["application"].shared
+    assert not types["video"].shared
+
+
+def test_record_types_load_from_the_environment(monkeypatch):
+    monkeypatch.setenv("APP_RECORD_TYPES", '{"design": "records", "prompt": "records"}')
+
+    types = load_record_types(Settings().record_types)
+
+    assert set(types) == {"design", "prompt"}
+    assert all(record_type.shared for record_type in types.values())
+
+
+@pytest.mark.parametrize("name", ["storage", "Design", "a/b", ""])
+def test_invalid_type_names_are_rejected(name):
+    with pytest.raises(ValueError):
+        load_record_types({name: "records"})
+
+
+def cosmos_container(document: dict | None) -> MagicMock:
+    container = MagicMock()
+    if document is None:
+        error = CosmosResourceNotFoundError(message="missing")
+        container.read_item = AsyncMock(side_effect=error)
+    else:
+        container.read_item = AsyncMock(return_value=document)
+    container.upsert_item = AsyncMock(side_effect=lambda document, **kwargs: document)
+    return container
+
+
+async def test_other_types_are_invisible_to_point_reads(make_cosmos_service):
+    container = cosmos_container({"id": "a", "type": "application"})
+
+    assert await make_cosmos_service(container, shared=True).get_item("a") is None
+    assert (
+        await make_cosmos_service(container, type="application", shared=True).get_item(
+            "a"
+        )
+    ).id == "a"
+
+
+async def test_writes_cannot_take_another_types_id(make_cosmos_service):
+    container = cosmos_container({"id": "a", "type": "application"})
+
+    with pytest.raises(RecordTypeConflict):
+        await make_cosmos_service(container, shared=True).upsert_item(
+            Record(id="a", type="design")
+        )
+
+    container.upsert_item.assert_not_awaited()
+
+
+async def test_writes_may_replace_tombstones_of_other_types(make_cosmos_service):
+    container = cosmos_container({"id": "a", "type": "application", "deleted": True})
+
+    await make_cosmos_service(container, shared=True).upsert_item(
+        Record(id="a", type="design")
+    )
+
+    container.upsert_item.assert_awaited_once()
+
+
+async def test_lists_query_only_their_type(make_cosmos_service):
+    container = cosmos_container(None)
+
+    async def documents():
+        yield {"id": "a", "type": "design"}
+
+    container.query_items = MagicMock(return_value=documents())
+
+    items = await make_cosmos_service(container, shared=True).get_items()
+
+    assert [item.id for item in items] == ["a"]
+    container.read_all_items.assert_not_called()
+    assert container.query_items.call_args.kwargs["parameters"] == [
+        {"name": "@type", "value": "design"}
+    ]
+
+
+def test_type_conflict_is_a_409(make_record_client, record_service):
+    record_service.upsert_item.side_effect = RecordTypeConflict("taken")
+    client = make_record_client(database="records", shared=True)
+
+    response = client.post("/design/", json={"id": "a", "name": "A"})
+
+    assert response.status_code == 409
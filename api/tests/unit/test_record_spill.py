@@ -0,0 +1,107 @@
+"""
+Unit tests for keeping oversized record data in blob storage.
+"""
+
+import hashlib
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models import DataRef, Record
+from app.routers.record import get_data_spill
+from app.services.cosmos import Item
+from app.services.spill import DataSpill, RecordDataError
+
+
+@pytest.fixture
+def storage():
+    storage = MagicMock()
+    storage.save_blob = AsyncMock()
+    storage.read_blob = AsyncMock()
+    storage.delete_blob = AsyncMock()
+    return storage
+
+
+async def test_small_data_stays_inline(storage):
+    record = Record(id="a", data={"x": 1})
+
+    await DataSpill(storage, threshold=1024).store(record, "design")
+
+    assert record.data == {"x": 1}
+    assert record.data_ref is None
+    storage.save_blob.assert_not_awaited()
+
+
+async def test_large_data_is_stored_by_hash(storage):
+    data = {"layers": ["x" * 100] * 20}
+    payload = json.dumps(data, separators=(",", ":")).encode()
+    digest = hashlib.sha256(payload).hexdigest()
+    record = Record(id="a", data=data)
+
+    await DataSpill(storage, threshold=1024).store(record, "design")
+
+    assert record.data == {}
+    assert record.data_ref == DataRef(
+        blob=f"records/design/a/{digest}.json", sha256=digest, size=len(payload)
+    )
+    storage.save_blob.assert_awaited_once_with(
+        record.data_ref.blob, payload, "application/json"
+    )
+
+
+async def test_load_rehydrates_and_checks_the_hash(storage):
+    payload = b'{"x":1}'
+    ref = DataRef(blob="records/design/a/h.json", sha256="0" * 64, size=7)
+    storage.read_blob.return_value = payload
+    spill = DataSpill(storage, threshold=1)
+
+    with pytest.raises(RecordDataError):
+        await spill.load(Record(id="a", data_ref=ref))
+
+    ref.sha256 = hashlib.sha256(payload).hexdigest()
+    record = await spill.load(Record(id="a", data_ref=ref))
+    assert record.data == {"x": 1}
+
+
+def test_include_data_false_skips_blob_reads(record_client, record_service, storage):
+    """Spilled data is only fetched when the caller asks for data."""
+    ref = {"blob": "records/design/a/h.json", "sha256": "h", "size": 10}
+    record_service.get_item.return_value = Item(id="a", data={}, data_ref=ref)
+    record_client.app.dependency_overrides[get_data_spill] = lambda: DataSpill(
+        storage, 1
+    )
+
+    response = record_client.get("/design/a/", params={"include_data": "false"})
+
+    assert response.status_code == 200
+    assert response.json()["data_ref"] == ref
+    storage.read_blob.assert_not_awaited()
+
+
+def test_clients_cannot_set_a_data_ref(record_client, record_service):
+    """Without the spill, a posted data_ref is dropped, not stored."""
+    record_service.get_item.return_value = Item(id="a")
+    record_service.upsert_item.side_effect = lambda record: record
+    record_client.app.dependency_overrides[get_data_spill] = lambda: None
+    ref = {"blob": "records/other/b/h.json", "sha256": "h", "size": 10}
+
+    record_client.post("/design/", json={"id": "a", "name": "A", "data_ref": ref})
+    record_client.put("/design/a/", json={"name": "A", "data_ref": ref})
+
+    for call in record_service.upsert_item.await_args_list:
+        assert call.args[0].data_ref is None
+    assert record_service.upsert_item.await_count == 2
+
+
+def test_large_data_stays_inline_without_storage(record_client, record_service):
+    """The spill is on by default but needs blob storage to be configured."""
+    record_service.upsert_item.side_effect = lambda record: record
+    data = {"layers": ["x" * 1024] * 300}
+
+    response = record_client.post("/design/", json={"name": "A", "data": data})
+
+    assert response.status_code == 200
+    stored = record_service.upsert_item.await_args.args[0]
+    assert stored.data == data
+    assert stored.data_ref is None
@@ -0,0 +1,113 @@
+"""
+Unit tests for per-type validation of record data.
+"""
+
+import json
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.services.cosmos import Item
+from app.services.registry import load_record_types
+from app.services.validation import DataValidator, get_data_validator
+
+pytest.importorskip("fastjsonschema")
+
+SCHEMA = {
+    "type": "object",
+    "required": ["prompt"],
+    "properties": {
+        "prompt": {"type": "string"},
+        "steps": {"type": "array", "items": {"type": "integer"}},
+    },
+}
+
+
+class DesignData(BaseModel):
+    prompt: str
+    steps: list[int] = []
+
+
+@pytest.mark.parametrize("schema", [SCHEMA, DesignData])
+def test_validator_reports_error_locations(schema):
+    validator = DataValidator(schema)
+
+    assert validator.errors({"prompt": "a cat", "steps": [1, 2]}) == []
+    errors = validator.errors({"prompt": "a cat", "steps": [1, "two"]})
+    assert [error["loc"][:3] for error in errors] == [["body", "data", "steps"]]
+    assert str(errors[0]["loc"][3]) == "1"
+
+
+def test_validators_are_compiled_once():
+    same = dict(reversed(list(SCHEMA.items())))
+
+    assert get_data_validator(SCHEMA) is get_data_validator(same)
+    assert get_data_validator(DesignData) is get_data_validator(DesignData)
+
+
+def test_invalid_schemas_fail_at_startup():
+    with pytest.raises(Exception):
+        DataValidator({"type": "no-such-type"})
+
+
+def test_registry_loads_schemas_by_type_name(tmp_path):
+    (tmp_path / "design.json").write_text(json.dumps(SCHEMA))
+
+    types = load_record_types(
+        {"design": "designs", "application": "applications"}, str(tmp_path)
+    )
+
+    assert types["design"].data_schema == SCHEMA
+    assert types["application"].data_schema is None
+
+
+@pytest.fixture
+def client(make_record_client) -> TestClient:
+    return make_record_client(data_schema=SCHEMA)
+
+
+def test_invalid_data_is_rejected_before_cosmos(client, record_service):
+    created = client.post("/design/", json={"name": "A", "data": {"steps": []}})
+    updated = client.put("/design/a/", json={"name": "A", "data": {"prompt": 1}})
+
+    assert created.status_code == 422
+    assert created.json()["detail"][0]["type"] == "schema.required"
+    assert updated.status_code == 422
+    record_service.create_container_if_not_exists.assert_not_awaited()
+    record_service.get_item.assert_not_awaited()
+    record_service.upsert_item.assert_not_awaited()
+
+
+@pytest.fixture
+def stored(record_service):
+    record_service.get_item.return_value = Item(
+        id="a", name="A", type="design", data={"prompt": "a cat"}, _etag='"1"'
+    )
+    record_service.patch_item.return_value = Item(
+        id="a", name="A", type="design", data={"prompt": "a cat", "steps": [1]}
+    )
+    return record_service
+
+
+def test_patched_data_is_validated_before_cosmos(client, stored):
+    response = client.patch(
+        "/design/a/",
+        content='[{"op": "replace", "path": "/data/prompt", "value": 1}]',
+        headers={"content-type": "application/json-patch+json"},
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "data", "prompt"]
+    stored.patch_item.assert_not_awaited()
+
+
+def test_valid_data_patches_apply_to_the_validated_version(client, stored):
+    response = client.patch(
+        "/design/a/",
+        json={"data": {"steps": [1]}},
+        headers={"content-type": "application/merge-patch+json"},
+    )
+
+    assert response.status_code == 200
+    predicate = stored.patch_item.await_args.kwargs["filter_predicate"]
+    assert predicate.endswith('AND c._etag = "\\"1\\""')
@@ -0,0 +1,142 @@
+"""
+Unit tests for resumable uploads mapped onto staged blob blocks.
+
+A small in-memory stand-in for the container client keeps staged and
+committed blocks so the offset bookkeeping can be checked end to end.
+"""
+
+import contextlib
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.storage import get_storage_service
+from app.services import StorageService
+
+
+class FakeBlobClient:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    async def stage_block(self, block_id, data, length=None):
+        self.store.staged.setdefault(self.name, {})[block_id] = bytes(data)
+
+    async def get_block_list(self, block_list_type="committed"):
+        staged = self.store.staged.get(self.name)
+        if staged is None:
+            raise ResourceNotFoundError("no blocks")
+        blocks = [SimpleNamespace(id=i, size=len(d)) for i, d in staged.items()]
+        return [], blocks
+
+    async def commit_block_list(self, block_list, content_settings=None):
+        staged = self.store.staged.pop(self.name)
+        self.store.blobs[self.name] = b"".join(staged[b.id] for b in block_list)
+
+
+class FakeContainerClient:
+    def __init__(self):
+        self.blobs: dict[str, bytes] = {}
+        self.staged: dict[str, dict[str, bytes]] = {}
+
+    def get_blob_client(self, name):
+        return FakeBlobClient(self, name)
+
+    async def upload_blob(self, name, data, overwrite=False, **kwargs):
+        self.blobs[name] = data.encode() if isinstance(data, str) else data
+
+    async def download_blob(self, name):
+        if name not in self.blobs:
+            raise ResourceNotFoundError("missing")
+        data = self.blobs[name]
+
+        class Downloader:
+            async def readall(self):
+                return data
+
+        return Downloader()
+
+    async def delete_blob(self, name):
+        self.blobs.pop(name)
+
+
+@pytest.fixture
+def store():
+    return FakeContainerClient()
+
+
+@pytest.fixture
+def service(store) -> StorageService:
+    service = StorageService(
+        client_id="test-client-id",
+        storage="https://teststorage.blob.core.windows.net",
+        container="test-container",
+    )
+
+    @contextlib.asynccontextmanager
+    async def get_storage_client():
+        yield store
+
+    service.get_storage_client = get_storage_client
+    return service
+
+
+@pytest.fixture
+def client(service):
+    app.dependency_overrides[get_storage_service] = lambda: service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_chunks_in_any_order_resume_and_finalize(client, store):
+    """Out-of-order chunks only advance the offset once the gap is filled."""
+    content = bytes(range(256)) * 40
+    created = client.post(
+        "/storage/uploads/", json={"path": "design", "length": len(content)}
+    )
+    assert created.status_code == 201
+    session = created.json()
+    url = created.headers["location"]
+    assert url == f"/storage/uploads/{session['id']}"
+    assert session["blob_name"].startswith("videos/design/")
+
+    # second half first: nothing contiguous yet
+    second = client.patch(
+        url, content=content[5000:], headers={"Upload-Offset": "5000"}
+    )
+    assert second.status_code == 204
+    assert second.headers["upload-offset"] == "0"
+
+    # an interrupted client asks where to resume from
+    assert client.head(url).headers["upload-offset"] == "0"
+
+    early = client.post(f"{url}/finalize")
+    assert early.status_code == 409
+
+    first = client.patch(url, content=content[:5000], headers={"Upload-Offset": "0"})
+    assert first.headers["upload-offset"] == str(len(content))
+
+    finished = client.post(f"{url}/finalize")
+    assert finished.status_code == 200
+    assert store.blobs[session["blob_name"]] == content
+    # the session is gone once committed
+    assert client.get(url).status_code == 404
+
+
+def test_chunk_past_the_end_is_rejected(client):
+    """Chunks cannot extend beyond the declared length."""
+    url = client.post("/storage/uploads/", json={"length": 10}).headers["location"]
+
+    response = client.patch(url, content=b"x" * 11, headers={"Upload-Offset": "0"})
+
+    assert response.status_code == 409
+
+
+def test_unknown_session(client):
+    """Unknown sessions are reported as 404."""
+    response = client.head("/storage/uploads/does-not-exist")
+
+    assert response.status_code == 404
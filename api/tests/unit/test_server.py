@@ -0,0 +1,102 @@
+"""
+Unit tests for the production launcher and the shared client pool.
+"""
+
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.dependencies import get_settings
+from app.cpus import cgroup_cpu_limit
+from app.server import check_write_behind, prepare_metrics_dir, server_workers
+from app.services.clients import ClientPool
+
+
+def test_cgroup_v2_quota(tmp_path):
+    """cpu.max quotas are rounded into a CPU count."""
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+
+    assert cgroup_cpu_limit(str(tmp_path)) == 1.5
+
+
+def test_cgroup_v2_unlimited(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+
+    assert cgroup_cpu_limit(str(tmp_path)) == 2
+
+
+def test_cgroup_missing(tmp_path):
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+
+
+async def test_client_pool_reuses_and_closes_clients():
+    """One client per key is created and closed together with its credential."""
+    client, credential = MagicMock(), MagicMock()
+    client.close, credential.close = AsyncMock(), AsyncMock()
+    factory = MagicMock(return_value=(client, credential))
+    pool = ClientPool()
+
+    assert pool.get("a", factory) is client
+    assert pool.get("a", factory) is client
+    await pool.close()
+
+    factory.assert_called_once()
+    client.close.assert_awaited_once()
+    credential.close.assert_awaited_once()
+
+
+def test_client_pool_discards_clients_after_fork():
+    """A pool inherited by a forked worker builds its own clients."""
+    factory = MagicMock(side_effect=[(MagicMock(), None), (MagicMock(), None)])
+    pool = ClientPool()
+    first = pool.get("a", factory)
+
+    pool._pid = -1  # as seen from a child process
+    second = pool.get("a", factory)
+
+    assert first is not second
+
+
+def test_write_behind_needs_a_single_worker(monkeypatch):
+    """The upload spool is per process, so other worker counts are refused."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "storage_write_behind", True)
+    monkeypatch.setattr(settings, "server_workers", 4)
+    with pytest.raises(SystemExit, match="APP_SERVER_WORKERS=1"):
+        check_write_behind()
+
+    monkeypatch.setattr(settings, "server_workers", 1)
+    check_write_behind()
+    assert server_workers() == 1
+
+
+def test_workers_share_a_fresh_metrics_dir(monkeypatch, tmp_path):
+    """Several workers aggregate metrics in a directory cleared at start."""
+    (tmp_path / "counter_123.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    prepare_metrics_dir(4)
+
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR")
+    prepare_metrics_dir(4)
+
+    assert os.path.isdir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def test_a_single_worker_keeps_in_process_metrics(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    prepare_metrics_dir(1)
+
+    assert "PROMETHEUS_MULTIPROC_DIR" not in os.environ
@@ -0,0 +1,62 @@
+"""
+Unit tests for the Server-Timing breakdown on record routes.
+"""
+
+import asyncio
+import re
+import time
+
+from fastapi import FastAPI
+
+from app.observability import phase
+from app.observability.timing import Timings
+from app.routers import create_router
+from app.services.cosmos import Item
+
+
+def durations(header: str) -> dict[str, float]:
+    return {
+        name: float(value) for name, value in re.findall(r"(\w+);dur=([\d.]+)", header)
+    }
+
+
+def test_record_route_reports_phases(record_client, record_service):
+    """A read reports dependency, Cosmos, validation and serialization time."""
+
+    async def get_item(item_id):
+        with phase("cosmos"):
+            await asyncio.sleep(0.01)
+        return Item(id=item_id, name="Design", type="design")
+
+    record_service.get_item = get_item
+
+    response = record_client.get("/design/abc/")
+
+    assert response.status_code == 200
+    timings = durations(response.headers["server-timing"])
+    assert {"deps", "cosmos", "validate", "serialize", "total"} <= set(timings)
+    assert timings["cosmos"] >= 10
+    assert 'desc="Cosmos data-plane calls"' in response.headers["server-timing"]
+
+
+def test_route_parameters_survive_the_endpoint_wrapper():
+    app = FastAPI()
+    app.include_router(create_router(database="designs", type="design"))
+
+    operation = app.openapi()["paths"]["/design/{id}/"]["get"]
+
+    assert [p["name"] for p in operation["parameters"]] == ["id", "include_data"]
+
+
+def test_nested_phases_are_exclusive():
+    """Time in an inner phase is not also charged to the outer one."""
+    timings = Timings()
+
+    timings.enter("provision")
+    timings.enter("client")
+    time.sleep(0.02)
+    timings.exit()
+    timings.exit()
+
+    assert timings.totals["client"] >= 0.02
+    assert timings.totals["provision"] < 0.01
@@ -0,0 +1,91 @@
+"""
+Unit tests for coalescing concurrent identical Cosmos reads.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.observability.timing import Timings, _timings
+from app.services.singleflight import SingleFlight
+
+
+def slow_container() -> MagicMock:
+    container = MagicMock()
+
+    async def read_item(item, partition_key, **kwargs):
+        await asyncio.sleep(0.01)
+        return {"id": item, "name": "Design"}
+
+    container.read_item = AsyncMock(side_effect=read_item)
+    return container
+
+
+async def test_concurrent_reads_share_one_cosmos_call(make_cosmos_service):
+    container = slow_container()
+    service = make_cosmos_service(container)
+
+    results = await asyncio.gather(*[service.get_item("abc") for _ in range(10)])
+
+    assert container.read_item.await_count == 1
+    assert {result.id for result in results} == {"abc"}
+
+
+async def test_joined_reads_report_cosmos_time(make_cosmos_service):
+    """A request that joins another's read still shows the wait as Cosmos time."""
+    service = make_cosmos_service(slow_container())
+
+    async def timed_read() -> Timings:
+        timings = Timings()
+        _timings.set(timings)
+        await service.get_item("abc")
+        return timings
+
+    leader, joiner = await asyncio.gather(timed_read(), timed_read())
+
+    assert leader.totals["cosmos"] >= 0.01
+    assert joiner.totals["cosmos"] >= 0.01
+
+
+async def test_different_items_are_read_separately(make_cosmos_service):
+    container = slow_container()
+    service = make_cosmos_service(container)
+
+    await asyncio.gather(service.get_item("a"), service.get_item("b"))
+
+    assert container.read_item.await_count == 2
+
+
+async def test_reads_after_a_write_do_not_join_older_reads(make_cosmos_service):
+    """A read started before an upsert is not shared with later readers."""
+    container = slow_container()
+    container.upsert_item = AsyncMock(return_value={"id": "abc", "name": "New"})
+    service = make_cosmos_service(container)
+
+    before = asyncio.ensure_future(service.get_item("abc"))
+    await asyncio.sleep(0)
+    await service.upsert_item(MagicMock(model_dump=lambda: {"id": "abc"}))
+    after = await service.get_item("abc")
+    await before
+
+    assert after.id == "abc"
+    assert container.read_item.await_count == 2
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def call():
+        started.set()
+        await asyncio.sleep(0.01)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("scope", "key", call))
+    await started.wait()
+    second = asyncio.ensure_future(flight.do("scope", "key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    assert flight.shared == 1
+    assert flight.in_flight() == 0
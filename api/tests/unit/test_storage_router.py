@@ -0,0 +1,178 @@
+"""
+Unit tests for the storage router.
+
+The StorageService dependency is overridden with a mock, so these tests
+exercise request validation and HTTP semantics only.
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.storage import get_storage_service, parse_range
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def mock_storage_service():
+    """Mock StorageService serving CONTENT as videos/clip.mp4."""
+    service = MagicMock()
+    service.uploads = None
+    properties = MagicMock()
+    properties.etag = '"0x8DC0FFEE"'
+    properties.size = len(CONTENT)
+    properties.last_modified = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    properties.content_settings.content_type = "video/mp4"
+    service.get_blob_properties = AsyncMock(return_value=properties)
+
+    async def download_blob_chunks(name, offset=0, length=None, etag=None):
+        end = len(CONTENT) if length is None else offset + length
+        for i in range(offset, end, 100):
+            yield CONTENT[i : min(i + 100, end)]
+
+    service.download_blob_chunks = MagicMock(side_effect=download_blob_chunks)
+    return service
+
+
+@pytest.fixture
+def client(mock_storage_service):
+    """Test client with the storage service overridden."""
+    app.dependency_overrides[get_storage_service] = lambda: mock_storage_service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_range(header, expected):
+    """Single byte ranges are parsed; anything else falls back to a full body."""
+    assert parse_range(header, 1000) == expected
+
+
+def test_parse_range_unsatisfiable():
+    """A range starting past the end is rejected with 416."""
+    with pytest.raises(HTTPException) as error:
+        parse_range("bytes=1000-", 1000)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */1000"
+
+
+def test_download_full_blob(client):
+    """Without Range the whole blob is streamed with its validators."""
+    response = client.get("/storage/blobs/videos/clip.mp4")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"] == '"0x8DC0FFEE"'
+    assert response.headers["content-type"] == "video/mp4"
+
+
+def test_download_range(client, mock_storage_service):
+    """A Range request maps onto a ranged blob download."""
+    response = client.get(
+        "/storage/blobs/videos/clip.mp4", headers={"Range": "bytes=10-209"}
+    )
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:210]
+    assert response.headers["content-range"] == f"bytes 10-209/{len(CONTENT)}"
+    mock_storage_service.download_blob_chunks.assert_called_once_with(
+        "videos/clip.mp4", offset=10, length=200, etag='"0x8DC0FFEE"'
+    )
+
+
+def test_download_stale_if_range_sends_full_blob(client):
+    """A Range guarded by an outdated If-Range validator gets the full blob."""
+    response = client.get(
+        "/storage/blobs/videos/clip.mp4",
+        headers={"Range": "bytes=10-20", "If-Range": '"old"'},
+    )
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_download_not_modified(client, mock_storage_service):
+    """A matching If-None-Match short-circuits to 304 without a download."""
+    response = client.get(
+        "/storage/blobs/videos/clip.mp4",
+        headers={"If-None-Match": 'W/"0x8DC0FFEE"'},
+    )
+
+    assert response.status_code == 304
+    mock_storage_service.download_blob_chunks.assert_not_called()
+
+
+def test_download_missing_blob(client, mock_storage_service):
+    """Missing blobs are reported as 404."""
+    mock_storage_service.get_blob_properties.side_effect = ResourceNotFoundError(
+        "missing"
+    )
+
+    response = client.get("/storage/blobs/images/missing.png")
+
+    assert response.status_code == 404
+
+
+def test_variant_endpoint_rejects_unconfigured_width(client):
+    """Only configured widths can be requested."""
+    response = client.get("/storage/variants/images/a.png?width=3")
+
+    assert response.status_code == 400
+
+
+def test_sas_endpoint_rejects_paths_outside_media_folders(client):
+    """Download URLs are only minted for images/ and videos/ blobs."""
+    response = client.get("/storage/sas/records/secret.json")
+
+    assert response.status_code == 404
+
+
+def test_list_blobs_page(client, mock_storage_service):
+    """Listings come from one page call and skip derivatives."""
+    original = MagicMock()
+    original.name = "images/design/a.png"
+    original.size = 123
+    original.metadata = {"width": "32", "height": "20", "variants": "w256.webp"}
+    original.content_settings.content_type = "image/png"
+    original.creation_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    variant = MagicMock()
+    variant.name = "images/design/a.w256.webp"
+    mock_storage_service.list_blob_page = AsyncMock(
+        return_value=([original, variant], "next-token")
+    )
+
+    response = client.get("/storage/list/images/design?limit=2&token=abc")
+
+    assert response.status_code == 200
+    page = response.json()
+    assert page["continuation_token"] == "next-token"
+    assert [item["name"] for item in page["items"]] == ["images/design/a.png"]
+    assert page["items"][0]["width"] == 32
+    assert page["items"][0]["variants"] == ["w256.webp"]
+    mock_storage_service.list_blob_page.assert_awaited_once_with(
+        "images/design/", 2, "abc"
+    )
+
+
+def test_list_blobs_rejects_other_prefixes(client):
+    """Only images/ and videos/ can be listed."""
+    response = client.get("/storage/list/records")
+
+    assert response.status_code == 404
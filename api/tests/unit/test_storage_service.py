@@ -0,0 +1,266 @@
+"""
+Unit tests for the StorageService.
+
+The Azure container client is replaced with a mock so no storage account
+is required.
+"""
+
+import io
+import base64
+import contextlib
+import hashlib
+import pickle
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import BlobSasPermissions
+from PIL import Image
+
+from app.services import StorageService
+from app.dependencies import get_settings
+from app.services.images import pool_size, render_variant, variant_name
+from app.services.uploads import UploadQueue
+
+
+def make_service(container_client, **kwargs) -> StorageService:
+    """Create a StorageService whose storage client yields the given mock."""
+    service = StorageService(
+        client_id="test-client-id",
+        storage="https://teststorage.blob.core.windows.net",
+        container="test-container",
+        **kwargs,
+    )
+
+    @contextlib.asynccontextmanager
+    async def get_storage_client():
+        yield container_client
+
+    service.get_storage_client = get_storage_client
+    return service
+
+
+@pytest.fixture
+def container_client():
+    """Mock container client with a single mock blob client."""
+    client = MagicMock()
+    client.upload_blob = AsyncMock()
+    blob_client = MagicMock()
+    blob_client.exists = AsyncMock(return_value=False)
+    blob_client.upload_blob = AsyncMock()
+    client.get_blob_client.return_value = blob_client
+    return client
+
+
+async def test_save_image_blob_uses_random_names_by_default(
+    container_client, sample_base64_image
+):
+    """Without dedupe every save gets a fresh uuid name."""
+    service = make_service(container_client)
+
+    first = await service.save_image_blob(sample_base64_image, path="design")
+    second = await service.save_image_blob(sample_base64_image, path="design")
+
+    assert first != second
+    assert first.startswith("images/design/")
+    assert container_client.upload_blob.await_count == 2
+
+
+async def test_save_image_blob_dedupe_names_by_content_hash(
+    container_client, sample_base64_image
+):
+    """With dedupe the blob name is the SHA-256 of the decoded bytes."""
+    service = make_service(container_client, dedupe=True)
+    digest = hashlib.sha256(base64.b64decode(sample_base64_image)).hexdigest()
+
+    blob_name = await service.save_image_blob(sample_base64_image, path="design")
+
+    assert blob_name == f"images/design/{digest}.png"
+    container_client.get_blob_client.assert_called_with(blob_name)
+    container_client.get_blob_client.return_value.upload_blob.assert_awaited_once()
+
+
+async def test_save_image_blobs_dedupe_skips_existing(
+    container_client, sample_image_list
+):
+    """Identical images resolve to one name and existing blobs are not re-uploaded."""
+    blob_client = container_client.get_blob_client.return_value
+    blob_client.exists = AsyncMock(return_value=True)
+    service = make_service(container_client, dedupe=True)
+
+    names = [name async for name in service.save_image_blobs(sample_image_list)]
+
+    assert len(set(names)) == 1
+    assert blob_client.exists.await_count == len(sample_image_list)
+    blob_client.upload_blob.assert_not_awaited()
+
+
+async def test_save_image_blob_dedupe_tolerates_concurrent_writer(
+    container_client, sample_base64_image
+):
+    """Losing the race to another writer of the same content is not an error."""
+    blob_client = container_client.get_blob_client.return_value
+    blob_client.upload_blob = AsyncMock(side_effect=ResourceExistsError("exists"))
+    service = make_service(container_client, dedupe=True)
+
+    blob_name = await service.save_image_blob(sample_base64_image)
+
+    assert blob_name.startswith("images/")
+
+
+def make_png(width: int, height: int) -> bytes:
+    """Render a solid PNG of the given size."""
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_render_variant_resizes_and_reencodes():
+    """Variants are scaled to the requested width keeping the aspect ratio."""
+    data = render_variant(make_png(400, 200), 100, "webp")
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (100, 50)
+
+
+def test_render_variant_does_not_upscale():
+    """Images narrower than the requested width keep their size."""
+    data = render_variant(make_png(50, 20), 100, "png")
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.size == (50, 20)
+
+
+def test_image_pool_children_skip_observability():
+    """Unpickling the pool's work imports no tracing or metrics setup."""
+    script = (
+        "import pickle, sys\n"
+        f"pickle.loads({pickle.dumps(render_variant)!r})\n"
+        "assert 'app.observability' not in sys.modules, sorted(sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+async def test_save_image_blob_uploads_variants(container_client):
+    """Configured derivatives are stored next to the original."""
+    service = make_service(
+        container_client, variant_widths=[16], variant_formats=["webp"]
+    )
+    image = base64.b64encode(make_png(32, 32)).decode()
+
+    blob_name = await service.save_image_blob(image, path="design")
+
+    names = [c.kwargs["name"] for c in container_client.upload_blob.await_args_list]
+    assert names == [blob_name, variant_name(blob_name, 16, "webp")]
+
+
+async def test_get_image_variant_renders_missing_variant(container_client):
+    """A missing variant is rendered from the original and stored."""
+    original = MagicMock()
+    original.readall = AsyncMock(return_value=make_png(32, 32))
+    container_client.download_blob = AsyncMock(
+        side_effect=[ResourceNotFoundError("missing"), original]
+    )
+    service = make_service(container_client)
+
+    data = await service.get_image_variant("images/a.png", 16, "webp")
+
+    assert data.startswith(b"RIFF")
+    upload = container_client.upload_blob.await_args
+    assert upload.kwargs["name"] == "images/a.w16.webp"
+    assert upload.kwargs["content_settings"].content_type == "image/webp"
+
+
+async def test_generate_sas_url_with_account_key():
+    """Shared key accounts sign a blob-scoped SAS without a network call."""
+    service = StorageService(
+        client_id="LOCAL",
+        storage="UseDevelopmentStorage=true",
+        container="test-container",
+    )
+
+    url, expires_on = await service.generate_sas_url(
+        "images/design/a.png", BlobSasPermissions(read=True), timedelta(minutes=5)
+    )
+
+    assert url.startswith(
+        "http://127.0.0.1:10000/devstoreaccount1/test-container/images/design/a.png?"
+    )
+    assert "sp=r" in url and "sr=b" in url
+    assert expires_on > datetime.now(timezone.utc)
+
+
+async def test_save_image_blob_indexes_metadata(container_client):
+    """Dimensions and variants are written to blob metadata for listings."""
+    service = make_service(
+        container_client, variant_widths=[16], variant_formats=["webp"]
+    )
+
+    await service.save_image_blob(base64.b64encode(make_png(32, 20)).decode())
+
+    original = container_client.upload_blob.await_args_list[0]
+    assert original.kwargs["metadata"] == {
+        "width": "32",
+        "height": "20",
+        "variants": "w16.webp",
+    }
+
+
+async def test_save_image_blob_write_behind(container_client, sample_base64_image):
+    """With write-behind the name is returned before the upload happens."""
+    uploads = UploadQueue(workers=1, max_bytes=1024, retries=0)
+    service = make_service(container_client, uploads=uploads)
+
+    blob_name = await service.save_image_blob(sample_base64_image, path="design")
+
+    assert uploads.spooled(blob_name) is not None
+    await uploads.drain()
+    assert container_client.upload_blob.await_args.kwargs["name"] == blob_name
+    assert uploads.status(blob_name) == "uploaded"
+
+
+def test_image_pool_shares_cpus_between_server_workers(monkeypatch):
+    """Each server worker gets its share of the CPUs for image processes."""
+    settings = get_settings()
+    monkeypatch.setattr("app.services.images.available_cpus", lambda: 8)
+    monkeypatch.setattr(settings, "server_workers", 4)
+    monkeypatch.setattr(settings, "image_workers", 0)
+
+    assert pool_size() == 2
+
+    monkeypatch.setattr(settings, "server_workers", 0)
+    assert pool_size() == 1
+
+    monkeypatch.setattr(settings, "image_workers", 3)
+    assert pool_size() == 3
+
+
+async def test_warm_up_tolerates_a_missing_container(container_client):
+    """A container that does not exist yet does not hold readiness back."""
+    container_client.get_container_properties = AsyncMock(
+        side_effect=ResourceNotFoundError("missing")
+    )
+    service_client = MagicMock()
+    service_client.get_container_client.return_value = container_client
+    service_client.credential.account_key = "key"
+    service = make_service(container_client)
+
+    @contextlib.asynccontextmanager
+    async def get_service_client():
+        yield service_client
+
+    service.get_service_client = get_service_client
+
+    await service.warm_up()
+
+    container_client.get_container_properties.assert_awaited_once()
+
+
+async def test_warm_up_skips_unconfigured_storage():
+    service = StorageService(client_id="LOCAL", storage="", container="")
+
+    await service.warm_up()
@@ -0,0 +1,108 @@
+"""
+Unit tests for the tracing helpers.
+
+Spans are collected with the SDK's in-memory exporter instead of being
+exported anywhere.
+"""
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from app.observability import tracing
+from app.observability.tracing import traced
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """Enable tracing into an in-memory exporter for the test."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "_trace", trace)
+    monkeypatch.setattr(tracing, "_tracer", provider.get_tracer("test"))
+    return exporter
+
+
+class Service:
+    def span_attributes(self) -> dict:
+        return {"db.cosmosdb.container": "designs"}
+
+
+def test_traced_is_a_no_op_when_disabled():
+    """Disabled tracing hands back the function itself."""
+
+    async def get_item():
+        pass
+
+    assert traced("cosmos")(get_item) is get_item
+
+
+async def test_traced_coroutine_records_attributes(spans):
+    class Items(Service):
+        @traced("cosmos")
+        async def get_items(self):
+            return [1, 2, 3]
+
+    assert await Items().get_items() == [1, 2, 3]
+
+    (span,) = spans.get_finished_spans()
+    assert span.name == "cosmos.get_items"
+    assert span.attributes["carson.operation"] == "get_items"
+    assert span.attributes["db.cosmosdb.container"] == "designs"
+    assert span.attributes["carson.item_count"] == 3
+
+
+async def test_traced_async_generator_counts_items(spans):
+    """Generators are timed to exhaustion and report how much they yielded."""
+
+    class Blobs(Service):
+        @traced("storage")
+        async def list_blobs(self):
+            for name in ["a", "b"]:
+                yield name
+
+    names = [name async for name in Blobs().list_blobs()]
+
+    assert names == ["a", "b"]
+    (span,) = spans.get_finished_spans()
+    assert span.name == "storage.list_blobs"
+    assert span.attributes["carson.item_count"] == 2
+
+
+async def test_traced_records_errors(spans):
+    class Failing(Service):
+        @traced("cosmos")
+        async def upsert_item(self):
+            raise RuntimeError("throttled")
+
+    with pytest.raises(RuntimeError):
+        await Failing().upsert_item()
+
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code == trace.StatusCode.ERROR
+
+
+async def test_request_charge_sums_every_page(spans):
+    """Each page of a query adds its RU charge to the calling span."""
+
+    class Designs(Service):
+        @traced("cosmos")
+        async def query_items(self):
+            charge = tracing.RequestCharge()
+            for page in ("2.5", "1.25", None):
+                headers = {} if page is None else {"x-ms-request-charge": page}
+                charge(headers, [])
+            tracing.record_request_charge(charge)
+
+    await Designs().query_items()
+
+    (span,) = spans.get_finished_spans()
+    assert span.attributes["db.cosmosdb.request_charge"] == 3.75
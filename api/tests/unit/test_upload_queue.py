@@ -0,0 +1,167 @@
+"""
+Unit tests for the write-behind UploadQueue.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+
+from app.routers.storage import get_upload_status
+from app.services.uploads import UploadQueue
+
+
+async def test_submit_returns_before_upload_and_drain_finishes_it():
+    """Submitting only spools; drain waits for the upload to land."""
+    stored = []
+    release = asyncio.Event()
+
+    async def upload():
+        await release.wait()
+        stored.append("images/a.png")
+
+    queue = UploadQueue(workers=1, max_bytes=1024, retries=0)
+    await queue.submit("images/a.png", b"data", "image/png", upload)
+
+    assert queue.status("images/a.png") == "pending"
+    assert queue.spooled("images/a.png").data == b"data"
+
+    release.set()
+    await queue.drain()
+
+    assert stored == ["images/a.png"]
+    assert queue.status("images/a.png") == "uploaded"
+    assert queue.spooled("images/a.png") is None
+
+
+async def test_failed_uploads_are_retried(monkeypatch):
+    """Transient failures are retried with backoff before succeeding."""
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+    attempts = 0
+
+    async def upload():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionError("transient")
+
+    queue = UploadQueue(workers=1, max_bytes=1024, retries=5)
+    await queue.submit("images/a.png", b"data", "image/png", upload)
+
+    assert await queue.wait("images/a.png", timeout=1) == "uploaded"
+    assert attempts == 3
+    await queue.drain()
+
+
+async def test_upload_gives_up_after_retries(monkeypatch):
+    """An upload that keeps failing ends up marked as failed."""
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep)
+
+    async def upload():
+        raise ConnectionError("down")
+
+    queue = UploadQueue(workers=1, max_bytes=1024, retries=2)
+    await queue.submit("images/a.png", b"data", "image/png", upload)
+    await queue.drain()
+
+    assert queue.status("images/a.png") == "failed"
+
+
+async def test_full_spool_applies_backpressure():
+    """Submitting blocks while the spool has no room."""
+    release = asyncio.Event()
+
+    async def upload():
+        await release.wait()
+
+    queue = UploadQueue(workers=1, max_bytes=10, retries=0)
+    await queue.submit("images/a.png", b"x" * 8, "image/png", upload)
+    second = asyncio.create_task(
+        queue.submit("images/b.png", b"x" * 8, "image/png", upload)
+    )
+    await asyncio.sleep(0.01)
+    assert not second.done()
+
+    release.set()
+    await asyncio.wait_for(second, timeout=1)
+    await queue.drain()
+
+
+async def test_submit_after_drain_is_rejected():
+    """A draining queue does not accept new uploads."""
+    queue = UploadQueue(workers=1, max_bytes=10, retries=0)
+    await queue.drain()
+
+    with pytest.raises(RuntimeError):
+        await queue.submit("images/a.png", b"x", "image/png", _no_sleep)
+
+
+async def test_submit_blocked_during_drain_still_uploads():
+    """A submit waiting for room when the queue drains uploads its own bytes."""
+    release = asyncio.Event()
+    stored = []
+
+    async def upload_a():
+        await release.wait()
+        stored.append("a")
+
+    async def upload_b():
+        stored.append("b")
+
+    queue = UploadQueue(workers=1, max_bytes=10, retries=0)
+    await queue.submit("images/a.png", b"x" * 8, "image/png", upload_a)
+    second = asyncio.create_task(
+        queue.submit("images/b.png", b"x" * 8, "image/png", upload_b)
+    )
+    await asyncio.sleep(0.01)
+
+    drain = asyncio.create_task(queue.drain())
+    await asyncio.wait_for(second, timeout=1)
+    release.set()
+    await asyncio.wait_for(drain, timeout=1)
+
+    assert sorted(stored) == ["a", "b"]
+    assert queue.spooled("images/b.png") is None
+
+
+async def test_pending_name_is_uploaded_once():
+    """A deduplicated name submitted again while pending is not re-queued."""
+    release = asyncio.Event()
+    uploads = []
+
+    async def upload():
+        await release.wait()
+        uploads.append("images/a.png")
+
+    queue = UploadQueue(workers=2, max_bytes=1024, retries=0)
+    await queue.submit("images/a.png", b"data", "image/png", upload)
+    await queue.submit("images/a.png", b"data", "image/png", upload)
+
+    release.set()
+    await queue.drain()
+
+    assert uploads == ["images/a.png"]
+    assert queue.status("images/a.png") == "uploaded"
+
+
+async def test_status_of_uploads_from_other_processes():
+    """Names this process never spooled are looked up in storage."""
+    queue = UploadQueue(workers=1, max_bytes=1024, retries=0)
+    service = MagicMock()
+    service.get_blob_properties = AsyncMock(
+        side_effect=[object(), ResourceNotFoundError("missing")]
+    )
+
+    uploaded = await get_upload_status("images/a.png", 0, queue, service)
+    unknown = await get_upload_status("images/b.png", 0, queue, service)
+
+    assert uploaded["status"] == "uploaded"
+    assert unknown["status"] == "unknown"
+
+
+_real_sleep = asyncio.sleep
+
+
+async def _no_sleep(*args, **kwargs):
+    await _real_sleep(0)
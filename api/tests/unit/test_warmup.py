@@ -0,0 +1,74 @@
+"""
+Unit tests for the warm-up readiness gate and the health endpoints.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from fastapi.testclient import TestClient
+
+from app.main import app, warmup
+from app.services.warmup import Warmup
+
+
+async def test_warmup_retries_until_every_check_passes(monkeypatch):
+    """A failing check is retried and readiness waits for it."""
+    monkeypatch.setattr("app.services.warmup.asyncio.sleep", AsyncMock())
+    flaky = AsyncMock(side_effect=[ConnectionError("refused"), None])
+    gate = Warmup()
+
+    gate.start({"cosmos": flaky, "storage": AsyncMock()})
+    assert not gate.ready
+    await gate.wait()
+
+    assert gate.ready
+    assert gate.status == {"cosmos": "ok", "storage": "ok"}
+    assert flaky.await_count == 2
+
+
+def test_liveness_does_not_wait_for_warmup():
+    response = TestClient(app).get("/healthz")
+
+    assert response.status_code == 200
+
+
+async def test_readiness_reports_warm_state(monkeypatch):
+    """Readiness is 503 while warming and 200 once every check passed."""
+    monkeypatch.setattr(warmup, "status", {"storage": "pending"})
+    monkeypatch.setattr(warmup, "_task", None)
+
+    warming = TestClient(app).get("/readyz")
+    assert warming.status_code == 503
+    assert warming.json()["checks"] == {"storage": "pending"}
+
+    warmup.start({"storage": AsyncMock()})
+    await warmup.wait()
+    ready = TestClient(app).get("/readyz")
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+
+
+async def test_cosmos_warm_up_reads_only_the_container(make_cosmos_service):
+    """Warming Cosmos resolves the container without querying records."""
+    container = MagicMock()
+    container.read = AsyncMock(return_value={"id": "designs"})
+
+    await make_cosmos_service(container).warm_up()
+
+    container.read.assert_awaited_once()
+    container.query_items.assert_not_called()
+
+
+async def test_cosmos_warm_up_tolerates_a_missing_container(make_cosmos_service):
+    container = MagicMock()
+    container.read = AsyncMock(side_effect=CosmosResourceNotFoundError())
+
+    await make_cosmos_service(container).warm_up()
+
+
+async def test_cosmos_warm_up_skips_unconfigured_cosmos(make_cosmos_service):
+    container = MagicMock()
+
+    await make_cosmos_service(container, connection_string="").warm_up()
+
+    container.read.assert_not_called()